@@ -2,9 +2,11 @@
 Module which contains all the imports and data available to
 unit tests to reduce the amount of boilerplate.
 """
+import gc
 import os
 import sys
 import json
+import zlib
 import time
 import shutil
 import timeit
@@ -17,6 +19,7 @@ import itertools
 import subprocess
 import contextlib
 import threading
+import multiprocessing
 
 try:
     # Python 3
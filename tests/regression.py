@@ -4,10 +4,45 @@ except BaseException:
     import generic as g
 
 import time
-#import psutil
 import timeit
+import argparse
 import subprocess
 
+try:
+    from .test_proximity import closest_point_loop
+except BaseException:
+    from test_proximity import closest_point_loop
+
+try:
+    import psutil
+except BaseException:
+    psutil = None
+
+# meshes loaded to time each of the mesh loaders
+load_files = ['featuretype.STL',
+              'soup.stl',
+              'ballA.off',
+              'cycloidal.ply',
+              'fuze_ascii.ply',
+              'fuze.obj',
+              'CesiumMilkTruck.glb',
+              'featuretype.3MF',
+              'duck.dae',
+              'machinist.3DXML']
+
+# meshes of a few sizes to run the geometric queries on,
+# which aren't all watertight
+query_files = ['featuretype.STL',
+               'cycloidal.ply',
+               'bunny.ply']
+
+# a timing has regressed if it is slower than the stored
+# baseline by more than this fraction after normalization
+tolerance = 0.25
+
+# results stored with --save to compare against by default
+baseline_file = g.os.path.join(g.dir_data, 'benchmark.json')
+
 
 def typical_application():
     # make sure we can load everything we think we can
@@ -98,76 +133,455 @@ def establish_baseline(*args, counts=[390, 3820, 1710]):
     return times
 
 
+def import_time(count=5):
+    '''
+    Measure how long `import trimesh` takes in a fresh interpreter,
+    which is the cold start cost paid by short lived processes.
+
+    The time to start an interpreter which does nothing is
+    subtracted so only the import itself is measured.
+
+    Arguments
+    ----------
+    count: int, number of interpreters to start for each measurement
+
+    Returns
+    ---------
+    seconds: float, minimum time to import trimesh
+    '''
+    def minimum(script):
+        times = []
+        for i in range(count):
+            tic = time.time()
+            subprocess.check_call([g.sys.executable, '-c', script])
+            times.append(time.time() - tic)
+        return min(times)
+
+    return minimum('import trimesh') - minimum('pass')
+
+
+def precision_memory(file_name='featuretype.STL'):
+    '''
+    Compare the memory used by a mesh stored as float64/int64
+    against the same mesh stored as float32/int32.
+
+    Arguments
+    ----------
+    file_name: str, name of a mesh in the models directory
+
+    Returns
+    ---------
+    nbytes: dict, precision : {property name : bytes}
+    '''
+    names = ['vertices', 'faces', 'triangles', 'face_normals', 'edges']
+    nbytes = {}
+    for precision in ['float64', 'float32']:
+        m = g.get_mesh(file_name, precision=precision)
+        nbytes[precision] = {n: getattr(m, n).nbytes for n in names}
+        nbytes[precision]['total'] = sum(nbytes[precision].values())
+    return nbytes
+
+
 def machine_info():
-    info = {}
+    '''
+    Describe the machine benchmarks were run on.
 
-    freq = psutil.cpu_freq()
-    info['cpu_count'] = psutil.cpu_count()
-    info['cpu_freq'] = {'min': freq.min,
-                        'max': freq.max,
-                        'current': freq.current}
+    Returns
+    ---------
+    info: dict, platform, python and cpu information
+    '''
+    info = {'platform': g.platform.platform(),
+            'machine': g.platform.machine(),
+            'processor': g.platform.processor(),
+            'python': g.platform.python_version(),
+            'numpy': g.np.__version__,
+            'trimesh': g.trimesh.__version__,
+            'cpu_count': g.os.cpu_count()}
+
+    if psutil is not None:
+        freq = psutil.cpu_freq()
+        if freq is not None:
+            info['cpu_freq'] = {'min': freq.min,
+                                'max': freq.max,
+                                'current': freq.current}
+        info['memory'] = psutil.virtual_memory().total
 
     return info
 
 
-if __name__ == '__main__':
+def measure(function, setup=None, repeat=3, number=1):
+    '''
+    Time a function, calling setup before every repeat so that
+    work which should be cold (caches, trees) is redone.
 
-    #baseline = establish_baseline()
+    Arguments
+    ----------
+    function: callable, passed the result of setup
+    setup:    callable or None, produces the argument for function
+    repeat:   int, number of times to time function
+    number:   int, number of calls to function per repeat
 
+    Returns
+    ---------
+    seconds: float, minimum time of a single call
+    '''
+    times = []
+    for i in range(repeat):
+        arg = None
+        if setup is not None:
+            arg = setup()
+        tic = time.time()
+        for j in range(number):
+            function(arg)
+        times.append((time.time() - tic) / number)
+    return min(times)
+
+
+def benchmark_load(file_names=None, repeat=3):
     '''
-    file_names = ['ballA.off',
-                  'cycloidal.ply',
-                  'featuretype.STL',
-                  'angle_block.STL',
-                  'soup.stl',
-                  'bun_zipper_res2.ply']
+    Time loading every file from the models directory.
 
-    setup = 'try: from . import generic as g
-except BaseException: import generic as g;'
-    setup += 'm=g.get_mesh(\'{}\');'
+    Arguments
+    ----------
+    file_names: None or (n,) str, files to load
+    repeat:     int, number of times to load each file
 
-    # test a dot product with itself
-    dot = '\n'.join(('a = np.arange(3*10**3,dtype=np.float64).reshape((-1,3))',
-                     'b = np.dot(a, a.T)'))
+    Returns
+    ---------
+    timings: dict, 'load.<format>.<file name>' : seconds
+    '''
+    if file_names is None:
+        file_names = load_files
+    timings = {}
+    for file_name in file_names:
+        location = g.os.path.join(g.dir_models, file_name)
+        file_type = file_name.split('.')[-1].lower()
+        name = 'load.{}.{}'.format(file_type, file_name)
+        try:
+            timings[name] = measure(
+                lambda arg: g.trimesh.load(location),
+                repeat=repeat)
+        except BaseException:
+            # loaders may need optional dependencies
+            g.log.warning('unable to benchmark %s',
+                          name,
+                          exc_info=True)
+    return timings
+
+
+def benchmark_export(file_name='featuretype.STL', repeat=3):
+    '''
+    Time exporting a mesh to every format with an exporter.
 
-    tests = {
-        'section': 'r=m.section(plane_normal=[0,0,1],plane_origin=m.centroid)'}
+    Arguments
+    ----------
+    file_name: str, mesh to export
+    repeat:    int, number of times to export to each format
+
+    Returns
+    ---------
+    timings: dict, 'export.<format>' : seconds
+    '''
+    mesh = g.get_mesh(file_name)
+    # exporters may use cached values like face normals
+    # which should be computed once rather than timed
+    mesh.face_normals
+    timings = {}
+    for file_type in g.trimesh.exchange.export._mesh_exporters.keys():
+        name = 'export.{}'.format(file_type)
+        try:
+            timings[name] = measure(
+                lambda arg: mesh.export(file_type=file_type),
+                repeat=repeat)
+        except BaseException:
+            # exporters may need optional dependencies
+            g.log.warning('unable to benchmark %s',
+                          name,
+                          exc_info=True)
+    return timings
+
+
+def benchmark_queries(file_names=None, repeat=3, count=1000):
+    '''
+    Time ray casting, proximity, slicing, voxelization and
+    booleans on meshes from the models directory.
 
-    clear = '\n'.join(['\nn=m.face_normals',
-                       'c=m.centroid',
-                       'm._cache.clear()',
-                       'm._cache[\'face_normals\']=n',
-                       'm._cache[\'centroid\']=c'])
+    Every repeat runs on a copy of the mesh with an empty cache
+    so acceleration structures are built inside the timing.
 
-    tests = {'section': clear + 'r=m.section(plane_normal=[0,0,1],plane_origin=m.centroid)',
-             'bounding_box_oriented': clear + 'r=m.bounding_box_oriented'}
+    Arguments
+    ----------
+    file_names: None or (n,) str, meshes to query
+    repeat:     int, number of times to run each query
+    count:      int, number of rays and points to query
+
+    Returns
+    ---------
+    timings: dict, '<query>.<file name>' : seconds
+    '''
+    if file_names is None:
+        file_names = query_files
 
-    timings = g.collections.defaultdict(dict)
+    # use the same random queries every time
+    random = g.np.random.RandomState(0)
 
-    iterations = 10
-    repeats = 3
+    timings = {}
     for file_name in file_names:
-        for test_name, test_string in tests.items():
-            time_min = min(timeit.repeat(test_string,
-                                         setup.format(file_name),
-                                         repeat=repeats,
-                                         number=iterations))
-            timings[test_name][file_name] = time_min / iterations
+        mesh = g.get_mesh(file_name)
+        # points inside the bounding box of the mesh
+        points = (random.random_sample((count, 3)) *
+                  mesh.extents) + mesh.bounds[0]
+        # rays from those points towards the center
+        directions = g.trimesh.unitize(mesh.centroid - points)
+        # a second mesh overlapping the first for booleans
+        other = mesh.copy()
+        other.apply_translation(mesh.extents * .2)
+
+        queries = {
+            'ray': lambda m: m.ray.intersects_location(
+                points, directions),
+            'proximity': lambda m: m.nearest.on_surface(
+                points[:count // 10]),
+            'section': lambda m: m.section(
+                plane_normal=[0, 0, 1],
+                plane_origin=mesh.centroid),
+            # voxelized is lazy so force the fill
+            'voxelize': lambda m: m.voxelized(
+                pitch=mesh.extents.max() / 50.0).matrix}
+
+        # booleans require an external program
+        if (g.trimesh.interfaces.scad.exists or
+                g.trimesh.interfaces.blender.exists):
+            queries['boolean'] = lambda m: m.difference(other)
+
+        for query, function in queries.items():
+            name = '{}.{}'.format(query, file_name)
+            try:
+                timings[name] = measure(function,
+                                        setup=mesh.copy,
+                                        repeat=repeat)
+            except BaseException:
+                # optional dependencies like rtree may be missing
+                g.log.warning('unable to benchmark %s',
+                              name,
+                              exc_info=True)
+    return timings
+
+
+def benchmark_closest_point(file_name='featuretype.STL',
+                            repeat=3,
+                            count=10000):
+    '''
+    Time closest point queries with the previous implementation
+    which loops over every point, the vectorized reduction of
+    the same candidates, and the BVH search.
 
-    result = {}
+    Arguments
+    ----------
+    file_name: str, mesh to query
+    repeat:    int, number of times to run each query
+    count:     int, number of points to query
 
-    result['cpu_info'] = subprocess.check_output(['cat', '/proc/cpuinfo'])
-    result['baseline'] = baseline.tolist()
-    result['timestamp'] = time.time()
-    result['timings'] = timings
+    Returns
+    ---------
+    timings: dict, 'closest_point.<method>' : seconds
+    '''
+    mesh = g.get_mesh(file_name)
+    # use the same random points every time
+    random = g.np.random.RandomState(0)
+    points = ((random.random_sample((count, 3)) - .5) *
+              mesh.extents * 1.5) + mesh.centroid
+
+    # build the trees before timing
+    mesh.triangles_tree
+    mesh.triangles_bvh
+
+    def vectorized(arg):
+        candidates = g.trimesh.proximity.nearby_faces(mesh, points)
+        g.trimesh.proximity._closest_candidates(
+            mesh,
+            points,
+            g.np.concatenate(candidates).astype(g.np.int64),
+            [len(i) for i in candidates])
+
+    return {
+        'closest_point.loop': measure(
+            lambda arg: closest_point_loop(mesh, points),
+            repeat=repeat),
+        'closest_point.vectorized': measure(vectorized,
+                                            repeat=repeat),
+        'closest_point.bvh': measure(
+            lambda arg: g.trimesh.proximity.closest_point(mesh, points),
+            repeat=repeat)}
+
+
+def benchmark_cache(file_name='featuretype.STL', repeat=3, number=1000):
     '''
+    Time computing a cached property, reading it back from
+    the cache, and checking the cache after data has changed.
 
-    import pyinstrument
+    Arguments
+    ----------
+    file_name: str, mesh to use
+    repeat:    int, number of times to time each operation
+    number:    int, number of cache hits per repeat
 
-    profiler = pyinstrument.Profiler()
-    profiler.start()
+    Returns
+    ---------
+    timings: dict, 'cache.<operation>' : seconds
+    '''
+    mesh = g.get_mesh(file_name)
+
+    def warm():
+        m = mesh.copy()
+        m.face_adjacency
+        return m
+
+    def invalidate(m):
+        # changing a vertex must be noticed by the
+        # hash check and clear the cache
+        m.vertices[0] += 1e-10
+        m.face_adjacency
+
+    return {
+        'cache.cold': measure(lambda m: m.face_adjacency,
+                              setup=mesh.copy,
+                              repeat=repeat),
+        'cache.hit': measure(lambda m: m.face_adjacency,
+                             setup=warm,
+                             repeat=repeat,
+                             number=number),
+        'cache.invalidate': measure(invalidate,
+                                    setup=warm,
+                                    repeat=repeat)}
+
+
+def benchmark(repeat=3):
+    '''
+    Run every benchmark and normalize the timings by how fast
+    this machine runs the baseline from `establish_baseline`.
+
+    Arguments
+    ----------
+    repeat: int, number of times to run each benchmark
+
+    Returns
+    ---------
+    result: dict, may be dumped to JSON, with keys:
+            machine:    dict, from machine_info
+            baseline:   (3,) float, from establish_baseline
+            timestamp:  float, when the run finished
+            timings:    dict, name : seconds
+            normalized: dict, name : seconds / mean(baseline)
+            memory:     dict, from precision_memory
+    '''
+    baseline = establish_baseline()
+
+    timings = {'import': import_time()}
+    timings.update(benchmark_load(repeat=repeat))
+    timings.update(benchmark_export(repeat=repeat))
+    timings.update(benchmark_queries(repeat=repeat))
+    timings.update(benchmark_closest_point(repeat=repeat))
+    timings.update(benchmark_cache(repeat=repeat))
+
+    # the baseline counts are tuned to take ~1.0s each on a
+    # reference machine so the mean is the relative slowness
+    scale = float(baseline.mean())
+
+    result = {'machine': machine_info(),
+              'baseline': baseline.tolist(),
+              'timestamp': time.time(),
+              'timings': timings,
+              'normalized': {k: v / scale for k, v in timings.items()},
+              'memory': precision_memory()}
+
+    return result
+
+
+def compare(result, baseline, tolerance=tolerance, minimum=1e-4):
+    '''
+    Compare normalized timings against a stored result.
+
+    Arguments
+    ----------
+    result:    dict, from benchmark
+    baseline:  dict, stored result from benchmark
+    tolerance: float, fraction slower before a timing regresses
+    minimum:   float, normalized seconds below which timings
+               are too noisy to compare
+
+    Returns
+    ---------
+    regressions: dict, name : (baseline, current) normalized
+                 seconds, for every timing that got slower
+    '''
+    current = result['normalized']
+    stored = baseline['normalized']
+
+    regressions = {}
+    for name in sorted(set(current.keys()).intersection(stored.keys())):
+        new, old = current[name], stored[name]
+        if new < minimum and old < minimum:
+            continue
+        if new > old * (1.0 + tolerance):
+            regressions[name] = (old, new)
+    return regressions
 
-    typical_application()
 
-    profiler.stop()
-    print(profiler.output_text(unicode=True, color=True))
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark trimesh against a stored baseline')
+    parser.add_argument('--save',
+                        help='write JSON results to this file')
+    parser.add_argument('--compare',
+                        nargs='?',
+                        const=baseline_file,
+                        help='JSON results to check for regressions, '
+                        'the stored baseline if no file is passed')
+    parser.add_argument('--tolerance',
+                        type=float,
+                        default=tolerance,
+                        help='fraction slower considered a regression')
+    parser.add_argument('--repeat',
+                        type=int,
+                        default=3,
+                        help='number of times to run each benchmark')
+    parser.add_argument('--profile',
+                        action='store_true',
+                        help='profile a typical application instead')
+    args = parser.parse_args()
+
+    if args.profile:
+        import pyinstrument
+
+        profiler = pyinstrument.Profiler()
+        profiler.start()
+
+        typical_application()
+
+        profiler.stop()
+        print(profiler.output_text(unicode=True, color=True))
+        g.sys.exit()
+
+    result = benchmark(repeat=args.repeat)
+
+    for name, seconds in sorted(result['normalized'].items()):
+        print('{:<40} {:0.6f}'.format(name, seconds))
+    for precision, nbytes in result['memory'].items():
+        print('{} storage: {} bytes'.format(precision, nbytes['total']))
+
+    if args.save is not None:
+        with open(args.save, 'w') as f:
+            g.json.dump(result, f, indent=2, sort_keys=True)
+
+    if args.compare is not None:
+        with open(args.compare, 'r') as f:
+            stored = g.json.load(f)
+        regressions = compare(result,
+                              stored,
+                              tolerance=args.tolerance)
+        for name, (old, new) in regressions.items():
+            print('REGRESSION {}: {:0.6f} -> {:0.6f}'.format(
+                name, old, new))
+        if len(regressions) > 0:
+            g.sys.exit(1)
@@ -0,0 +1,124 @@
+try:
+    from . import generic as g
+except BaseException:
+    import generic as g
+
+
+class BVHTest(g.unittest.TestCase):
+
+    def test_structure(self):
+        m = g.get_mesh('featuretype.STL')
+        tree = m.triangles_bvh
+
+        # every primitive should appear exactly once in order
+        assert (g.np.sort(tree.order) == g.np.arange(len(m.faces))).all()
+        # leaves should partition the primitives
+        assert tree.count[tree.leaf].sum() == len(m.faces)
+        assert (tree.count[tree.leaf] <= tree.leaf_size).all()
+
+        # root should be the bounds of the mesh
+        assert g.np.allclose(tree.bounds[0], m.bounds)
+
+        # every node should contain the bounds of its triangles
+        for node in range(len(tree.start)):
+            index = tree.order[tree.start[node]:
+                               tree.start[node] + tree.count[node]]
+            tri = m.triangles[index]
+            assert (tri.min(axis=(0, 1)) >= tree.bounds[node][0]).all()
+            assert (tri.max(axis=(0, 1)) <= tree.bounds[node][1]).all()
+
+    def test_candidates(self):
+        m = g.get_mesh('featuretype.STL')
+        ray_origins = (g.np.random.random((500, 3)) - .5) * m.scale
+        ray_origins += m.centroid
+        ray_directions = g.trimesh.unitize(
+            g.np.random.random((500, 3)) - .5)
+
+        rt = g.trimesh.ray.ray_triangle
+        rtree = rt.ray_triangle_id(m.triangles,
+                                   ray_origins,
+                                   ray_directions,
+                                   tree=m.triangles_tree)
+        bvh = rt.ray_triangle_id(m.triangles,
+                                 ray_origins,
+                                 ray_directions,
+                                 tree=m.triangles_bvh)
+
+        # both broad phases should produce identical hits
+        assert (set(zip(*[i.tolist() for i in rtree[:2]])) ==
+                set(zip(*[i.tolist() for i in bvh[:2]])))
+
+        # the BVH should return far fewer candidates
+        a = rt.ray_triangle_candidates(ray_origins,
+                                       ray_directions,
+                                       m.triangles_tree)
+        b = rt.ray_triangle_candidates(ray_origins,
+                                       ray_directions,
+                                       m.triangles_bvh)
+        assert len(b[0]) < len(a[0])
+        # candidates should be sorted by ray index
+        assert (g.np.diff(b[1]) >= 0).all()
+
+    def test_axis_aligned(self):
+        # rays with zero components shouldn't break the slab test
+        m = g.trimesh.creation.box()
+        origins = g.np.array([[0, 0, -10.0],
+                              [.25, .25, 10.0],
+                              [10.0, 0, 0],
+                              [5, 5, -10.0]])
+        directions = g.np.array([[0, 0, 1.0],
+                                 [0, 0, -1.0],
+                                 [-1.0, 0, 0],
+                                 [0, 0, 1.0]])
+        hit = m.ray.intersects_any(origins, directions)
+        assert (hit == [True, True, True, False]).all()
+
+    def test_refit(self):
+        m = g.get_mesh('featuretype.STL')
+        tree = m.triangles_bvh
+        before = tree.bounds.copy()
+
+        # move every triangle and refit
+        triangles = m.triangles + [1.0, 2.0, 3.0]
+        tree.refit(g.np.stack((triangles.min(axis=1),
+                               triangles.max(axis=1)), axis=1))
+        assert g.np.allclose(tree.bounds, before + [1.0, 2.0, 3.0])
+
+    def test_deform(self):
+        m = g.trimesh.creation.icosphere()
+        previous = m.triangles_bvh
+        before = previous.bounds.copy()
+
+        # changing only vertices should refit a copy of the tree
+        m.vertices = m.vertices * [1.0, 2.0, 3.0]
+        tree = m.triangles_bvh
+        assert tree is not previous
+        assert tree.order is previous.order
+        assert g.np.allclose(tree.bounds[0], m.bounds)
+        # and the previous tree should be unchanged
+        assert g.np.allclose(previous.bounds, before)
+
+        # queries should match a freshly built tree
+        origins = g.np.random.random((100, 3)) - .5
+        vectors = g.trimesh.unitize(g.np.random.random((100, 3)) - .5)
+        a = m.ray.intersects_id(origins, vectors)
+        b = g.trimesh.ray.ray_triangle.ray_triangle_id(
+            m.triangles, origins, vectors)
+        assert (set(zip(*[i.tolist() for i in a])) ==
+                set(zip(*[i.tolist() for i in b[:2]])))
+
+        # changing faces requires a new tree
+        m.faces = m.faces[:, ::-1]
+        assert m.triangles_bvh is not tree
+
+        # an explicit refit should pick up unhashed changes
+        m.vertices.view(g.np.ndarray)[:] *= 2.0
+        tree = m.ray.refit()
+        vertices = g.np.array(m.vertices)
+        assert g.np.allclose(tree.bounds[0], [vertices.min(axis=0),
+                                              vertices.max(axis=0)])
+
+
+if __name__ == '__main__':
+    g.trimesh.util.attach_to_log()
+    g.unittest.main()
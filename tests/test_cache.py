@@ -182,6 +182,394 @@ class CacheTest(g.unittest.TestCase):
         assert t.crc() != t[::-1].crc()
         assert t.fast_hash() != t[::-1].fast_hash()
 
+    def test_budget(self):
+        budget = g.trimesh.caching.budget
+        # drop caches of meshes from other tests
+        g.gc.collect()
+        try:
+            m = g.trimesh.creation.icosphere()
+            # populate some cached values
+            m.face_normals
+            m.edges_unique
+            m.face_adjacency
+            m.area_faces
+            assert m._cache.nbytes > 0
+            assert budget.used >= m._cache.nbytes
+
+            # other live caches may hold values which can't be
+            # evicted so only count the values which can be
+            locked = locked_bytes(budget)
+            evictable = m._cache.nbytes - sum(
+                size for key, size in m._cache._sizes.items()
+                if m._cache._evictable(key) is None)
+
+            evictions = budget.evictions
+            # a limit smaller than the cache forces evictions
+            budget.limit = locked + evictable // 2
+            assert budget.used <= budget.limit
+            assert budget.evictions > evictions
+            assert m._cache.evictions > 0
+            # pinned keys are never evicted
+            assert 'face_normals' in m._cache.cache
+
+            # values stored alongside another value are evicted
+            # together so derived properties stay consistent
+            budget.limit = 1
+            assert 'edges_unique' not in m._cache.cache
+            assert 'edges_unique_inverse' not in m._cache.cache
+            assert g.np.allclose(
+                m.edges_unique[m.edges_unique_inverse],
+                m.edges_sorted)
+        finally:
+            budget.limit = None
+
+        # values of collected caches are no longer tracked
+        del m
+        g.gc.collect()
+        used = budget.used
+        m = g.trimesh.creation.icosphere()
+        m.face_adjacency
+        assert budget.used > used
+        del m
+        g.gc.collect()
+        assert budget.used == used
+
+    def test_estimate(self):
+        estimate = g.trimesh.caching.estimate_size
+        a = g.np.zeros((100, 3))
+        assert estimate(a) == a.nbytes
+        assert estimate([a, a]) >= 2 * a.nbytes
+        assert estimate({'a': a}) >= a.nbytes
+        m = g.trimesh.creation.box()
+        assert estimate(m) >= m.vertices.nbytes + m.faces.nbytes
+
+        # trees should report their arrays rather than the
+        # size of the python object
+        m = g.trimesh.creation.icosphere()
+        assert estimate(m.triangles_bvh) >= m.faces.nbytes
+        assert estimate(m.ray) >= m.triangles_bvh.nbytes
+        assert estimate(m.triangles_tree) >= m.faces.nbytes
+
+    def test_depends(self):
+        m = g.get_mesh('featuretype.STL')
+        adjacency = m.face_adjacency
+        inverse = m.edges_unique_inverse
+        area = m.area_faces
+
+        # moving vertices should keep values which only
+        # depend on faces but dump everything else
+        m.vertices[:, 0] += 1.0
+        assert 'face_adjacency' in m._cache
+        assert 'edges_unique_inverse' in m._cache
+        assert 'area_faces' not in m._cache
+        assert m.face_adjacency is adjacency
+        assert m.edges_unique_inverse is inverse
+        assert g.np.allclose(m.area_faces, area)
+
+        # changing faces should dump everything
+        m.faces = g.np.fliplr(m.faces)
+        assert 'face_adjacency' not in m._cache
+        assert 'edges_unique' not in m._cache
+        assert m.face_adjacency is not adjacency
+
+        # check the decorator on a simple class
+        class Thing(object):
+
+            def __init__(self):
+                self._data = g.trimesh.caching.DataStore()
+                self._data['a'] = [1, 2, 3]
+                self._data['b'] = [4, 5, 6]
+                self._cache = g.trimesh.caching.Cache(
+                    id_function=self._data.fast_hash,
+                    data=self._data)
+
+            @g.trimesh.caching.cache_decorator(depends=['a'])
+            def total_a(self):
+                return self._data['a'].sum()
+
+            @g.trimesh.caching.cache_decorator
+            def total(self):
+                return sum(v.sum() for v in self._data.values())
+
+        t = Thing()
+        assert t.total_a == 6
+        assert t.total == 21
+        t._data['b'] += 1
+        assert 'total_a' in t._cache
+        assert 'total' not in t._cache
+        assert t.total == 24
+        t._data['a'] += 1
+        assert 'total_a' not in t._cache
+        assert t.total_a == 9
+
+    def test_chunks(self):
+        """
+        Changing part of an array should only rehash the
+        chunks it touched and still match a full rehash.
+        """
+        def fresh(a):
+            # hash a copy without any stored chunk state
+            b = g.trimesh.caching.tracked_array(a.copy())
+            b.chunk_size = a.chunk_size
+            return b.md5(), b.crc(), b.fast_hash()
+
+        def hashes(a):
+            return a.md5(), a.crc(), a.fast_hash()
+
+        # small arrays hash the same as a single chunk
+        small = g.trimesh.caching.tracked_array(g.np.arange(10))
+        assert small.md5() == g.trimesh.util.md5_object(small.tobytes())
+
+        a = g.trimesh.caching.tracked_array(
+            g.np.random.random((100, 3)))
+        a.chunk_size = 64
+        assert hashes(a) == fresh(a)
+
+        # index, slice, mask and fancy index assignment
+        for key in [5, slice(10, 20), slice(None, None, 7),
+                    a[:, 0] > 0.5, [1, 50, 99], (-1, 2)]:
+            before = hashes(a)
+            a[key] = g.np.random.random()
+            after = hashes(a)
+            assert all(i != j for i, j in zip(before, after))
+            assert after == fresh(a)
+
+        # in-place math through a view marks the parent
+        before = hashes(a)
+        a[30:32] += 1.0
+        assert all(i != j for i, j in zip(before, hashes(a)))
+        assert hashes(a) == fresh(a)
+
+        # only the touched chunks should be dirty
+        a[40] = 2.0
+        dirty = a._chunks['c'][1]
+        assert dirty.sum() == 1
+        assert hashes(a) == fresh(a)
+        assert not a._chunks['c'][1].any()
+
+        # digests are the same as hashing the whole array
+        assert a.md5() == g.trimesh.util.md5_object(a.tobytes())
+        assert a.crc() == g.zlib.crc32(a.tobytes())
+        assert a[::-3].crc() == g.zlib.crc32(a[::-3].tobytes())
+
+        # operations on the whole array still rehash everything
+        a *= 2.0
+        assert hashes(a) == fresh(a)
+
+    def test_disk(self):
+        """
+        Persistent properties should be loaded from disk by
+        meshes with the same geometry.
+        """
+        disk = g.trimesh.caching.disk
+        path = g.tempfile.mkdtemp()
+        disk.path = path
+        try:
+            m = g.get_mesh('featuretype.STL')
+            m._cache.clear()
+            adjacency = m.face_adjacency
+            edges = m.face_adjacency_edges
+            hull = m.convex_hull
+
+            stored = disk.load(m, 'face_adjacency')
+            assert g.np.allclose(stored['face_adjacency'], adjacency)
+
+            # a new mesh loads the values and their siblings
+            other = g.get_mesh('featuretype.STL')
+            other._cache.clear()
+            assert 'face_adjacency' not in other._cache
+            assert g.np.allclose(other.face_adjacency, adjacency)
+            assert 'face_adjacency_edges' in other._cache
+            assert g.np.allclose(other.face_adjacency_edges, edges)
+            assert g.np.isclose(other.convex_hull.volume, hull.volume)
+
+            # changed geometry shouldn't load anything
+            other.vertices += 1.0
+            assert disk.load(other, 'face_adjacency') is None
+
+            # pruning should remove files to fit the limit
+            disk.limit = 1
+            assert disk.load(m, 'face_adjacency') is None
+        finally:
+            disk.path = None
+            disk.limit = None
+            g.shutil.rmtree(path)
+
+    def test_stats(self):
+        """
+        Hits, misses, invalidations and timed calls should be
+        recorded by name when metrics are enabled.
+        """
+        metrics = g.trimesh.caching.metrics
+        metrics.clear()
+        metrics.enabled = True
+        try:
+            m = g.trimesh.creation.box()
+            m._cache.clear()
+            m.area_faces
+            m.area_faces
+            m.vertices += 1.0
+            m.area_faces
+
+            stats = g.trimesh.caching.stats()
+            area = stats['area_faces']
+            assert area['misses'] == 2
+            assert area['hits'] == 1
+            assert area['invalidations'] == 1
+            assert area['time'] >= 0.0
+
+            # functions wrapped by log_time are also recorded
+            m.convex_hull
+            stats = g.trimesh.caching.stats(clear=True)
+            assert stats['convex_hull']['misses'] == 1
+            assert stats['fix_normals']['calls'] >= 1
+            # a snapshot should be able to be dumped to JSON
+            assert g.json.loads(g.json.dumps(stats)) == stats
+            assert len(g.trimesh.caching.stats()) == 0
+        finally:
+            metrics.enabled = False
+            metrics.clear()
+
+        # nothing is recorded when disabled
+        m.area_faces
+        assert len(g.trimesh.caching.stats()) == 0
+
+    def test_share(self):
+        """
+        DataStores sharing memory should copy it on write.
+        """
+        a = g.trimesh.caching.DataStore()
+        a['x'] = g.np.arange(100, dtype=g.np.float64).reshape((-1, 2))
+        hashes = a.fast_hash(), a.md5()
+
+        b = g.trimesh.caching.DataStore()
+        b.share(a)
+        assert g.np.shares_memory(a['x'], b['x'])
+        assert (b.fast_hash(), b.md5()) == hashes
+
+        # a view held before the write still sees the old data
+        view = a['x'][10:20]
+        b['x'][10:20, 1] *= 2.0
+        assert not g.np.shares_memory(a['x'], b['x'])
+        assert (a.fast_hash(), a.md5()) == hashes
+        assert b.fast_hash() != hashes[0]
+        assert g.np.allclose(view, a['x'][10:20])
+        assert g.np.allclose(b['x'][10:20, 1], view[:, 1] * 2.0)
+
+        # in-place operators on the array replace it
+        x = a['x']
+        x += 1.0
+        assert x is a['x']
+        assert a.fast_hash() != hashes[0]
+        assert g.np.allclose(a['x'][:, 0], g.np.arange(0, 100, 2) + 1)
+
+        # arrays which aren't shared still can't be written to
+        r = g.trimesh.caching.tracked_array(g.np.zeros(3))
+        r.flags.writeable = False
+        with self.assertRaises(ValueError):
+            r[0] = 1.0
+        with self.assertRaises(ValueError):
+            r += 1.0
+
+    def test_threads(self):
+        """
+        Values read from many threads at once should only be
+        computed once.
+        """
+        class Thing(object):
+            def __init__(self):
+                self._data = g.trimesh.caching.DataStore()
+                self._data['a'] = g.np.arange(10)
+                self._cache = g.trimesh.caching.Cache(
+                    id_function=self._data.fast_hash,
+                    data=self._data)
+                self.count = 0
+
+            @g.trimesh.caching.cache_decorator
+            def total(self):
+                self.count += 1
+                # give other threads a chance to race
+                g.time.sleep(0.05)
+                self._cache['half'] = self._data['a'].sum() / 2.0
+                return self._data['a'].sum()
+
+        t = Thing()
+        results = []
+
+        def read():
+            results.append((t.total, t._cache['half']))
+
+        threads = [g.threading.Thread(target=read) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert t.count == 1
+        assert results == [(45, 22.5)] * len(threads)
+        # the value stored while computing is in the same group
+        assert t._cache._group['half'] == 'total'
+        assert len(t._cache._computing) == 0
+
+        # changed data is still recomputed
+        t._data['a'] += 1
+        assert t.total == 55
+        assert t.count == 2
+
+        # primitives deepcopy their cache which has locks
+        box = g.trimesh.primitives.Box()
+        assert g.np.isclose(box.volume, 1.0)
+        assert g.np.isclose(box.copy().volume, 1.0)
+
+    def test_threads_counters(self):
+        """
+        Counters and the memory budget shouldn't lose or double
+        count anything when changed from many threads at once.
+        """
+        budget = g.trimesh.caching.budget
+        stats = g.trimesh.caching.Stats(enabled=True)
+        m = g.trimesh.creation.icosphere()
+        m.face_adjacency
+        used = budget.used
+
+        def work():
+            for i in range(2000):
+                stats.hit('a')
+                stats.miss('a', 1.0)
+                budget.touch(m._cache, 'face_adjacency')
+
+        # switch threads as often as possible to force races
+        interval = g.sys.getswitchinterval()
+        g.sys.setswitchinterval(1e-6)
+        try:
+            threads = [g.threading.Thread(target=work) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            g.sys.setswitchinterval(interval)
+
+        record = stats.snapshot()['a']
+        assert record['hits'] == 16000
+        assert record['misses'] == 16000
+        assert g.np.isclose(record['time'], 16000.0)
+        assert budget.used == used
+        assert budget.used == sum(budget._order.values())
+
+
+def locked_bytes(budget):
+    """
+    Get the bytes of every value tracked by a memory budget
+    which can't currently be evicted.
+    """
+    locked = 0
+    for (ident, key), size in list(budget._order.items()):
+        cache = budget._caches[ident]()
+        if cache is None or cache._evictable(key) is None:
+            locked += size
+    return locked
+
 
 if __name__ == '__main__':
     g.trimesh.util.attach_to_log()
@@ -72,6 +72,55 @@ class CameraTests(g.unittest.TestCase):
             # Z should be the same as maximum trig option
             assert np.linalg.inv(T)[2, 3] >= check.max()
 
+    def test_rays(self):
+        camera = g.trimesh.scene.Camera(
+            resolution=(64, 48),
+            fov=(60, 45))
+        vectors, pixels = g.trimesh.scene.cameras.camera_to_rays(camera)
+
+        assert vectors.shape == (64 * 48, 3)
+        assert g.np.allclose(g.np.linalg.norm(vectors, axis=1), 1.0)
+        # every ray should point down the camera -Z axis
+        assert (vectors[:, 2] < 0).all()
+        # the corner rays should be at the edge of the FOV
+        angle = g.np.degrees(g.np.arctan2(
+            g.np.abs(vectors[:, :2]), -vectors[:, 2:])).max(axis=0)
+        assert (angle < camera.fov / 2.0).all()
+        assert g.np.allclose(angle, camera.fov / 2.0, atol=1.0)
+
+        # a subset of rows should match the full set
+        sub, sub_pixels = g.trimesh.scene.cameras.camera_to_rays(
+            camera, rows=(10, 20))
+        assert (sub_pixels[:, 1] >= 10).all()
+        assert (sub_pixels[:, 1] < 20).all()
+        assert g.np.allclose(sub, vectors[10 * 64:20 * 64])
+
+    def test_render_depth(self):
+        m = g.trimesh.creation.box()
+        scene = m.scene()
+        scene.camera.resolution = (80, 60)
+        depth, index, normals = scene.render_depth(tile_rows=7)
+
+        assert depth.dtype == g.np.float32
+        assert depth.shape == (60, 80)
+        assert normals.shape == (60, 80, 3)
+
+        hit = index >= 0
+        assert hit.any() and not hit.all()
+        assert g.np.isfinite(depth[hit]).all()
+        assert g.np.isinf(depth[~hit]).all()
+
+        # the camera is looking straight at the +Z face of the box
+        transform = scene.camera.transform
+        expected = transform[2, 3] - m.bounds[1][2]
+        assert g.np.allclose(depth[hit], expected, atol=1e-5)
+        assert g.np.allclose(normals[hit], [0, 0, 1])
+
+        # tiling shouldn't change the result
+        check = scene.render_depth(tile_rows=60)
+        assert g.np.allclose(check[0], depth)
+        assert (check[1] == index).all()
+
 
 if __name__ == '__main__':
     g.trimesh.util.attach_to_log()
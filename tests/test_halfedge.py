@@ -0,0 +1,106 @@
+try:
+    from . import generic as g
+except BaseException:
+    import generic as g
+
+
+class HalfEdgeTest(g.unittest.TestCase):
+
+    def test_structure(self):
+        m = g.get_mesh('featuretype.STL')
+        he = m.halfedges
+
+        # half- edges are in the same order as faces_to_edges
+        edges, index = g.trimesh.geometry.faces_to_edges(
+            m.faces, return_index=True)
+        assert g.np.array_equal(he.edges, edges)
+        assert g.np.array_equal(he.face, index)
+        assert g.np.array_equal(
+            he.edges_unique[he.edge], g.np.sort(edges, axis=1))
+
+        # walking around a face returns to the start
+        h = g.np.arange(len(he))
+        assert g.np.array_equal(he.next[he.next[he.next]], h)
+        assert g.np.array_equal(he.prev[he.next], h)
+
+        # twins run along the same edge the other way
+        assert he.is_watertight
+        assert he.is_winding_consistent
+        assert g.np.array_equal(he.twin[he.twin], h)
+        assert g.np.array_equal(he.vertex[he.twin], he.vertex[he.next])
+
+        # adjacency should match the sort based version
+        adjacency = g.trimesh.graph.face_adjacency(m.faces)
+        assert (set(map(tuple, he.face_adjacency)) ==
+                set(map(tuple, adjacency)))
+
+    def test_properties(self):
+        for m in g.get_meshes(5):
+            assert m.is_watertight == g.trimesh.graph.is_watertight(
+                m.edges)[0]
+            assert len(m.face_adjacency) == len(m.face_adjacency_edges)
+            # the shared edge is in both adjacent faces
+            for pair, edge in zip(m.face_adjacency[:20],
+                                  m.face_adjacency_edges[:20]):
+                assert set(edge).issubset(m.faces[pair[0]])
+                assert set(edge).issubset(m.faces[pair[1]])
+            assert g.np.array_equal(
+                m.edges_unique[m.faces_unique_edges].reshape((-1, 2)),
+                m.edges_sorted)
+
+    def test_walks(self):
+        m = g.trimesh.creation.icosphere()
+        he = m.halfedges
+        elist = set(map(tuple, m.edges_unique))
+        for vertex in range(len(m.vertices)):
+            ring = he.one_ring(vertex)
+            assert (set(ring) ==
+                    set(m.vertex_neighbors[vertex]))
+            # neighbors are documented as sorted by index
+            assert g.np.all(g.np.diff(m.vertex_neighbors[vertex]) > 0)
+            # consecutive ring vertices are connected
+            for a, b in zip(ring, g.np.roll(ring, 1)):
+                assert tuple(sorted((a, b))) in elist
+        assert len(he.boundaries()) == 0
+
+        # removing a face leaves a boundary around it
+        removed = m.faces[0].copy()
+        mask = g.np.ones(len(m.faces), dtype=bool)
+        mask[0] = False
+        m.update_faces(mask)
+        he = m.halfedges
+        assert not he.is_watertight
+        loops = he.boundaries()
+        assert len(loops) == 1
+        assert len(loops[0]) == 3
+        assert set(loops[0]) == set(removed)
+
+        # boundary vertices walk from one side to the other
+        vertex = loops[0][0]
+        ring = he.one_ring(vertex)
+        assert set(ring) == set(m.vertex_neighbors[vertex])
+
+    def test_neighbors(self):
+        # a degenerate face has an edge from a vertex to itself
+        he = g.trimesh.halfedge.HalfEdges(
+            [[0, 1, 2], [1, 3, 2], [2, 2, 3]])
+        neighbors = [list(n) for n in he.neighbors()]
+        assert neighbors == [[1, 2], [0, 2, 3], [0, 1, 2, 3], [1, 2]]
+        # unused vertices have no neighbors
+        assert len(he.neighbors(count=6)[5]) == 0
+
+    def test_cache(self):
+        m = g.get_mesh('featuretype.STL')
+        he = m.halfedges
+        # changing vertices keeps the connectivity
+        m.vertices[0] += 1.0
+        assert m.halfedges is he
+        # changing faces rebuilds it
+        m.faces = m.faces[::-1]
+        assert m.halfedges is not he
+        assert m.halfedges.is_watertight
+
+
+if __name__ == '__main__':
+    g.trimesh.util.attach_to_log()
+    g.unittest.main()
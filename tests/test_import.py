@@ -0,0 +1,78 @@
+try:
+    from . import generic as g
+except BaseException:
+    import generic as g
+
+
+def modules_after(script):
+    """
+    Run a script in a fresh interpreter and return the
+    names of every module which has been imported.
+    """
+    script += '\nimport sys\nprint(" ".join(sys.modules.keys()))'
+    output = g.subprocess.check_output([g.sys.executable, '-c', script])
+    return set(output.decode('utf-8').split())
+
+
+class ImportTest(g.unittest.TestCase):
+
+    def test_lazy(self):
+        if g.python_version[0] < 3 or (
+                g.python_version[0] == 3 and g.python_version[1] < 7):
+            # submodules are imported eagerly on old versions
+            return
+
+        modules = modules_after('import trimesh')
+        # heavy dependencies should not be imported
+        for name in ['scipy', 'shapely', 'rtree']:
+            assert name not in modules
+
+        # neither should the slow submodules
+        for name in ['ray', 'path', 'voxel', 'boolean', 'proximity',
+                     'permutate', 'collision', 'registration',
+                     'decomposition', 'viewer']:
+            assert 'trimesh.' + name not in modules
+
+        # but they should still be available as attributes
+        modules = modules_after(
+            'import trimesh\ntrimesh.voxel\ntrimesh.registration')
+        assert 'trimesh.voxel' in modules
+        assert 'trimesh.registration' in modules
+
+        # and after creating a mesh queries should work
+        m = g.trimesh.creation.box()
+        assert m.ray is not None
+        assert m.nearest is not None
+
+    def test_submodules(self):
+        # every submodule which was an attribute when
+        # imports were eager should still be reachable
+        names = ['base', 'boolean', 'bounds', 'caching', 'collision',
+                 'comparison', 'constants', 'convex', 'creation',
+                 'curvature', 'decomposition', 'exchange', 'geometry',
+                 'graph', 'grouping', 'inertia', 'interfaces',
+                 'intersections', 'interval', 'nsphere', 'parent',
+                 'path', 'permutate', 'points', 'poses', 'primitives',
+                 'proximity', 'ray', 'registration', 'remesh',
+                 'rendering', 'repair', 'resources', 'sample', 'scene',
+                 'smoothing', 'transformations', 'triangles', 'units',
+                 'util', 'version', 'visual', 'voxel']
+        for name in names:
+            module = getattr(g.trimesh, name)
+            assert module.__name__ == 'trimesh.' + name
+
+        # and so should every other submodule
+        for name in g.trimesh._lazy_modules:
+            if name == 'viewer':
+                # may need a display to import
+                continue
+            assert hasattr(g.trimesh, name)
+
+    def test_missing(self):
+        with self.assertRaises(AttributeError):
+            g.trimesh.not_a_submodule
+
+
+if __name__ == '__main__':
+    g.trimesh.util.attach_to_log()
+    g.unittest.main()
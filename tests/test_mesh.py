@@ -193,6 +193,208 @@ class MeshTests(g.unittest.TestCase):
             if res is None:
                 raise ValueError('"{}" is None!!'.format(expr))
 
+    def test_copy(self):
+        """
+        Copies should share data until it is changed and
+        optionally keep cached values.
+        """
+        m = g.get_mesh('featuretype.STL')
+        adjacency = m.face_adjacency.copy()
+        md5 = m.md5()
+
+        c = m.copy()
+        assert c.md5() == md5
+        assert 'face_adjacency' not in c._cache
+        # no memory is copied until something is written
+        assert g.np.shares_memory(m.vertices, c.vertices)
+
+        # writes to either mesh copy the data first
+        c.vertices[:, 0] += 1.0
+        c.vertices[0] = [10, 10, 10]
+        assert not g.np.shares_memory(m.vertices, c.vertices)
+        assert m.md5() == md5
+        assert c.md5() != md5
+        assert g.np.allclose(c.vertices[0], 10)
+        assert g.np.allclose(c.vertices[1:, 0] - 1.0,
+                             m.vertices[1:, 0])
+
+        m.faces[0] = m.faces[0][::-1]
+        assert m.md5() != md5
+        assert not g.np.allclose(m.faces, c.faces)
+        m.faces[0] = m.faces[0][::-1]
+        assert m.md5() == md5
+
+        # the source stays writable and arrays retrieved from
+        # it before the copy still change it
+        vertices = m.vertices
+        original = vertices.copy()
+        c = m.copy()
+        assert m.vertices.flags.writeable
+        vertices[0] = [9, 9, 9]
+        assert g.np.allclose(m.vertices[0], 9)
+        assert g.np.allclose(c.vertices, original)
+        assert c.md5() == md5
+        assert m.md5() != md5
+        vertices[0] = original[0]
+        assert m.md5() == md5
+
+        # writes the copy can't intercept still detach it
+        c = m.copy()
+        g.np.add(m.vertices, 1.0, out=m.vertices)
+        assert g.np.allclose(m.vertices, original + 1.0)
+        assert g.np.allclose(c.vertices, original)
+        assert c.md5() == md5
+        assert m.md5() != md5
+        m.vertices -= 1.0
+        assert m.md5() == md5
+
+        # so do writes to copies of copies
+        c = m.copy()
+        d = c.copy()
+        m.vertices[:, 2] *= 2.0
+        assert g.np.allclose(c.vertices, original)
+        assert g.np.allclose(d.vertices, original)
+        m.vertices[:, 2] /= 2.0
+        assert g.np.allclose(m.vertices, original)
+
+        # cached values can be copied with the mesh
+        assert g.np.allclose(m.face_adjacency, adjacency)
+        c = m.copy(cache=True)
+        assert 'face_adjacency' in c._cache
+        assert g.np.allclose(c.face_adjacency, adjacency)
+        assert not g.np.shares_memory(c.face_adjacency,
+                                      m.face_adjacency)
+        # and are cleared when the copy changes
+        c.vertices += 1.0
+        assert 'face_adjacency' in c._cache
+        c.faces = c.faces[::-1]
+        assert 'face_adjacency' not in c._cache
+        assert 'face_adjacency' in m._cache
+
+    def test_copy_writes(self):
+        """
+        Every way of writing to an array in- place should work
+        on both a mesh and its copy without changing the other.
+        """
+        writes = {
+            'setitem': lambda v: v.__setitem__(0, 5.0),
+            'iadd': lambda v: v.__iadd__(1.0),
+            'fill': lambda v: v.fill(5.0),
+            'sort': lambda v: v.sort(axis=0),
+            'put': lambda v: v.put([0, 4], 5.0),
+            'partition': lambda v: v.partition(1, axis=0),
+            'flat': lambda v: v.flat.__setitem__(0, 5.0),
+            'view': lambda v: v[:, 1].fill(5.0),
+            'copyto': lambda v: g.np.copyto(v, 5.0),
+            'np.put': lambda v: g.np.put(v, [1], 5.0),
+            'out': lambda v: g.np.add(v, 1.0, out=v),
+            'at': lambda v: g.np.add.at(v, [0], 1.0)}
+        if hasattr(g.np.ndarray, 'itemset'):
+            writes['itemset'] = lambda v: v.itemset(0, 5.0)
+
+        for name, write in writes.items():
+            for source in [True, False]:
+                m = g.trimesh.creation.icosphere(subdivisions=1)
+                c = m.copy()
+                written, other = (m, c) if source else (c, m)
+                original = other.vertices.copy()
+                md5 = other.vertices.md5()
+
+                # the same write on a plain array
+                expected = written.vertices.view(g.np.ndarray).copy()
+                write(expected)
+
+                write(written.vertices)
+                assert g.np.allclose(written.vertices, expected), name
+                assert (written.vertices.md5() ==
+                        g.trimesh.caching.tracked_array(expected).md5())
+                # the other mesh is unchanged
+                assert g.np.allclose(other.vertices, original), name
+                assert other.vertices.md5() == md5
+
+    def test_shared(self):
+        """
+        A mesh published into shared memory should be rebuilt
+        with the same data and cache without copying it.
+        """
+        if g.trimesh.shared.shared_memory is None:
+            g.log.warning('skipping test: no shared memory')
+            return
+
+        m = g.get_mesh('featuretype.STL')
+        with m.to_shared() as published:
+            # the spec is what gets sent to other processes
+            r = g.trimesh.Trimesh.from_shared(published.spec)
+            assert r.md5() == m.md5()
+            assert 'face_adjacency' in r._cache
+            assert g.np.array_equal(r.face_adjacency, m.face_adjacency)
+            assert g.np.allclose(r.face_normals, m.face_normals)
+            assert g.np.isclose(r.volume, m.volume)
+            # other processes are reading the same memory
+            with self.assertRaises(ValueError):
+                r.vertices[0] = 0.0
+            del r
+        # blocks are released when the context exits
+        assert len(published._blocks) == 0
+
+    def test_precision(self):
+        """
+        Meshes stored as float32 should use half the memory
+        and still produce accurate mass properties.
+        """
+        m = g.get_mesh('featuretype.STL')
+        s = g.get_mesh('featuretype.STL', precision='float32')
+
+        assert m.precision == 'float64'
+        assert s.precision == 'float32'
+        assert s.vertices.dtype == g.np.float32
+        assert s.faces.dtype == g.np.int32
+        assert s.vertices.nbytes * 2 == m.vertices.nbytes
+        assert s.faces.nbytes * 2 == m.faces.nbytes
+
+        # hot cached properties stay in the stored precision
+        assert s.triangles.dtype == g.np.float32
+        assert s.face_normals.dtype == g.np.float32
+        assert s.edges.dtype == g.np.int32
+
+        # normals computed rather than loaded are also stored
+        # in the same precision, including degenerate faces
+        c = g.trimesh.Trimesh(vertices=m.vertices,
+                              faces=g.np.vstack((m.faces, [[0, 0, 1]])),
+                              process=False,
+                              precision='float32')
+        assert 'face_normals' not in c._cache
+        assert c.face_normals.dtype == g.np.float32
+        assert g.np.allclose(c.face_normals[:-1],
+                             g.trimesh.triangles.normals(m.triangles)[0],
+                             atol=1e-5)
+        assert g.np.allclose(c.face_normals[-1], 0.0)
+
+        # reductions are promoted internally
+        assert g.np.isclose(s.volume, m.volume, rtol=1e-5)
+        assert g.np.allclose(s.center_mass, m.center_mass, atol=1e-4)
+
+        # copies keep the precision
+        assert s.copy().vertices.dtype == g.np.float32
+
+        # converting back restores the default dtypes
+        s.precision = 'float64'
+        assert s.vertices.dtype == g.np.float64
+        assert s.faces.dtype == g.np.int64
+
+        with self.assertRaises(ValueError):
+            s.precision = 'float16'
+
+        # indexes past int32 can't be stored
+        with self.assertRaises(ValueError):
+            g.trimesh.Trimesh(vertices=m.vertices,
+                              faces=[[0, 1, 2 ** 40]],
+                              process=False,
+                              precision='float32')
+
+        p = g.trimesh.PointCloud(m.vertices, precision='float32')
+        assert p.vertices.dtype == g.np.float32
+
 
 if __name__ == '__main__':
     g.trimesh.util.attach_to_log()
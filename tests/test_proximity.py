@@ -4,6 +4,56 @@ except BaseException:
     import generic as g
 
 
+def closest_point_loop(mesh, points):
+    """
+    The previous implementation of `proximity.closest_point` which
+    reduces candidates one point at a time in a Python loop, kept
+    as a reference for results and benchmarking.
+    """
+    points = g.np.asanyarray(points, dtype=g.np.float64)
+    candidates = g.trimesh.proximity.nearby_faces(mesh, points)
+    triangles = mesh.triangles.view(g.np.ndarray)
+
+    query_point = g.deque()
+    query_tri = g.deque()
+    for triangle_ids, point in zip(candidates, points):
+        query_point.append(g.np.tile(point, (len(triangle_ids), 1)))
+        query_tri.append(triangles[triangle_ids])
+    query_point = g.np.vstack(query_point)
+    query_tri = g.np.vstack(query_tri)
+
+    query_close = g.trimesh.triangles.closest_point(query_tri, query_point)
+    query_group = g.np.cumsum(g.np.array([len(i) for i in candidates]))[:-1]
+    distance_2 = ((query_close - query_point) ** 2).sum(axis=1)
+
+    result_close = g.np.zeros((len(points), 3), dtype=g.np.float64)
+    result_tid = g.np.zeros(len(points), dtype=g.np.int64)
+    result_distance = g.np.zeros(len(points), dtype=g.np.float64)
+
+    for i, close_points, distance, candidate in zip(
+            g.np.arange(len(points)),
+            g.np.array_split(query_close, query_group),
+            g.np.array_split(distance_2, query_group),
+            candidates):
+        idx = distance.argmin()
+        if len(candidate) > 1:
+            idxs = distance.argsort()[:2]
+            check_distance = distance[idxs].ptp() < g.tol.merge
+            check_magnitude = (g.np.abs(distance[idxs]) > g.tol.merge).all()
+            if check_distance and check_magnitude:
+                normals = mesh.face_normals[g.np.array(candidate)[idxs]]
+                vectors = ((points[i] - close_points[idxs]) /
+                           distance[idxs, g.np.newaxis] ** 0.5)
+                dots = g.trimesh.util.diagonal_dot(normals, vectors)
+                idx = idxs[dots.argmax()]
+        result_close[i] = close_points[idx]
+        result_tid[i] = candidate[idx]
+        result_distance[i] = distance[idx]
+    result_distance **= .5
+
+    return result_close, result_distance, result_tid
+
+
 class NearestTest(g.unittest.TestCase):
 
     def test_naive(self):
@@ -198,6 +248,147 @@ class NearestTest(g.unittest.TestCase):
                 g.np.all(faceIdxsB == faceIdxsB[0]) and
                 faceIdxsA[0] != faceIdxsB[0])
 
+    def test_closest_point_loop(self):
+        # the vectorized closest point should exactly match
+        # the previous loop implementation, including ties
+        meshes = [g.trimesh.creation.icosphere(),
+                  g.trimesh.creation.box(),
+                  g.get_mesh('featuretype.STL')]
+        for mesh in meshes:
+            points = g.np.vstack((
+                mesh.sample(500),
+                mesh.vertices,
+                mesh.triangles_center,
+                # points just off vertices have many tied faces
+                mesh.vertices + (g.np.random.random(
+                    mesh.vertices.shape) - .5) * 2e-4,
+                (g.np.random.random((500, 3)) - .5) * mesh.extents * 1.5 +
+                mesh.centroid))
+
+            a = closest_point_loop(mesh, points)
+            # use the same candidates as the loop
+            candidates = g.trimesh.proximity.nearby_faces(mesh, points)
+            b = g.trimesh.proximity._closest_candidates(
+                mesh,
+                points,
+                g.np.concatenate(candidates).astype(g.np.int64),
+                [len(i) for i in candidates])
+            # the BVH search finds different candidates
+            c = g.trimesh.proximity.closest_point(mesh, points)
+
+            for x, y in zip(a, b):
+                assert g.np.array_equal(x, y)
+            assert g.np.allclose(a[1], c[1])
+
+    def test_bvh_candidates(self):
+        # a coarse mesh with points far away should only
+        # need a few candidates from the BVH search
+        mesh = g.trimesh.creation.icosphere(subdivisions=2)
+        points = g.trimesh.unitize(
+            g.np.random.random((200, 3)) - .5) * 10.0
+
+        candidates = g.trimesh.proximity.nearby_faces(mesh, points)
+        tri, count = g.trimesh.proximity.nearby_faces_bvh(
+            mesh, points, batch_size=33)
+        assert count.sum() == len(tri)
+        assert count.sum() < sum(len(i) for i in candidates)
+
+        # check against every triangle
+        truth = g.trimesh.proximity.closest_point_naive(mesh, points)
+        check = g.trimesh.proximity.closest_point(mesh, points)
+        assert g.np.allclose(truth[1], check[1])
+        assert g.np.allclose(truth[0], check[0])
+
+    def test_bvh_ties(self):
+        # points just off vertices have many faces tied within
+        # merge distance which the tie- break needs to see
+        mesh = g.get_mesh('featuretype.STL')
+        random = g.np.random.RandomState(7)
+        points = mesh.vertices[random.randint(
+            len(mesh.vertices), size=5000)]
+        points = points + (random.random_sample(points.shape) - .5) * 2e-4
+
+        candidates = g.trimesh.proximity.nearby_faces(mesh, points)
+        tri, count = g.trimesh.proximity.nearby_faces_bvh(mesh, points)
+        start = g.np.cumsum(count) - count
+        for i, candidate in enumerate(candidates):
+            close = g.trimesh.triangles.closest_point(
+                mesh.triangles[candidate],
+                g.np.tile(points[i], (len(candidate), 1)))
+            distance = ((close - points[i]) ** 2).sum(axis=1)
+            # every face the squared distance tie test could use
+            tied = g.np.array(candidate)[
+                distance - distance.min() < g.tol.merge]
+            assert set(tied).issubset(tri[start[i]:start[i] + count[i]])
+
+        # and the BVH should pick the same faces as the r-tree
+        truth = g.trimesh.proximity._closest_candidates(
+            mesh,
+            points,
+            g.np.concatenate(candidates).astype(g.np.int64),
+            [len(i) for i in candidates])
+        check = g.trimesh.proximity.closest_point(mesh, points)
+        for a, b in zip(truth, check):
+            assert g.np.array_equal(a, b)
+
+    def test_hausdorff(self):
+        # two spheres with faces which don't line up
+        a = g.trimesh.creation.icosphere(subdivisions=3, radius=1.0)
+        b = g.trimesh.creation.icosphere(subdivisions=3, radius=1.2)
+        rotation = g.trimesh.transformations.euler_matrix(.3, .2, .1)
+        b = g.trimesh.Trimesh(
+            vertices=g.np.dot(b.vertices, rotation[:3, :3].T) + [.05, 0, 0],
+            faces=b.faces)
+        tol = 1e-3
+
+        lower, upper, face = g.trimesh.proximity.directed_hausdorff(
+            a, b, tolerance=tol)
+        assert lower <= upper
+        assert upper - lower <= tol
+        assert g.np.isclose(lower, 0.25, atol=0.02)
+        assert face.shape == (len(a.faces),)
+        assert g.np.isclose(face.max(), lower)
+
+        # no sampled point may be farther than the upper bound
+        samples = a.sample(10000)
+        sampled = g.trimesh.proximity.closest_point(b, samples)[1]
+        assert sampled.max() <= upper + 1e-12
+        assert lower >= sampled.max() - tol
+
+        # the default tolerance should also converge
+        lower, upper, face = g.trimesh.proximity.directed_hausdorff(b, a)
+        assert upper - lower <= b.scale / 1000.0
+
+        distance, dev_a, dev_b = g.trimesh.proximity.hausdorff(
+            a, b, tolerance=tol, return_faces=True)
+        assert g.np.isclose(distance, max(dev_a.max(), dev_b.max()))
+        assert distance >= lower - tol
+
+        # a threshold far below the distance should stop early
+        quick = g.trimesh.proximity.hausdorff(
+            a, b, threshold=0.01)
+        assert quick > 0.01
+
+        # identical meshes are zero distance apart
+        assert g.np.isclose(
+            g.trimesh.proximity.hausdorff(a, a.copy()), 0.0)
+
+    def test_chamfer(self):
+        a = g.trimesh.creation.icosphere(subdivisions=3, radius=1.0)
+        b = g.trimesh.creation.icosphere(subdivisions=3, radius=1.5)
+
+        distance = g.trimesh.proximity.chamfer(a, b, count=2000)
+        # mean distance is roughly the radius difference each way
+        assert g.np.isclose(distance, 1.0, atol=0.05)
+        assert g.np.isclose(
+            g.trimesh.proximity.chamfer(a, a.copy(), count=500),
+            0.0, atol=1e-6)
+
+        # loose tolerance should stop before the full count
+        loose = g.trimesh.proximity.chamfer(
+            a, b, count=100000, tolerance=0.1, batch_size=500)
+        assert g.np.isclose(loose, 1.0, atol=0.1)
+
 
 if __name__ == '__main__':
     g.trimesh.util.attach_to_log()
@@ -143,6 +143,167 @@ class RayTests(g.unittest.TestCase):
                 multiple_hits=True)
             assert len(g.np.unique(index_triangles)) > 2
 
+    def test_chunked(self):
+        """
+        Querying rays in chunks should return the same results
+        as querying every ray at once.
+        """
+        for use_embree in [True, False]:
+            mesh = g.get_mesh('featuretype.STL', use_embree=use_embree)
+
+            ray_origins = (g.np.random.random((1000, 3)) - .5) * mesh.scale
+            ray_origins += mesh.centroid
+            ray_directions = g.trimesh.unitize(
+                g.np.random.random((1000, 3)) - .5)
+
+            truth = mesh.ray.intersects_location(ray_origins,
+                                                 ray_directions)
+            for kwargs in [{'chunk_size': 1},
+                           {'chunk_size': 77},
+                           {'chunk_size': 10000},
+                           {'max_memory': 1e5}]:
+                check = mesh.ray.intersects_location(ray_origins,
+                                                     ray_directions,
+                                                     **kwargs)
+                assert g.np.allclose(g.np.sort(truth[1]),
+                                     g.np.sort(check[1]))
+                if not use_embree:
+                    # native engine results should be identical
+                    for a, b in zip(truth, check):
+                        assert g.np.allclose(a, b)
+
+            # reduce hits into a count per ray with the generator
+            count = g.np.zeros(len(ray_origins), dtype=g.np.int64)
+            for index_tri, index_ray, locations in mesh.ray.intersects_iter(
+                    ray_origins, ray_directions, chunk_size=100):
+                assert len(index_tri) == len(locations)
+                count += g.np.bincount(index_ray, minlength=len(count))
+            assert count.sum() == len(truth[1])
+
+            # no rays should still return consistent shapes
+            empty = mesh.ray.intersects_id(g.np.zeros((0, 3)),
+                                           g.np.zeros((0, 3)),
+                                           chunk_size=10,
+                                           return_locations=True)
+            assert len(empty) == 3
+            assert all(len(i) == 0 for i in empty)
+
+    def test_workers(self):
+        """
+        Splitting rays across processes should return results
+        identical to a single process.
+        """
+        if g.trimesh.shared.shared_memory is None:
+            g.log.warning('skipping test: no shared memory')
+            return
+
+        mesh = g.get_mesh('featuretype.STL', use_embree=False)
+        ray_origins = (g.np.random.random((1000, 3)) - .5) * mesh.scale
+        ray_origins += mesh.centroid
+        ray_directions = g.trimesh.unitize(
+            g.np.random.random((1000, 3)) - .5)
+
+        truth = mesh.ray.intersects_location(ray_origins,
+                                             ray_directions)
+        check = mesh.ray.intersects_location(ray_origins,
+                                             ray_directions,
+                                             workers=2)
+        for a, b in zip(truth, check):
+            assert g.np.array_equal(a, b)
+
+        truth = mesh.ray.intersects_any(ray_origins, ray_directions)
+        check = mesh.ray.intersects_any(ray_origins,
+                                        ray_directions,
+                                        workers=3,
+                                        chunk_size=100)
+        assert (truth == check).all()
+
+        # pools are kept and reused between queries
+        pools = g.trimesh.ray.ray_triangle._pools
+        pool = pools[3]
+        check = mesh.ray.intersects_any(ray_origins,
+                                        ray_directions,
+                                        workers=3)
+        assert (truth == check).all()
+        assert pools[3] is pool
+
+        # workers should attach to the new rays every query
+        check = mesh.ray.intersects_any(ray_origins[::-1],
+                                        ray_directions[::-1],
+                                        workers=3)
+        assert (truth[::-1] == check).all()
+
+        # or a pool may be passed
+        pool = g.multiprocessing.Pool(processes=2)
+        try:
+            tri, ray = mesh.ray.intersects_id(ray_origins,
+                                              ray_directions,
+                                              pool=pool)
+        finally:
+            pool.terminate()
+            pool.join()
+        truth = mesh.ray.intersects_id(ray_origins, ray_directions)
+        assert g.np.array_equal(truth[0], tri)
+        assert g.np.array_equal(truth[1], ray)
+
+    def test_first(self):
+        """
+        The closest hit for each ray should match the minimum
+        distance of every hit along that ray.
+        """
+        sphere = g.trimesh.creation.icosphere()
+        mesh = g.Trimesh(vertices=sphere.vertices,
+                         faces=sphere.faces,
+                         use_embree=False)
+        ray_origins = (g.np.random.random((1000, 3)) - .5) * mesh.scale
+        ray_origins += mesh.centroid
+        ray_directions = g.np.random.random((1000, 3)) - .5
+
+        rt = g.trimesh.ray.ray_triangle
+        (tri_all,
+         ray_all,
+         loc_all,
+         dist_all,
+         bary_all) = rt.ray_triangle_id(mesh.triangles,
+                                        ray_origins,
+                                        ray_directions,
+                                        multiple_hits=True,
+                                        return_distance=True,
+                                        return_barycentric=True)
+        # distance should be along the ray in space
+        assert g.np.allclose(dist_all, g.np.linalg.norm(
+            loc_all - ray_origins[ray_all], axis=1))
+        # barycentric coordinates should reconstruct the location
+        assert g.np.allclose(g.trimesh.triangles.barycentric_to_points(
+            mesh.triangles[tri_all], bary_all), loc_all)
+
+        (tri_first,
+         ray_first,
+         loc_first,
+         dist_first) = rt.ray_triangle_id(mesh.triangles,
+                                          ray_origins,
+                                          ray_directions,
+                                          multiple_hits=False,
+                                          return_distance=True)
+        # one hit per ray, sorted by ray
+        assert (g.np.diff(ray_first) > 0).all()
+        assert g.np.allclose(
+            dist_first,
+            g.trimesh.grouping.group_min(ray_all, dist_all))
+
+        for use_embree in [True, False]:
+            mesh = g.Trimesh(vertices=sphere.vertices,
+                             faces=sphere.faces,
+                             use_embree=use_embree)
+            index, distance = mesh.ray.intersects_first(
+                ray_origins, ray_directions, return_distance=True)
+            assert (index[ray_first] >= 0).all()
+            assert g.np.allclose(distance[ray_first], dist_first)
+            miss = g.np.ones(len(index), dtype=bool)
+            miss[ray_first] = False
+            assert (index[miss] == -1).all()
+            assert g.np.isinf(distance[miss]).all()
+
     def test_contain_single(self):
         # not watertight
         mesh = g.get_mesh("teapot.stl", use_embree=False)
@@ -158,6 +319,33 @@ class RayTests(g.unittest.TestCase):
         for point in mesh.bounding_box.vertices:
             mesh.ray.contains_points([point])
 
+    def test_refit(self):
+        """
+        An explicit refit should pick up vertex changes the
+        mesh hash can't see.
+        """
+        origins = [[0, 0, 20.0]]
+        vectors = [[0, 0, -1.0]]
+        for kwargs in [{'use_embree': True},
+                       {'use_embree': False}]:
+            sphere = g.trimesh.creation.icosphere()
+            mesh = g.trimesh.Trimesh(vertices=sphere.vertices,
+                                     faces=sphere.faces,
+                                     **kwargs)
+            locations = mesh.ray.intersects_location(
+                origins, vectors, multiple_hits=False)[0]
+            assert g.np.allclose(locations[:, 2], 1.0, atol=.01)
+
+            # move the mesh without the hash noticing
+            mesh.vertices.view(g.np.ndarray)[:, 2] += 10.0
+            mesh.ray.refit()
+
+            locations = mesh.ray.intersects_location(
+                origins, vectors, multiple_hits=False)[0]
+            assert len(locations) == 1
+            assert g.np.allclose(locations[:, 2], 11.0, atol=.01)
+            assert g.np.allclose(mesh.triangles[:, :, 2].max(), 11.0)
+
     def test_box(self):
         """
         Run box- ray intersection along Z and make sure XY match
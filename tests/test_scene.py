@@ -267,6 +267,75 @@ class GraphTests(g.unittest.TestCase):
         for i in range(5000):
             g.add_edge(random_chr(), random_chr())
 
+    def test_ray_instanced(self):
+        m = g.trimesh.creation.icosphere()
+        scene = g.trimesh.Scene()
+        for i in range(20):
+            matrix = g.trimesh.transformations.random_rotation_matrix()
+            matrix[:3, :3] *= 1.0 + i / 10.0
+            matrix[:3, 3] = g.np.random.random(3) * 20
+            scene.add_geometry(m,
+                               geom_name='sphere',
+                               node_name='node_{}'.format(i),
+                               transform=matrix)
+
+        origins = g.np.random.random((1000, 3)) * 20
+        vectors = g.trimesh.unitize(g.np.random.random((1000, 3)) - .5)
+
+        # compare against the flattened scene
+        def flat_check():
+            flat = g.trimesh.Trimesh(
+                **g.trimesh.triangles.to_kwargs(scene.triangles))
+            index, distance = flat.ray.intersects_first(
+                origins, vectors, return_distance=True)
+            tri, nodes, check = scene.ray.intersects_first(
+                origins, vectors, return_distance=True)
+            assert g.np.allclose(distance, check)
+            hit = tri >= 0
+            assert hit.any()
+            assert (nodes[~hit] == None).all()  # NOQA
+            # the flattened triangles are in node order
+            node_tri = scene.triangles_node[index[hit]]
+            assert (node_tri == nodes[hit].astype(node_tri.dtype)).all()
+
+            # surface normals are in the world frame
+            surface, ray, _, normals = scene.ray.intersects_surface(
+                origins, vectors)
+            assert g.np.array_equal(surface, index[ray])
+            assert g.np.allclose(normals, flat.face_normals[surface])
+
+            a = scene.ray.intersects_id(origins, vectors)
+            b = flat.ray.intersects_id(origins, vectors)
+            assert len(a[0]) == len(b[0])
+
+        flat_check()
+        # all instances share a single bottom level
+        assert len(scene.ray.geometry) == 1
+
+        # moving a node should only refit the top level
+        tree = scene.ray.tree
+        matrix = scene.graph['node_3'][0].copy()
+        matrix[:3, 3] += 5.0
+        scene.graph.update(frame_to='node_3', matrix=matrix)
+        flat_check()
+        assert scene.ray.tree is tree
+
+        # an unchanged scene shouldn't be checked again
+        state = scene.ray._state
+        scene.ray.intersects_id(origins, vectors)
+        assert scene.ray._state is state
+
+        # two updates in a row should both be seen
+        for offset in [1.0, 2.0]:
+            matrix[:3, 3] += offset
+            scene.graph.update(frame_to='node_3', matrix=matrix)
+            flat_check()
+
+        # changing the geometry should rebuild the top level
+        m.vertices *= 2.0
+        flat_check()
+        assert scene.ray.tree is not tree
+
 
 if __name__ == '__main__':
     g.trimesh.util.attach_to_log()
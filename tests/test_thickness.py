@@ -103,6 +103,42 @@ class ThicknessTest(g.unittest.TestCase):
         assert g.np.isclose(g.np.median(rs), truth)
         assert g.np.isclose(g.np.median(ra), truth)
 
+    def test_medial(self):
+        # an axis aligned plate part
+        m = g.get_mesh('1002_tray_bottom.STL')
+
+        medial = g.trimesh.proximity.medial_axis(m)
+        centers, radii, origins, contacts = medial
+        assert len(centers) == len(m.faces)
+        assert len(radii) == len(origins) == len(contacts)
+
+        # medial spheres are the tangent spheres at each centroid
+        thick = g.trimesh.proximity.thickness(mesh=m,
+                                              points=origins,
+                                              normals=m.face_normals)
+        assert g.np.allclose(radii * 2, thick)
+        assert g.np.isclose(g.np.median(thick), m.extents.min())
+
+        # sampled medial axis is reproducible with a seed
+        g.np.random.seed(7)
+        sampled = g.trimesh.proximity.medial_axis(m, count=1000)
+        g.np.random.seed(7)
+        samples, faces = m.sample(1000, return_index=True)
+        assert g.np.allclose(sampled[2], samples)
+        sphere = g.trimesh.proximity.max_tangent_sphere(
+            mesh=m,
+            points=samples,
+            normals=m.face_normals[faces])
+        assert g.np.allclose(sampled[0], sphere[0], equal_nan=True)
+        assert g.np.allclose(sampled[1], sphere[1])
+
+        # exterior spheres of a box are all infinite
+        box = g.trimesh.creation.box()
+        centers, radii, origins, contacts = g.trimesh.proximity.medial_axis(
+            box, inwards=False)
+        assert g.np.isinf(radii).all()
+        assert g.np.isnan(contacts).all()
+
 
 if __name__ == '__main__':
     g.trimesh.util.attach_to_log()
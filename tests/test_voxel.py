@@ -128,6 +128,43 @@ class VoxelTest(g.unittest.TestCase):
         )
         g.np.testing.assert_allclose(indices, indices2, atol=0, rtol=0)
 
+    def test_sdf_grid(self):
+        mesh = g.trimesh.creation.icosphere(subdivisions=3)
+        pitch = 0.1
+
+        exact, origin = mesh.sdf_grid(pitch=pitch)
+        assert exact.dtype == g.np.float32
+        points = (g.np.indices(exact.shape).reshape((3, -1)).T *
+                  pitch + origin)
+        truth = g.trimesh.proximity.signed_distance(mesh, points)
+        assert g.np.allclose(exact.ravel(), truth, atol=1e-5)
+
+        # a narrow band should match exactly inside the band
+        # and be a first order approximation elsewhere
+        bounds = [[-2, -2, -2], [2, 2, 2]]
+        band, origin = mesh.sdf_grid(pitch=pitch,
+                                     bounds=bounds,
+                                     band=0.2,
+                                     slab_size=7)
+        assert g.np.isfinite(band).all()
+        points = (g.np.indices(band.shape).reshape((3, -1)).T *
+                  pitch + origin)
+        truth = 1.0 - g.np.linalg.norm(points, axis=1)
+        error = g.np.abs(band.ravel() - truth)
+        assert error.max() < pitch
+        # signs should always be correct
+        assert (g.np.sign(band.ravel()) ==
+                g.np.sign(truth)).mean() > .999
+
+        # results should be written into a passed array
+        out = g.np.zeros(band.shape, dtype=g.np.float64)
+        result, origin = mesh.sdf_grid(pitch=pitch,
+                                       bounds=bounds,
+                                       band=0.2,
+                                       out=out)
+        assert result is out
+        assert g.np.allclose(out, band, atol=1e-5)
+
 
 if __name__ == '__main__':
     g.trimesh.util.attach_to_log()
@@ -0,0 +1,54 @@
+try:
+    from . import generic as g
+except BaseException:
+    import generic as g
+
+
+class WindingTest(g.unittest.TestCase):
+
+    def test_exact(self):
+        m = g.get_mesh('featuretype.STL')
+        points = g.trimesh.sample.volume_rectangular(
+            m.extents * 1.2, 100, transform=g.trimesh.transformations.
+            translation_matrix(m.centroid))
+
+        # sum the solid angle of every triangle at every point
+        exact = g.trimesh.winding.solid_angle(
+            g.np.tile(m.triangles, (len(points), 1, 1)),
+            g.np.repeat(points, len(m.triangles), axis=0)).reshape(
+                (len(points), -1)).sum(axis=1) / (4 * g.np.pi)
+
+        # a larger beta should be closer to exact
+        loose = g.trimesh.winding.winding_number(m, points, beta=2.0)
+        tight = g.trimesh.winding.winding_number(m, points, beta=4.0)
+        assert g.np.abs(loose - exact).max() < 0.05
+        assert g.np.abs(tight - exact).max() < 0.01
+
+        # should agree with the exact solid angle sum
+        assert m.is_watertight
+        winding = m.contains(points, method='winding')
+        assert ((exact > .5) == winding).all()
+        # and with ray tests on a watertight mesh, which
+        # can occasionally be wrong where a ray hits an edge
+        assert (m.contains(points) == winding).mean() > .95
+
+    def test_open(self):
+        m = g.trimesh.creation.icosphere()
+        points = g.np.random.random((1000, 3)) * 2.0 - 1.0
+        truth = g.np.linalg.norm(points, axis=1) < .9
+        # remove points close to the surface
+        keep = g.np.abs(g.np.linalg.norm(points, axis=1) - .95) > .1
+        points = points[keep]
+        truth = truth[keep]
+
+        assert (m.contains(points, method='winding') == truth).all()
+
+        # punch a hole in the mesh
+        m.update_faces(g.np.arange(len(m.faces)) > 10)
+        assert not m.is_watertight
+        assert (m.contains(points, method='winding') == truth).all()
+
+
+if __name__ == '__main__':
+    g.trimesh.util.attach_to_log()
+    g.unittest.main()
@@ -8,6 +8,9 @@ provide a fully featured Trimesh object which allows for easy manipulation
 and analysis, in the style of the Polygon object in the Shapely library.
 """
 
+import sys as _sys
+import pkgutil as _pkgutil
+
 # current version
 from .version import __version__
 
@@ -33,6 +36,37 @@ from .exchange.load import (load,
 # avoid a circular import in trimesh.base
 from . import primitives
 
+# submodules which are slow to import or pull in optional
+# dependencies are only imported when first accessed
+_lazy_modules = sorted(
+    _m[1] for _m in _pkgutil.iter_modules(__path__)
+    if not _m[1].startswith('_'))
+
+
+def __getattr__(name):
+    """
+    Import submodules on first access, i.e. `trimesh.voxel`
+    """
+    if name in _lazy_modules:
+        import importlib
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError(
+        'module {} has no attribute {}'.format(__name__, name))
+
+
+if _sys.version_info < (3, 7):
+    # module level __getattr__ is not supported so import
+    # everything now to keep attribute access working, except
+    # the viewer which may need a display just to be imported
+    for _name in _lazy_modules:
+        if _name == 'viewer':
+            continue
+        try:
+            __getattr__(_name)
+        except ImportError:
+            # optional dependencies like shapely may be missing
+            pass
+
 # explicitly list imports in __all__
 # as otherwise flake8 gets mad
 __all__ = [__version__,
@@ -9,32 +9,18 @@ import numpy as np
 
 import copy
 
-from . import ray
 from . import util
 from . import units
-from . import poses
 from . import graph
-from . import voxel
-from . import sample
-from . import repair
 from . import convex
-from . import remesh
 from . import bounds
 from . import caching
 from . import inertia
-from . import nsphere
-from . import boolean
 from . import grouping
 from . import geometry
-from . import permutate
-from . import proximity
+from . import halfedge
 from . import triangles
-from . import collision
-from . import curvature
-from . import smoothing
 from . import comparison
-from . import registration
-from . import decomposition
 from . import intersections
 from . import transformations
 
@@ -48,6 +34,9 @@ from .parent import Geometry
 
 class Trimesh(Geometry):
 
+    # dtypes of vertices and faces, changed with `precision`
+    _dtypes = util.precision_dtypes()
+
     def __init__(self,
                  vertices=None,
                  faces=None,
@@ -61,6 +50,7 @@ class Trimesh(Geometry):
                  use_embree=True,
                  initial_cache={},
                  visual=None,
+                 precision=None,
                  **kwargs):
         """
         A Trimesh object contains a triangular 3D mesh.
@@ -93,8 +83,11 @@ class Trimesh(Geometry):
           things were calculated before creating the mesh object.
         visual : ColorVisuals or TextureVisuals
           Assigned to self.visual
+        precision : None or str
+          'float32' stores vertices as float32 and faces as
+          int32 to halve memory, None or 'float64' for
+          float64 vertices and int64 faces
         """
-
         # self._data stores information about the mesh which
         # CANNOT be regenerated.
         # in the base class all that is stored here is vertex and
@@ -108,13 +101,28 @@ class Trimesh(Geometry):
         # regenerated from self._data, but may be slow to calculate.
         # In order to maintain consistency
         # the cache is cleared when self._data.crc() changes
-        self._cache = caching.Cache(id_function=self._data.fast_hash)
+        # values which only depend on faces are kept when only
+        # vertices change, which is common in deformation loops
+        self._cache = caching.Cache(id_function=self._data.fast_hash,
+                                    data=self._data)
+        # normals may have been passed in rather than computed
+        # so never evict them to stay under the memory budget
+        self._cache.pin('face_normals')
+        self._cache.pin('vertex_normals')
         self._cache.update(initial_cache)
 
+        # the last built BVH and the CRC of the faces it was
+        # built for, which survives the cache being cleared
+        self._bvh_previous = None
+
         # if validate we are allowed to alter the mesh silently
         # to ensure valid results
         self._validate = bool(validate)
 
+        # dtypes to store vertices and faces with
+        if precision is not None:
+            self._dtypes = util.precision_dtypes(precision)
+
         # check for None only to avoid warning messages in subclasses
         if vertices is not None:
             # (n, 3) float, set of vertices
@@ -142,23 +150,12 @@ class Trimesh(Geometry):
         if vertex_normals is not None:
             self.vertex_normals = vertex_normals
 
-        # embree is a much, much faster raytracer written by Intel
-        # if you have pyembree installed you should use it
-        # although both raytracers were designed to have a common API
-        if ray.has_embree and use_embree:
-            self.ray = ray.ray_pyembree.RayMeshIntersector(self)
-        else:
-            # create a ray-mesh query object for the current mesh
-            # initializing is very inexpensive and object is convenient to have.
-            # On first query expensive bookkeeping is done (creation of r-tree),
-            # and is cached for subsequent queries
-            self.ray = ray.ray_triangle.RayMeshIntersector(self)
-
-        # a quick way to get permuted versions of the current mesh
-        self.permutate = permutate.Permutator(self)
-
-        # convenience class for nearest point queries
-        self.nearest = proximity.ProximityQuery(self)
+        # query objects are created on first access so their
+        # modules aren't imported until they are needed
+        self._use_embree = use_embree
+        self._ray = None
+        self._permutate = None
+        self._nearest = None
 
         # store metadata about the mesh in a dictionary
         self.metadata = dict()
@@ -178,6 +175,73 @@ class Trimesh(Geometry):
         # save reference to kwargs
         self._kwargs = kwargs
 
+    @property
+    def ray(self):
+        """
+        A ray-mesh query object for the current mesh.
+
+        Initializing is very inexpensive and the expensive
+        bookkeeping (i.e. creating an r-tree) is done and
+        cached on the first query.
+
+        Returns
+        ----------
+        ray : RayMeshIntersector
+          Uses embree if it is installed and `use_embree`
+          was passed, which is much faster
+        """
+        if self._ray is None:
+            from . import ray
+            # embree is a much, much faster raytracer written by Intel
+            # although both raytracers were designed to have a common API
+            if ray.has_embree and self._use_embree:
+                self._ray = ray.ray_pyembree.RayMeshIntersector(self)
+            else:
+                self._ray = ray.ray_triangle.RayMeshIntersector(self)
+        return self._ray
+
+    @ray.setter
+    def ray(self, value):
+        self._ray = value
+
+    @property
+    def permutate(self):
+        """
+        A quick way to get permuted versions of the current mesh.
+
+        Returns
+        ----------
+        permutate : trimesh.permutate.Permutator
+          Permutator for the current mesh
+        """
+        if self._permutate is None:
+            from . import permutate
+            self._permutate = permutate.Permutator(self)
+        return self._permutate
+
+    @permutate.setter
+    def permutate(self, value):
+        self._permutate = value
+
+    @property
+    def nearest(self):
+        """
+        Convenience object for nearest point queries.
+
+        Returns
+        ----------
+        nearest : trimesh.proximity.ProximityQuery
+          Queries for the current mesh
+        """
+        if self._nearest is None:
+            from . import proximity
+            self._nearest = proximity.ProximityQuery(self)
+        return self._nearest
+
+    @nearest.setter
+    def nearest(self, value):
+        self._nearest = value
+
     def process(self):
         """
         Do the bare minimum processing to make a mesh useful.
@@ -280,11 +344,20 @@ class Trimesh(Geometry):
         """
         if values is None:
             values = []
-        values = np.asanyarray(values, dtype=np.int64)
+        int_dtype = self._dtypes[1]
+        values = np.asanyarray(values)
+        if (values.dtype != int_dtype and
+                np.dtype(int_dtype).itemsize < 8 and
+                values.size > 0 and
+                values.max() > np.iinfo(int_dtype).max):
+            raise ValueError('faces index past the end of {}'.format(
+                np.dtype(int_dtype).name))
+        values = np.asanyarray(values, dtype=int_dtype)
         # automatically triangulate quad faces
         if util.is_shape(values, (-1, 4)):
             log.info('triangulating quad faces')
-            values = geometry.triangulate_quads(values)
+            values = np.asanyarray(geometry.triangulate_quads(values),
+                                   dtype=int_dtype)
         self._data['faces'] = values
 
     @caching.cache_decorator
@@ -330,6 +403,9 @@ class Trimesh(Geometry):
         normals, valid = triangles.normals(
             triangles=self.triangles,
             crosses=self.triangles_cross)
+        # normals are computed in float64 so store them
+        # with the same precision as the vertices
+        normals = normals.astype(self._dtypes[0], copy=False)
 
         # if all triangles are valid shape is correct
         if valid.all():
@@ -339,7 +415,7 @@ class Trimesh(Geometry):
 
         # make a padded list of normals for correct shape
         padded = np.zeros((len(self.triangles), 3),
-                          dtype=np.float64)
+                          dtype=normals.dtype)
         padded[valid] = normals
 
         # put calculated face normals into cache manually
@@ -361,7 +437,7 @@ class Trimesh(Geometry):
             # make sure face normals are C- contiguous float
             values = np.asanyarray(values,
                                    order='C',
-                                   dtype=np.float64)
+                                   dtype=self._dtypes[0])
 
             # check if any values are larger than tol.merge
             # this check is equivalent to but 25% faster than:
@@ -415,7 +491,36 @@ class Trimesh(Geometry):
         """
         self._data['vertices'] = np.asanyarray(values,
                                                order='C',
-                                               dtype=np.float64)
+                                               dtype=self._dtypes[0])
+
+    @property
+    def precision(self):
+        """
+        The precision vertices and faces are stored with.
+
+        Returns
+        ----------
+        precision : str
+          'float64' for float64 vertices and int64 faces, or
+          'float32' for float32 vertices and int32 faces
+        """
+        return np.dtype(self._dtypes[0]).name
+
+    @precision.setter
+    def precision(self, value):
+        """
+        Set the precision, converting stored vertices and faces.
+
+        Parameters
+        --------------
+        value : None or str
+          'float64' or 'float32'
+        """
+        self._dtypes = util.precision_dtypes(value)
+        if 'vertices' in self._data:
+            self.vertices = self._data['vertices']
+        if 'faces' in self._data:
+            self.faces = self._data['faces']
 
     @caching.cache_decorator
     def vertex_normals(self):
@@ -651,7 +756,7 @@ class Trimesh(Geometry):
         populate = self.principal_inertia_components
         return self._cache['principal_inertia_vectors']
 
-    @caching.cache_decorator
+    @caching.cache_decorator(persist=True)
     def principal_inertia_transform(self):
         """
         A transform which moves the current mesh so the principal
@@ -750,6 +855,30 @@ class Trimesh(Geometry):
         tree = triangles.bounds_tree(self.triangles)
         return tree
 
+    @caching.cache_decorator
+    def triangles_bvh(self):
+        """
+        A bounding volume hierarchy containing each face of
+        the mesh, stored in flat arrays for vectorized queries.
+
+        Returns
+        ----------
+        bvh : trimesh.bvh.BVH
+          Each triangle in self.faces is a primitive
+        """
+        # if only vertices have changed since the last tree
+        # was built the topology is still valid and a copy
+        # of the tree can be refit, which is much cheaper
+        faces_crc = self.faces.crc()
+        previous = None
+        if (self._bvh_previous is not None and
+                self._bvh_previous[0] == faces_crc):
+            previous = self._bvh_previous[1]
+        bvh = triangles.bounds_bvh(self.triangles, tree=previous)
+        # keep the tree outside of the cache
+        self._bvh_previous = (faces_crc, bvh)
+        return bvh
+
     @caching.cache_decorator
     def triangles_center(self):
         """
@@ -776,7 +905,30 @@ class Trimesh(Geometry):
         crosses = triangles.cross(self.triangles)
         return crosses
 
-    @caching.cache_decorator
+    @caching.cache_decorator(depends=['faces'])
+    def halfedges(self):
+        """
+        Half- edge connectivity of the mesh, which is computed
+        once for each value of faces and which the edge,
+        adjacency and neighbor properties are views of.
+
+        Returns
+        ---------
+        halfedges : halfedge.HalfEdges
+          Vertex, face, next and twin of every half- edge,
+          with half- edges in the same order as self.edges
+
+        Examples
+        ---------
+        Walk around the faces using a vertex:
+
+        >>> he = mesh.halfedges
+        >>> start = he.outgoing[0]
+        >>> he.face[he.rotate(start)]
+        """
+        return halfedge.HalfEdges(self.faces)
+
+    @caching.cache_decorator(depends=['faces'])
     def edges(self):
         """
         Edges of the mesh (derived from faces).
@@ -786,12 +938,9 @@ class Trimesh(Geometry):
         edges : (n, 2) int
           List of vertex indices making up edges
         """
-        edges, index = geometry.faces_to_edges(self.faces.view(np.ndarray),
-                                               return_index=True)
-        self._cache['edges_face'] = index
-        return edges
+        return self.halfedges.edges
 
-    @caching.cache_decorator
+    @caching.cache_decorator(depends=['faces'])
     def edges_face(self):
         """
         Which face does each edge belong to.
@@ -801,10 +950,9 @@ class Trimesh(Geometry):
         edges_face : (n,) int
           Index of self.faces
         """
-        populate = self.edges
-        return self._cache['edges_face']
+        return self.halfedges.face
 
-    @caching.cache_decorator
+    @caching.cache_decorator(depends=['faces'])
     def edges_unique(self):
         """
         The unique edges of the mesh.
@@ -814,13 +962,12 @@ class Trimesh(Geometry):
         edges_unique : (n, 2) int
           Vertex indices for unique edges
         """
-        unique, inverse = grouping.unique_rows(self.edges_sorted)
-        edges_unique = self.edges_sorted[unique]
+        halfedges = self.halfedges
         # edges_unique will be added automatically by the decorator
         # additional terms generated need to be added to the cache manually
-        self._cache['edges_unique_idx'] = unique
-        self._cache['edges_unique_inverse'] = inverse
-        return edges_unique
+        self._cache['edges_unique_idx'] = halfedges.edges_unique_idx
+        self._cache['edges_unique_inverse'] = halfedges.edge
+        return halfedges.edges_unique
 
     @caching.cache_decorator
     def edges_unique_length(self):
@@ -836,7 +983,7 @@ class Trimesh(Geometry):
         length = np.linalg.norm(vector, axis=1)
         return length
 
-    @caching.cache_decorator
+    @caching.cache_decorator(depends=['faces'])
     def edges_unique_inverse(self):
         """
         Return the inverse required to reproduce
@@ -850,10 +997,9 @@ class Trimesh(Geometry):
         inverse : (len(self.edges),) int
           Indexes of self.edges_unique
         """
-        populate = self.edges_unique
-        return self._cache['edges_unique_inverse']
+        return self.halfedges.edge
 
-    @caching.cache_decorator
+    @caching.cache_decorator(depends=['faces'])
     def edges_sorted(self):
         """
         Edges sorted along axis 1
@@ -863,8 +1009,7 @@ class Trimesh(Geometry):
         edges_sorted : (n, 2)
           Same as self.edges but sorted along axis 1
         """
-        edges_sorted = np.sort(self.edges, axis=1)
-        return edges_sorted
+        return self.halfedges.edges_sorted
 
     @caching.cache_decorator
     def edges_sparse(self):
@@ -894,15 +1039,16 @@ class Trimesh(Geometry):
         count : int
           Number of connected vertex groups
         """
+        from scipy.sparse import csgraph
         # labels are (len(vertices), int) OB
-        count, labels = graph.csgraph.connected_components(
+        count, labels = csgraph.connected_components(
             self.edges_sparse,
             directed=False,
             return_labels=True)
         self._cache['vertices_component_label'] = labels
         return count
 
-    @caching.cache_decorator
+    @caching.cache_decorator(depends=['faces'])
     def faces_unique_edges(self):
         """
         For each face return which indexes in mesh.unique_edges constructs
@@ -930,10 +1076,8 @@ class Trimesh(Geometry):
                 [ 1727, 24225],
                 [ 6946, 24225]]])
         """
-        # make sure we have populated unique edges
-        populate = self.edges_unique
-        # we are relying on the fact that edges are stacked in triplets
-        result = self._cache['edges_unique_inverse'].reshape((-1, 3))
+        # half- edges are stacked in triplets for each face
+        result = self.halfedges.edge.reshape((-1, 3))
         return result
 
     @caching.cache_decorator
@@ -1152,7 +1296,7 @@ class Trimesh(Geometry):
                              **kwargs)
         return meshes
 
-    @caching.cache_decorator
+    @caching.cache_decorator(depends=['faces'], persist=True)
     def face_adjacency(self):
         """
         Find faces that share an edge, which we call here 'adjacent'.
@@ -1188,12 +1332,12 @@ class Trimesh(Geometry):
 
         In [6]: groups = nx.connected_components(graph)
         """
-        adjacency, edges = graph.face_adjacency(mesh=self,
-                                                return_edges=True)
-        self._cache['face_adjacency_edges'] = edges
-        return adjacency
+        halfedges = self.halfedges
+        self._cache['face_adjacency_edges'] = halfedges.edges_sorted[
+            halfedges.shared]
+        return halfedges.face_adjacency
 
-    @caching.cache_decorator
+    @caching.cache_decorator(depends=['faces'])
     def face_adjacency_edges(self):
         """
         Returns the edges that are shared by the adjacent faces.
@@ -1254,7 +1398,7 @@ class Trimesh(Geometry):
         are_convex = self.face_adjacency_projections < tol.merge
         return are_convex
 
-    @caching.cache_decorator
+    @caching.cache_decorator(depends=['faces'])
     def face_adjacency_unshared(self):
         """
         Return the vertex index of the two vertices not in the shared
@@ -1327,13 +1471,14 @@ class Trimesh(Geometry):
     def vertex_neighbors(self):
         """
         The vertex neighbors of each vertex of the mesh, determined from
-        the cached vertex_adjacency_graph, if already existent.
+        the unique edges of the half- edge structure.
 
         Returns
         ----------
         vertex_neighbors : (len(self.vertices),) int
           Represents immediate neighbors of each vertex along
-          the edge of a triangle
+          the edge of a triangle, sorted by vertex index rather
+          than in the order of `vertex_adjacency_graph`
 
         Examples
         ----------
@@ -1344,10 +1489,8 @@ class Trimesh(Geometry):
         >>> mesh.vertex_neighbors[0]
         [1,2,3,4]
         """
-        graph = self.vertex_adjacency_graph
-        neighbors = [list(graph.neighbors(i)) for
-                     i in range(len(self.vertices))]
-        return np.array(neighbors)
+        neighbors = self.halfedges.neighbors(count=len(self.vertices))
+        return np.array([n.tolist() for n in neighbors])
 
     @caching.cache_decorator
     def is_winding_consistent(self):
@@ -1380,10 +1523,10 @@ class Trimesh(Geometry):
         """
         if self.is_empty:
             return False
-        watertight, winding = graph.is_watertight(
-            edges=self.edges, edges_sorted=self.edges_sorted)
-        self._cache['is_winding_consistent'] = winding
-        return watertight
+        halfedges = self.halfedges
+        self._cache['is_winding_consistent'] = (
+            halfedges.is_winding_consistent)
+        return halfedges.is_watertight
 
     @caching.cache_decorator
     def is_volume(self):
@@ -1477,7 +1620,7 @@ class Trimesh(Geometry):
 
         return nondegenerate
 
-    @caching.cache_decorator
+    @caching.cache_decorator(persist=True)
     def facets(self):
         """
         Return a list of face indices for coplanar adjacent faces.
@@ -1615,6 +1758,7 @@ class Trimesh(Geometry):
           Fix normals across multiple bodies
           if None automatically pick from body_count
         """
+        from . import repair
         if multibody is None:
             multibody = self.body_count > 1
         repair.fix_normals(self, multibody=multibody)
@@ -1628,6 +1772,7 @@ class Trimesh(Geometry):
         watertight : bool
           Is the mesh watertight after the function completes
         """
+        from . import repair
         return repair.fill_holes(self)
 
     def register(self, other, **kwargs):
@@ -1658,6 +1803,7 @@ class Trimesh(Geometry):
         cost : float
           Average square distance per point
         """
+        from . import registration
         mesh_to_other, cost = registration.mesh_other(mesh=self,
                                                       other=other,
                                                       **kwargs)
@@ -1709,6 +1855,7 @@ class Trimesh(Geometry):
         probs : (n,) float
           A probability ranging from 0.0 to 1.0 for each pose
         """
+        from . import poses
         return poses.compute_stable_poses(mesh=self,
                                           center_mass=center_mass,
                                           sigma=sigma,
@@ -1731,6 +1878,7 @@ class Trimesh(Geometry):
           and an additional postprocessing step will be required to
           make resulting mesh watertight
         """
+        from . import remesh
         vertices, faces = remesh.subdivide(vertices=self.vertices,
                                            faces=self.faces,
                                            face_index=face_index)
@@ -1908,7 +2056,7 @@ class Trimesh(Geometry):
 
         return new_mesh
 
-    @caching.cache_decorator
+    @caching.cache_decorator(persist=True)
     def convex_hull(self):
         """
         Get a new Trimesh object representing the convex hull of
@@ -1942,6 +2090,7 @@ class Trimesh(Geometry):
         face_index : (count, ) int
           Index of self.faces
         """
+        from . import sample
         samples, index = sample.sample_surface(self, count)
         if return_index:
             return samples, index
@@ -2124,11 +2273,40 @@ class Trimesh(Geometry):
         voxelized : Voxel object
           Representing the current mesh
         """
+        from . import voxel
         voxelized = voxel.VoxelMesh(self,
                                     pitch=pitch,
                                     **kwargs)
         return voxelized
 
+    def sdf_grid(self, pitch, bounds=None, band=None, **kwargs):
+        """
+        Sample the signed distance to the mesh on a regular grid.
+
+        Parameters
+        ----------
+        pitch : float
+          Distance between adjacent grid points
+        bounds : None or (2, 3) float
+          Region to sample, or mesh bounds if None
+        band : None or float
+          Only compute exact distances this close to the surface
+          and fill the rest of the grid with an eikonal solver
+
+        Returns
+        ----------
+        sdf : (l, m, n) float32
+          Signed distance, positive inside the mesh
+        origin : (3,) float
+          Position of sdf[0, 0, 0] in space
+        """
+        from . import voxel
+        return voxel.sdf_grid(self,
+                              pitch=pitch,
+                              bounds=bounds,
+                              band=band,
+                              **kwargs)
+
     def outline(self, face_ids=None, **kwargs):
         """
         Given a list of face indexes find the outline of those
@@ -2304,7 +2482,7 @@ class Trimesh(Geometry):
                             faces_sequence=faces_sequence,
                             **kwargs)
 
-    @caching.cache_decorator
+    @caching.cache_decorator(persist=True)
     def identifier(self):
         """
         Return a float vector which is unique to the mesh
@@ -2408,6 +2586,7 @@ class Trimesh(Geometry):
         meshes : list of trimesh.Trimesh
           List of convex meshes that approximate the original
         """
+        from . import decomposition
         result = decomposition.convex_decomposition(self,
                                                     engine=engine,
                                                     maxhulls=maxhulls,
@@ -2428,6 +2607,7 @@ class Trimesh(Geometry):
         union : trimesh.Trimesh
           Union of self and other Trimesh objects
         """
+        from . import boolean
         result = boolean.union(meshes=np.append(self, other),
                                engine=engine)
         return result
@@ -2446,6 +2626,7 @@ class Trimesh(Geometry):
         difference : trimesh.Trimesh
           Difference between self and other Trimesh objects
         """
+        from . import boolean
         result = boolean.difference(meshes=np.append(self, other),
                                     engine=engine)
         return result
@@ -2464,25 +2645,38 @@ class Trimesh(Geometry):
         intersection : trimesh.Trimesh
           Mesh of the volume contained by all passed meshes
         """
+        from . import boolean
         result = boolean.intersection(meshes=np.append(self, other),
                                       engine=engine)
         return result
 
-    def contains(self, points):
+    def contains(self, points, method='ray'):
         """
         Given a set of points, determine whether or not they are inside the mesh.
-        This raises an error if called on a non- watertight mesh.
+
+        The default method counts ray hits and warns if called on a
+        non- watertight mesh. The 'winding' method thresholds the
+        generalized winding number, which is robust to holes and
+        self- intersections.
 
         Parameters
         ---------
         points : (n, 3) float
           Points in cartesian space
+        method : str
+          Either 'ray' or 'winding'
 
         Returns
         ---------
         contains : (n, ) bool
           Whether or not each point is inside the mesh
         """
+        from . import winding
+        if method == 'winding':
+            return winding.contains(self, points)
+        elif method != 'ray':
+            raise ValueError('method must be ray or winding!')
+
         if not self.is_watertight:
             log.warning('Mesh is non- watertight for contained point query!')
         contains = self.ray.contains_points(points)
@@ -2512,6 +2706,7 @@ class Trimesh(Geometry):
                 dtype: float
                 shape: (len(self.vertices), len(self.faces))
         """
+        from . import curvature
         angles = curvature.face_angles_sparse(self)
         return angles
 
@@ -2530,6 +2725,7 @@ class Trimesh(Geometry):
         vertex_defect : (len(self.vertices), ) float
           Vertex defect at the every vertex
         """
+        from . import curvature
         defects = curvature.vertex_defects(self)
         return defects
 
@@ -2551,25 +2747,42 @@ class Trimesh(Geometry):
         tree = util.bounds_tree(segment_bounds)
         return tree
 
-    def copy(self):
+    def copy(self, cache=False):
         """
         Safely get a copy of the current mesh.
 
+        Vertices and faces are shared with the current mesh
+        until either mesh writes to them. The current mesh stays
+        writable and the copy takes its own data before the
+        first write, while writes to the copy copy its data
+        first. Item assignment, in- place operators, methods
+        like `fill` or `sort`, `flat`, ufunc `out` and functions
+        like `np.copyto` are all seen, but writes through a
+        plain numpy.ndarray view, i.e. from `np.asarray` or
+        `view(np.ndarray)`, aren't and will change both meshes.
+
         Copied objects will have emptied caches to avoid memory
         issues and so may be slow on initial operations until
-        caches are regenerated.
+        caches are regenerated unless `cache` is passed.
 
         Current object will *not* have its cache cleared.
 
+        Parameters
+        ------------
+        cache : bool
+          Copy cached values like `face_adjacency` which
+          are valid for the copied mesh
+
         Returns
         ---------
         copied : trimesh.Trimesh
           Copy of current mesh
         """
         copied = Trimesh()
+        copied._dtypes = self._dtypes
 
-        # copy vertex and face data
-        copied._data.data = copy.deepcopy(self._data.data)
+        # share vertex and face data until it is changed
+        copied._data.share(self._data)
         # copy visual information
         copied.visual = self.visual.copy()
         # get metadata
@@ -2581,9 +2794,55 @@ class Trimesh(Geometry):
 
         # make sure cache is set from here
         copied._cache.clear()
+        if cache:
+            values = self._cache.copy_values()
+            for key in values:
+                if key in self._cache._depends:
+                    copied._cache.depend(
+                        key, self._cache._depends[key])
+            copied._cache.update(values)
 
         return copied
 
+    def to_shared(self, cache=None):
+        """
+        Publish the mesh into shared memory, so worker processes
+        can get it with `Trimesh.from_shared` without copying
+        or pickling the arrays. Requires Python 3.8+.
+
+        Parameters
+        ------------
+        cache : None or sequence of str
+          Names of cached arrays to publish with the mesh,
+          if None face normals and face adjacency
+
+        Returns
+        ------------
+        published : trimesh.shared.SharedArrays
+          Pass `published.spec` to workers and call `close`
+          or use it as a context manager when they are done
+        """
+        from . import shared
+        return shared.publish_mesh(self, cache=cache)
+
+    @classmethod
+    def from_shared(cls, spec):
+        """
+        Get a read- only mesh published by `Trimesh.to_shared`.
+
+        Parameters
+        ------------
+        spec : dict
+          The `spec` of the value returned by `to_shared`
+
+        Returns
+        ------------
+        mesh : trimesh.Trimesh
+          Mesh viewing memory shared with other processes
+        """
+        from . import shared
+        return shared.attach_mesh(spec)
+
     def eval_cached(self, statement, *args):
         """
         Evaluate a statement and cache the result before returning.
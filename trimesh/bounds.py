@@ -5,17 +5,10 @@ from .constants import log
 
 from . import util
 from . import convex
-from . import nsphere
 from . import grouping
 from . import triangles
 from . import transformations
 
-try:
-    from scipy import spatial
-    from scipy import optimize
-except ImportError:
-    log.warning('Scipy import failed!')
-
 
 def oriented_bounds_2D(points, qhull_options='QbB'):
     """
@@ -36,6 +29,7 @@ def oriented_bounds_2D(points, qhull_options='QbB'):
        Size of extents once input points are transformed
        by transform
     """
+    from scipy import spatial
     # make sure input is a numpy array
     points = np.asanyarray(points)
     # create a convex hull object of our points
@@ -124,6 +118,7 @@ def oriented_bounds(obj, angle_digits=1, ordered=True):
     extents: (3,) float
       The extents of the mesh once transformed with to_origin
     """
+    from scipy import spatial
 
     # extract a set of convex hull vertices and normals from the input
     # we bother to do this to avoid recomputing the full convex hull if
@@ -248,6 +243,8 @@ def minimum_cylinder(obj, sample_count=6, angle_tol=.001):
         'transform' : (4,4) float, transform from the origin
                       to centered cylinder
     """
+    from scipy import optimize
+    from . import nsphere
 
     def volume_from_angles(spherical, return_data=False):
         """
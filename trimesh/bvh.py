@@ -0,0 +1,457 @@
+"""
+bvh.py
+-------------
+
+A bounding volume hierarchy of axis aligned boxes which is
+stored in flat numpy arrays so that both construction and
+queries are vectorized over whole batches rather than done
+one query at a time in a Python loop.
+"""
+import numpy as np
+
+from collections import deque
+
+from . import util
+
+
+class BVH(object):
+    """
+    A binary tree of axis aligned bounding boxes over a set
+    of primitives (usually triangles).
+
+    Nodes are stored breadth- first in flat arrays. Every node
+    references a contiguous range of `order`, which is a
+    permutation of primitive indexes, so the primitives under
+    any node are `order[start[i]:start[i] + count[i]]`.
+    """
+
+    def __init__(self, bounds, leaf_size=4):
+        """
+        Build a hierarchy from the bounds of primitives.
+
+        Parameters
+        ------------
+        bounds : (n, 2, 3) float
+          Axis aligned bounds of each primitive
+        leaf_size : int
+          Maximum number of primitives in a leaf node
+        """
+        bounds = np.asanyarray(bounds, dtype=np.float64)
+        if not util.is_shape(bounds, (-1, 2, 3)):
+            raise ValueError('bounds must be (n, 2, 3)!')
+        if len(bounds) == 0:
+            raise ValueError('can\'t build BVH with no primitives!')
+
+        self.leaf_size = max(int(leaf_size), 1)
+        self._build(bounds)
+
+    def _build(self, bounds):
+        """
+        Construct the node topology with a median split along
+        the longest axis of the primitive centers, processing
+        every node on a level at once.
+
+        Parameters
+        ------------
+        bounds : (n, 2, 3) float
+          Axis aligned bounds of each primitive
+        """
+        centers = bounds.mean(axis=1)
+        order = np.arange(len(bounds))
+
+        # the range of order for the nodes on the current level
+        level_start = np.zeros(1, dtype=np.int64)
+        level_count = np.array([len(bounds)], dtype=np.int64)
+
+        starts = deque()
+        counts = deque()
+        children = deque()
+        # the index of the first node on each level
+        levels = [0]
+
+        while len(level_start) > 0:
+            # the index of the first node on the next level
+            offset = levels[-1] + len(level_start)
+
+            # only split nodes that have too many primitives
+            split = level_count > self.leaf_size
+            split_start = level_start[split]
+            split_count = level_count[split]
+
+            # the flat positions in order for every primitive
+            # contained by a node which is being split
+            node, position = _segment_index(split_start, split_count)
+
+            # pick the longest axis of the centers in each node
+            center = centers[order[position]]
+            box_min = np.full((len(split_start), 3), np.inf)
+            box_max = np.full((len(split_start), 3), -np.inf)
+            np.minimum.at(box_min, node, center)
+            np.maximum.at(box_max, node, center)
+            axis = (box_max - box_min).argmax(axis=1)
+
+            # sort primitives inside each node by center on the axis
+            # using node as the major key keeps each node contiguous
+            key = center[np.arange(len(node)), axis[node]]
+            order[position] = order[position][np.lexsort((key, node))]
+
+            # the median split gives a balanced tree
+            left = split_count // 2
+            child = np.full((len(level_start), 2), -1, dtype=np.int64)
+            child[split] = (offset + np.arange(
+                len(split_start) * 2)).reshape((-1, 2))
+
+            starts.append(level_start)
+            counts.append(level_count)
+            children.append(child)
+
+            # the next level is the children of the split nodes
+            level_start = np.column_stack(
+                (split_start, split_start + left)).ravel()
+            level_count = np.column_stack(
+                (left, split_count - left)).ravel()
+            levels.append(offset)
+
+        self.order = order
+        self.start = np.concatenate(starts)
+        self.count = np.concatenate(counts)
+        self.children = np.vstack(children)
+        self.leaf = self.children[:, 0] < 0
+        # the node index where each level begins
+        self._levels = np.array(levels, dtype=np.int64)
+        self.bounds = np.zeros((len(self.start), 2, 3),
+                               dtype=np.float64)
+        self.refit(bounds)
+
+    @property
+    def arrays(self):
+        """
+        The flat arrays which completely define the tree.
+
+        Returns
+        ------------
+        arrays : dict
+          Numpy arrays keyed by attribute name
+        """
+        return {'order': self.order,
+                'start': self.start,
+                'count': self.count,
+                'children': self.children,
+                'bounds': self.bounds,
+                'levels': self._levels,
+                'leaf_size': np.array(self.leaf_size)}
+
+    @property
+    def nbytes(self):
+        """
+        Memory used by the arrays of the tree.
+
+        Returns
+        ------------
+        nbytes : int
+          Total bytes of every array
+        """
+        return sum(int(v.nbytes) for v in self.arrays.values()) + int(
+            self.leaf.nbytes)
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Create a tree from arrays without rebuilding it.
+
+        Parameters
+        ------------
+        arrays : dict
+          As returned by `BVH.arrays`
+
+        Returns
+        ------------
+        tree : BVH
+          Tree referencing the passed arrays
+        """
+        tree = cls.__new__(cls)
+        tree.order = arrays['order']
+        tree.start = arrays['start']
+        tree.count = arrays['count']
+        tree.children = arrays['children']
+        tree.bounds = arrays['bounds']
+        tree._levels = arrays['levels']
+        tree.leaf_size = int(arrays['leaf_size'])
+        tree.leaf = tree.children[:, 0] < 0
+        return tree
+
+    def copy(self):
+        """
+        Get a copy of the tree which may be refit without
+        changing this one.
+
+        The topology arrays are never changed after the tree is
+        built so they are shared, and only bounds is copied.
+
+        Returns
+        ------------
+        copied : BVH
+          Tree with the same topology and bounds
+        """
+        copied = BVH.__new__(BVH)
+        copied.__dict__.update(self.__dict__)
+        copied.bounds = self.bounds.copy()
+        return copied
+
+    def refit(self, bounds):
+        """
+        Update the bounds of every node for new primitive bounds
+        without altering the topology of the tree.
+
+        This is O(n) and much cheaper than a rebuild, though the
+        quality of the tree can degrade if primitives move a lot.
+
+        Parameters
+        ------------
+        bounds : (n, 2, 3) float
+          New axis aligned bounds of each primitive
+        """
+        bounds = np.asanyarray(bounds, dtype=np.float64)
+        if bounds.shape != (len(self.order), 2, 3):
+            raise ValueError('bounds must match primitive count!')
+
+        # primitive bounds sorted into tree order
+        ordered = bounds[self.order]
+        # leaves reference disjoint ranges of order so
+        # a single segmented reduction gets all leaf bounds
+        leaves = np.nonzero(self.leaf)[0]
+        leaves = leaves[self.start[leaves].argsort()]
+        self.bounds[leaves, 0] = np.minimum.reduceat(
+            ordered[:, 0], self.start[leaves], axis=0)
+        self.bounds[leaves, 1] = np.maximum.reduceat(
+            ordered[:, 1], self.start[leaves], axis=0)
+
+        # walk up the tree one level at a time
+        for a, b in zip(self._levels[:-1][::-1],
+                        self._levels[1:][::-1]):
+            node = np.arange(a, b)
+            node = node[~self.leaf[node]]
+            if len(node) == 0:
+                continue
+            child = self.bounds[self.children[node]]
+            self.bounds[node, 0] = child[:, :, 0].min(axis=1)
+            self.bounds[node, 1] = child[:, :, 1].max(axis=1)
+
+    def ray_candidates(self,
+                       ray_origins,
+                       ray_directions,
+                       buffer_dist=1e-5):
+        """
+        Find every primitive whose leaf box is hit by a ray.
+
+        Traverses the tree for all rays at once, testing each
+        active (ray, node) pair with a slab test.
+
+        Parameters
+        ------------
+        ray_origins : (m, 3) float
+          Ray origin points
+        ray_directions : (m, 3) float
+          Ray direction vectors
+        buffer_dist : float
+          Distance to pad node boxes by
+
+        Returns
+        ------------
+        index_primitive : (p,) int
+          Primitive candidate index
+        index_ray : (p,) int
+          Ray index for each candidate, sorted ascending
+        """
+        ray_origins = np.asanyarray(ray_origins, dtype=np.float64)
+        ray_directions = np.asanyarray(ray_directions, dtype=np.float64)
+
+        # replace zero components so the inverse is finite
+        # a tiny value behaves identically in the slab test
+        directions = ray_directions.copy()
+        directions[np.abs(directions) < 1e-30] = 1e-30
+        inverse = 1.0 / directions
+
+        # start every ray at the root node
+        index_ray = np.arange(len(ray_origins))
+        index_node = np.zeros(len(ray_origins), dtype=np.int64)
+
+        # include an empty array so concatenate never fails
+        leaf_ray = deque([np.zeros(0, dtype=np.int64)])
+        leaf_node = deque([np.zeros(0, dtype=np.int64)])
+        pad = buffer_dist * np.abs(inverse)
+        while len(index_ray) > 0:
+            box = self.bounds[index_node]
+            origin = ray_origins[index_ray]
+            ray_inverse = inverse[index_ray]
+            ray_pad = pad[index_ray]
+            # distance along each ray to the six box planes
+            with np.errstate(over='ignore', invalid='ignore'):
+                t_a = (box[:, 0] - origin) * ray_inverse
+                t_b = (box[:, 1] - origin) * ray_inverse
+            # elementwise operations on the short axes are much
+            # faster than reductions along them
+            near = np.minimum(t_a, t_b) - ray_pad
+            far = np.maximum(t_a, t_b) + ray_pad
+            t_near = np.maximum(np.maximum(near[:, 0], near[:, 1]),
+                                near[:, 2])
+            t_far = np.minimum(np.minimum(far[:, 0], far[:, 1]),
+                               far[:, 2])
+            hit = np.logical_and(t_far >= t_near, t_far >= 0.0)
+
+            index_ray = index_ray[hit]
+            index_node = index_node[hit]
+
+            # leaves are finished and internal nodes
+            # are replaced by both of their children
+            leaf = self.leaf[index_node]
+            leaf_ray.append(index_ray[leaf])
+            leaf_node.append(index_node[leaf])
+
+            internal = np.logical_not(leaf)
+            index_ray = np.repeat(index_ray[internal], 2)
+            index_node = self.children[index_node[internal]].ravel()
+
+        return self._expand(np.concatenate(leaf_node),
+                            np.concatenate(leaf_ray))
+
+    def nearest_candidates(self, points, pad=0.0):
+        """
+        Find every primitive which could be the closest primitive
+        to each point using a branch- and- bound traversal.
+
+        Every face of a node box touches a primitive, which gives
+        an upper bound on the distance to the closest primitive,
+        and nodes whose box is farther away than the best upper
+        bound found so far are pruned.
+
+        Parameters
+        ------------
+        points : (m, 3) float
+          Points in space
+        pad : float
+          Also return primitives which may be up to this much
+          farther away than the closest primitive
+
+        Returns
+        ------------
+        index_primitive : (p,) int
+          Primitive candidate index
+        index_point : (p,) int
+          Point index for each candidate, sorted ascending
+        """
+        points = np.asanyarray(points, dtype=np.float64)
+
+        # the best upper bound on distance for each point
+        upper = np.full(len(points), np.inf)
+
+        # start every point at the root node
+        index_point = np.arange(len(points))
+        index_node = np.zeros(len(points), dtype=np.int64)
+
+        leaf_point = deque([np.zeros(0, dtype=np.int64)])
+        leaf_node = deque([np.zeros(0, dtype=np.int64)])
+        leaf_lower = deque([np.zeros(0, dtype=np.float64)])
+        while len(index_point) > 0:
+            box = self.bounds[index_node]
+            point = points[index_point]
+            # the distance to the closest point on each box
+            gap = np.maximum(np.maximum(box[:, 0] - point,
+                                        point - box[:, 1]), 0.0)
+            lower = np.sqrt((gap ** 2).sum(axis=1))
+            # node boxes are tight so every face of a box touches a
+            # primitive: for each axis a primitive is no farther
+            # than the nearer face plane on that axis combined
+            # with the farther planes of the other two axes
+            near_2 = np.minimum(point - box[:, 0],
+                                box[:, 1] - point) ** 2
+            far_2 = np.maximum(point - box[:, 0],
+                               box[:, 1] - point) ** 2
+            far = np.sqrt(np.maximum((far_2.sum(axis=1).reshape(
+                (-1, 1)) - far_2 + near_2).min(axis=1), 0.0))
+
+            # pairs stay sorted by point so the best bound
+            # for each point is a segmented reduction
+            start = np.nonzero(np.diff(index_point, prepend=-1))[0]
+            segment = index_point[start]
+            upper[segment] = np.minimum(
+                upper[segment], np.minimum.reduceat(far, start))
+
+            keep = lower <= upper[index_point] + pad
+            index_point = index_point[keep]
+            index_node = index_node[keep]
+            lower = lower[keep]
+
+            # leaves are finished and internal nodes
+            # are replaced by both of their children
+            leaf = self.leaf[index_node]
+            leaf_point.append(index_point[leaf])
+            leaf_node.append(index_node[leaf])
+            leaf_lower.append(lower[leaf])
+
+            internal = np.logical_not(leaf)
+            index_point = np.repeat(index_point[internal], 2)
+            index_node = self.children[index_node[internal]].ravel()
+
+        leaf_point = np.concatenate(leaf_point)
+        leaf_node = np.concatenate(leaf_node)
+        # the bound may have improved since leaves were reached
+        keep = (np.concatenate(leaf_lower) <=
+                upper[leaf_point] + pad)
+
+        return self._expand(leaf_node[keep], leaf_point[keep])
+
+    def _expand(self, node, query):
+        """
+        Expand (node, query) pairs into (primitive, query) pairs
+        sorted by query and then primitive.
+
+        Parameters
+        ------------
+        node : (q,) int
+          Index of leaf nodes
+        query : (q,) int
+          Index of query for each leaf
+
+        Returns
+        ------------
+        index_primitive : (p,) int
+          Primitive index
+        index_query : (p,) int
+          Query index for each primitive
+        """
+        group, position = _segment_index(self.start[node],
+                                         self.count[node])
+        index_primitive = self.order[position]
+        index_query = query[group]
+        # sort so results don't depend on traversal order
+        sort = np.lexsort((index_primitive, index_query))
+        return index_primitive[sort], index_query[sort]
+
+
+def _segment_index(start, count):
+    """
+    Given a number of contiguous ranges, return the flat
+    index of every element in every range.
+
+    Parameters
+    ------------
+    start : (n,) int
+      First index of each range
+    count : (n,) int
+      Number of elements in each range
+
+    Returns
+    ------------
+    group : (count.sum(),) int
+      Which range each element came from
+    position : (count.sum(),) int
+      Index of each element
+    """
+    count = np.asanyarray(count, dtype=np.int64)
+    group = np.repeat(np.arange(len(count)), count)
+    # offset of each element within its own range
+    offset = np.arange(count.sum()) - np.repeat(
+        np.cumsum(count) - count, count)
+    position = np.asanyarray(start, dtype=np.int64)[group] + offset
+    return group, position
@@ -8,9 +8,16 @@ and clearing cached values based on those changes.
 
 import numpy as np
 
+import os
+import sys
+import json
 import zlib
 import time
+import weakref
+import threading
 import hashlib
+import tempfile
+import collections
 
 from functools import wraps
 
@@ -26,6 +33,17 @@ try:
 except ImportError:
     hasX = False
 
+# held while changing what is stored in any Cache or the
+# memory budget, so a Cache may be used from many threads
+_mutex = threading.RLock()
+# marks a key which isn't in a dict
+_missing = object()
+# {length : matrix} for combining crc32 of chunks
+_crc_shifts = {}
+# {id(memory owner) : {id(view) : (store, key, view)}} of arrays
+# in a DataStore viewing memory of an array in another one
+_shared = {}
+
 
 def tracked_array(array, dtype=None):
     """
@@ -55,7 +73,7 @@ def tracked_array(array, dtype=None):
     return tracked
 
 
-def cache_decorator(function):
+def cache_decorator(function=None, depends=None, persist=False):
     """
     A decorator for class methods, replaces @property
     but will store and retrieve function return values
@@ -70,7 +88,28 @@ def cache_decorator(function):
       def foo(self, things):
         return 'happy days'
       ```
+    depends : None or sequence of str
+      Keys of the DataStore the value is computed from,
+      so it is kept in the cache when only other keys
+      change. If None it is cleared on any change:
+      ```
+      @cache_decorator(depends=['faces'])
+      def foo(self):
+        return self.faces.max()
+      ```
+    persist : bool
+      Store the value in `caching.disk` if it is enabled,
+      so other processes can load it rather than compute it.
+      Only for values which are a function of `self.md5()`.
     """
+    if function is None:
+        # called with arguments so return a decorator
+        def decorator(function):
+            return cache_decorator(
+                function, depends=depends, persist=persist)
+        return decorator
+    if depends is not None:
+        depends = frozenset(depends)
 
     # use wraps to preseve docstring
     @wraps(function)
@@ -82,26 +121,89 @@ def cache_decorator(function):
         self = args[0]
         # use function name as key in cache
         name = function.__name__
+        cache = self._cache
         # do the dump logic ourselves to avoid
         # verifying cache twice per call
-        self._cache.verify()
+        cache.verify()
         # access cache dict to avoid automatic verification
-        if name in self._cache.cache:
-            # already stored so return value
-            return self._cache.cache[name]
+        # with a single lookup which is safe across threads
+        value = cache.cache.get(name, _missing)
+        if value is not _missing:
+            # already stored so mark as used and return value
+            cache._touch(name)
+            if metrics.enabled:
+                metrics.hit(name)
+            return value
+
+        # only one thread computes each value while
+        # other threads wait for it to be stored
+        with cache._key_lock(name):
+            cache.verify()
+            value = cache.cache.get(name, _missing)
+            if value is not _missing:
+                # computed while we were waiting
+                cache._touch(name)
+                if metrics.enabled:
+                    metrics.hit(name)
+                return value
+            return _compute(self, cache, name, args, kwargs)
+
+    def _compute(self, cache, name, args, kwargs):
+        """
+        Load or compute a value and store it in the cache.
+        """
+        if persist and disk.enabled:
+            stored = disk.load(self, name)
+            if stored is not None and name in stored:
+                # store loaded values as one group
+                if depends is not None:
+                    cache._depends[name] = depends
+                cache._begin(name)
+                try:
+                    for key, value in stored.items():
+                        if key == name or key not in cache.cache:
+                            cache._store(key, value)
+                finally:
+                    cache._end(name)
+                log.debug('%s loaded from disk cache', name)
+                if metrics.enabled:
+                    metrics.load(name)
+                return stored[name]
 
         # time execution
         tic = time.time()
         # value not in cache so execute the function
-        value = function(*args, **kwargs)
+        # while recording that we are computing it so any
+        # extra values it stores are evicted along with it
+        if depends is not None:
+            cache._depends[name] = depends
+        cache._begin(name)
+        try:
+            value = function(*args, **kwargs)
+        finally:
+            cache._end(name)
+        elapsed = time.time() - tic
+        if metrics.enabled:
+            metrics.miss(name, elapsed)
         # store the value
-        self._cache.cache[name] = value
+        cache._store(name, value)
+        if persist and disk.enabled:
+            # save the value and everything stored with it
+            with _mutex:
+                group = cache._members.get(name, [name])
+                values = {k: cache.cache[k] for k in group
+                          if k in cache.cache}
+            try:
+                disk.save(self, name, values)
+            except Exception:
+                log.warning('unable to save %s to disk cache',
+                            name, exc_info=True)
         # debug log execution time
         # this is nice for debugging as you can see when
         # cache is getting dumped all the time
         log.debug('%s was not in cache, executed in %.6f',
                   name,
-                  time.time() - tic)
+                  elapsed)
         return value
 
     # all cached values are also properties
@@ -130,6 +232,11 @@ class TrackedArray(np.ndarray):
     fast_hash : int, CRC or xxhash.xx64
     """
 
+    # size in bytes of the chunks which are hashed separately
+    # so changing part of a large array only rehashes the
+    # chunks which were touched
+    chunk_size = 2 ** 20
+
     def __array_finalize__(self, obj):
         """
         Sets a modified flag on every TrackedArray
@@ -139,10 +246,21 @@ class TrackedArray(np.ndarray):
         self._modified_c = True
         self._modified_m = True
         self._modified_x = True
+        self._chunks = {}
+        # set on arrays stored in a DataStore which share
+        # memory with another DataStore after a copy
+        self._owner = None
+        # views of those arrays keep the array they view
+        self._root = None
+        if self.base is not None:
+            if getattr(obj, '_owner', None) is not None:
+                self._root = obj
+            else:
+                self._root = getattr(obj, '_root', None)
         if isinstance(obj, type(self)):
-            obj._modified_c = True
-            obj._modified_m = True
-            obj._modified_x = True
+            # the new array may be a view which can change the
+            # data of obj, so mark the chunks which it covers
+            obj._mark(obj._view_chunks(self))
 
     def md5(self):
         """
@@ -152,40 +270,35 @@ class TrackedArray(np.ndarray):
         -----------
         md5: str, hexadecimal MD5 of the array
         """
+        # MD5 digests may be stored so always hash the whole
+        # array rather than combining the hashes of chunks
         if self._modified_m or not hasattr(self, '_hashed_md5'):
             if self.flags['C_CONTIGUOUS']:
-                hasher = hashlib.md5(self)
-                self._hashed_md5 = hasher.hexdigest()
+                hasher = hashlib.md5(_as_bytes(self))
             else:
                 # the case where we have sliced our nice
                 # contiguous array into a non- contiguous block
-                # for example (note slice *after* track operation):
-                # t = util.tracked_array(np.random.random(10))[::-1]
-                contiguous = np.ascontiguousarray(self)
-                hasher = hashlib.md5(contiguous)
-                self._hashed_md5 = hasher.hexdigest()
+                hasher = hashlib.md5(
+                    _as_bytes(np.ascontiguousarray(self)))
+            self._hashed_md5 = hasher.hexdigest()
         self._modified_m = False
         return self._hashed_md5
 
     def crc(self):
         """
-        A zlib.crc32 or zlib.adler32 checksum
-        of the current data.
+        A zlib.crc32 checksum of the current data.
+
+        Chunks are combined like zlib's crc32_combine so the
+        result is the same as the checksum of the whole array.
 
         Returns
         -----------
-        crc: int, checksum from zlib.crc32 or zlib.adler32
+        crc: int, checksum from zlib.crc32
         """
-        if self._modified_c or not hasattr(self, '_hashed_crc'):
-            if self.flags['C_CONTIGUOUS']:
-                self._hashed_crc = crc32(self)
-            else:
-                # the case where we have sliced our nice
-                # contiguous array into a non- contiguous block
-                # for example (note slice *after* track operation):
-                # t = util.tracked_array(np.random.random(10))[::-1]
-                contiguous = np.ascontiguousarray(self)
-                self._hashed_crc = crc32(contiguous)
+        if (self._modified_c or self._stale('c') or
+                not hasattr(self, '_hashed_crc')):
+            self._hashed_crc = self._chunk_hash(
+                'c', crc32, _crc_combine)
         self._modified_c = False
         return self._hashed_crc
 
@@ -197,149 +310,438 @@ class TrackedArray(np.ndarray):
         -------------
         xx: int, xxhash.xxh64 hash of array.
         """
-        # repeat the bookkeeping to get a contiguous array inside
-        # the function to avoid additional function calls
-        # these functions are called millions of times so everything helps
-        if self._modified_x or not hasattr(self, '_hashed_xx'):
-            if self.flags['C_CONTIGUOUS']:
-                hasher = xxhash.xxh64(self)
-                self._hashed_xx = hasher.intdigest()
-            else:
-                # the case where we have sliced our nice
-                # contiguous array into a non- contiguous block
-                # for example (note slice *after* track operation):
-                # t = util.tracked_array(np.random.random(10))[::-1]
-                contiguous = np.ascontiguousarray(self)
-                hasher = xxhash.xxh64(contiguous)
-                self._hashed_xx = hasher.intdigest()
+        # these functions are called millions of times
+        # so avoid doing anything if nothing has changed
+        if (self._modified_x or self._stale('x') or
+                not hasattr(self, '_hashed_xx')):
+            self._hashed_xx = self._chunk_hash(
+                'x', _xx_chunk, _xx_combine)
         self._modified_x = False
         return self._hashed_xx
 
-    def __hash__(self):
+    def _stale(self, kind):
         """
-        Hash is required to return an int.
+        Check if a hash type has chunks marked as changed.
+
+        Parameters
+        ------------
+        kind : str
+          Hash type: 'c' or 'x'
 
         Returns
-        -----------
-        hash: int, result of fast_hash
+        ------------
+        stale : bool
+          If chunks have changed since the last hash
         """
-        return self.fast_hash()
+        state = getattr(self, '_chunks', {}).get(kind)
+        return state is not None and state[2]
 
-    def __iadd__(self, *args, **kwargs):
+    def _chunk_hash(self, kind, function, combine):
         """
-        In- place addition.
+        Hash the array in chunks, only rehashing chunks which
+        have been marked as changed since the last call.
+
+        Parameters
+        ------------
+        kind : str
+          Hash type: 'c' or 'x'
+        function : function
+          Hashes a chunk of bytes
+        combine : function
+          Combines a list of chunk hashes, the length in bytes
+          of each chunk and of the last chunk into one hash,
+          which must return the hash of a single chunk as-is
 
-        The i* operations are in- place and modify the array,
-        so we better catch all of them.
+        Returns
+        ------------
+        hashed : any
+          Result of combine
         """
-        self._modified_c = True
-        self._modified_m = True
-        self._modified_x = True
-        return super(self.__class__, self).__iadd__(*args,
-                                                    **kwargs)
+        size = int(self.chunk_size)
+        if not self.flags['C_CONTIGUOUS']:
+            # the case where we have sliced our nice
+            # contiguous array into a non- contiguous block
+            # for example (note slice *after* track operation):
+            # t = util.tracked_array(np.random.random(10))[::-1]
+            # the copy changes every time so don't store chunks
+            data = _as_bytes(np.ascontiguousarray(self))
+        else:
+            data = _as_bytes(self)
+        count = max(1, -(-len(data) // size))
+        # every chunk is the same size except the last
+        last = len(data) - size * (count - 1)
+        if not self.flags['C_CONTIGUOUS']:
+            return combine([function(data[i * size:(i + 1) * size])
+                            for i in range(count)], size, last)
+
+        if not hasattr(self, '_chunks'):
+            self._chunks = {}
+        state = self._chunks.get(kind)
+        if (state is None or
+                getattr(self, '_modified_' + kind) or
+                len(state[0]) != count):
+            # hash every chunk
+            digests = [function(data[i * size:(i + 1) * size])
+                       for i in range(count)]
+            state = [digests, np.zeros(count, dtype=bool), False]
+            self._chunks[kind] = state
+        elif state[2]:
+            # only rehash chunks marked as changed
+            digests, dirty = state[0], state[1]
+            for i in np.nonzero(dirty)[0]:
+                digests[i] = function(data[i * size:(i + 1) * size])
+            dirty[:] = False
+            state[2] = False
+        return combine(state[0], size, last)
+
+    def _mark(self, chunks):
+        """
+        Mark chunks of the array as changed.
 
-    def __isub__(self, *args, **kwargs):
-        self._modified_c = True
+        Parameters
+        ------------
+        chunks : None or (n,) int
+          Index of chunks, or None for everything
+        """
+        if chunks is None:
+            self._modified_c = True
+            self._modified_m = True
+            self._modified_x = True
+            return
+        if len(chunks) == 0:
+            return
+        # MD5 always hashes the whole array
         self._modified_m = True
-        self._modified_x = True
-        return super(self.__class__, self).__isub__(*args,
-                                                    **kwargs)
+        for state in getattr(self, '_chunks', {}).values():
+            dirty = state[1]
+            dirty[chunks[chunks < len(dirty)]] = True
+            state[2] = True
 
-    def __imul__(self, *args, **kwargs):
-        self._modified_c = True
-        self._modified_m = True
-        self._modified_x = True
-        return super(self.__class__, self).__imul__(*args,
-                                                    **kwargs)
+    def _view_chunks(self, view):
+        """
+        Find which chunks of this array a view can change.
 
-    def __idiv__(self, *args, **kwargs):
-        self._modified_c = True
-        self._modified_m = True
-        self._modified_x = True
-        return super(self.__class__, self).__idiv__(*args,
-                                                    **kwargs)
+        Parameters
+        ------------
+        view : np.ndarray
+          Array which may share memory with this one
 
-    def __itruediv__(self, *args, **kwargs):
-        self._modified_c = True
-        self._modified_m = True
-        self._modified_x = True
-        return super(self.__class__, self).__itruediv__(*args,
-                                                        **kwargs)
+        Returns
+        ------------
+        chunks : None or (n,) int
+          Index of chunks or None for everything
+        """
+        if not getattr(self, '_chunks', None):
+            # no chunk hashes stored so just flag everything
+            return None
+        if not self.flags['C_CONTIGUOUS']:
+            return None
+        low, high = _byte_bounds(view)
+        start = self.__array_interface__['data'][0]
+        low = max(low, start) - start
+        high = min(high, start + self.nbytes) - start
+        if high <= low:
+            # no overlap, i.e. a copy or a new array
+            return np.zeros(0, dtype=np.int64)
+        size = int(self.chunk_size)
+        return np.arange(low // size, (high - 1) // size + 1)
+
+    def _key_chunks(self, key):
+        """
+        Find which chunks an index into the array can change.
 
-    def __imatmul__(self, *args, **kwargs):
-        self._modified_c = True
-        self._modified_m = True
-        self._modified_x = True
-        return super(self.__class__, self).__imatmul__(*args,
-                                                       **kwargs)
+        Parameters
+        ------------
+        key : any
+          Index passed to __setitem__
 
-    def __ipow__(self, *args, **kwargs):
-        self._modified_c = True
-        self._modified_m = True
-        self._modified_x = True
-        return super(self.__class__, self).__ipow__(*args, **kwargs)
+        Returns
+        ------------
+        chunks : None or (n,) int
+          Index of chunks or None for everything
+        """
+        if (not getattr(self, '_chunks', None) or
+                self.ndim == 0 or
+                not self.flags['C_CONTIGUOUS']):
+            return None
+        if isinstance(key, tuple):
+            if len(key) == 0:
+                return None
+            # only the first axis selects rows of memory
+            key = key[0]
+
+        count = self.shape[0]
+        row = self.strides[0]
+        size = int(self.chunk_size)
+
+        if isinstance(key, slice):
+            start, stop, step = key.indices(count)
+            length = len(range(start, stop, step))
+            if length == 0:
+                return np.zeros(0, dtype=np.int64)
+            # only the first and last row set the range
+            rows = np.array([start, start + step * (length - 1)],
+                            dtype=np.int64)
+            return np.arange((rows.min() * row) // size,
+                             ((rows.max() + 1) * row - 1) // size + 1)
+        elif isinstance(key, (int, np.integer)) and not isinstance(
+                key, (bool, np.bool_)):
+            rows = np.array([key], dtype=np.int64)
+        else:
+            try:
+                rows = np.asanyarray(key)
+            except BaseException:
+                return None
+            if rows.dtype == bool:
+                if rows.shape[:1] != (count,):
+                    return None
+                rows = np.nonzero(rows.reshape((count, -1)).any(
+                    axis=1))[0]
+            elif rows.dtype.kind not in 'iu':
+                return None
+        if len(rows) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        rows = rows.ravel().astype(np.int64)
+        rows[rows < 0] += count
+        if rows.min() < 0 or rows.max() >= count:
+            # numpy will raise an IndexError
+            return None
+
+        first = (rows * row) // size
+        last = ((rows + 1) * row - 1) // size
+        if row > size:
+            # rows span many chunks
+            return np.arange(first.min(), last.max() + 1)
+        return np.unique(np.concatenate((first, last)))
 
-    def __imod__(self, *args, **kwargs):
-        self._modified_c = True
-        self._modified_m = True
-        self._modified_x = True
-        return super(self.__class__, self).__imod__(*args, **kwargs)
+    def __hash__(self):
+        """
+        Hash is required to return an int.
 
-    def __ifloordiv__(self, *args, **kwargs):
-        self._modified_c = True
-        self._modified_m = True
-        self._modified_x = True
-        return super(self.__class__, self).__ifloordiv__(*args,
-                                                         **kwargs)
+        Returns
+        -----------
+        hash: int, result of fast_hash
+        """
+        return self.fast_hash()
 
-    def __ilshift__(self, *args, **kwargs):
-        self._modified_c = True
-        self._modified_m = True
-        self._modified_x = True
-        return super(self.__class__, self).__ilshift__(*args,
-                                                       **kwargs)
+    def __setitem__(self, key, value):
+        target = self._write_target()
+        # only mark the chunks of memory the key can change
+        target._mark(target._key_chunks(key))
+        np.ndarray.__setitem__(target, key, value)
 
-    def __irshift__(self, *args, **kwargs):
-        self._modified_c = True
-        self._modified_m = True
-        self._modified_x = True
-        return super(self.__class__, self).__irshift__(*args,
-                                                       **kwargs)
+    def __setslice__(self, start, stop, value):
+        self.__setitem__(slice(start, stop), value)
 
-    def __iand__(self, *args, **kwargs):
-        self._modified_c = True
-        self._modified_m = True
-        self._modified_x = True
-        return super(self.__class__, self).__iand__(*args,
-                                                    **kwargs)
+    @property
+    def flat(self):
+        """
+        A flat iterator over the array, which may be written
+        to so the array is flagged as changed.
+        """
+        target = self._write_target()
+        target._mark(None)
+        return np.ndarray.flat.__get__(target)
 
-    def __ixor__(self, *args, **kwargs):
-        self._modified_c = True
-        self._modified_m = True
-        self._modified_x = True
-        return super(self.__class__, self).__ixor__(*args,
-                                                    **kwargs)
+    @flat.setter
+    def flat(self, value):
+        target = self._write_target()
+        target._mark(None)
+        np.ndarray.flat.__set__(target, value)
 
-    def __ior__(self, *args, **kwargs):
-        self._modified_c = True
-        self._modified_m = True
-        self._modified_x = True
-        return super(self.__class__, self).__ior__(*args,
-                                                   **kwargs)
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """
+        Run a ufunc on plain arrays so arrays passed as `out`,
+        or the first argument of `ufunc.at`, are tracked as
+        changed like any other write.
+        """
+        out = tuple(_written(o) for o in kwargs.get('out', ()))
+        inputs = list(inputs)
+        if method == 'at':
+            inputs[0] = _written(inputs[0])
+
+        inputs = [i.view(np.ndarray) if isinstance(i, TrackedArray)
+                  else i for i in inputs]
+        if len(out) > 0:
+            kwargs['out'] = tuple(
+                o.view(np.ndarray) if isinstance(o, TrackedArray)
+                else o for o in out)
+        result = getattr(ufunc, method)(*inputs, **kwargs)
+
+        if len(out) > 0:
+            # return the arrays which were passed
+            return out[0] if len(out) == 1 else tuple(out)
+        if isinstance(result, tuple):
+            return tuple(r.view(TrackedArray)
+                         if isinstance(r, np.ndarray) else r
+                         for r in result)
+        if isinstance(result, np.ndarray):
+            return result.view(TrackedArray)
+        return result
+
+    def __array_function__(self, func, types, args, kwargs):
+        """
+        Track numpy functions which write to an argument like
+        `np.copyto` as changing it.
+        """
+        name = _write_functions.get(func)
+        if name is not None:
+            if len(args) > 0:
+                args = (_written(args[0]),) + tuple(args[1:])
+            elif name in kwargs:
+                kwargs = dict(kwargs)
+                kwargs[name] = _written(kwargs[name])
+        return super(TrackedArray, self).__array_function__(
+            func, types, args, kwargs)
+
+    def _share(self, key, target):
+        """
+        Get a read-only view of this array for another DataStore
+        which shares memory until either array is written to.
 
-    def __setitem__(self, *args, **kwargs):
-        self._modified_c = True
-        self._modified_m = True
-        self._modified_x = True
-        super(self.__class__, self).__setitem__(*args,
-                                                **kwargs)
+        This array stays writable: the first write to its memory
+        copies the data of every view into its DataStore, and
+        writes to the view copy the data first. Writes are seen
+        through `_write_target`, which every TrackedArray method
+        or numpy function that writes in- place goes through.
 
-    def __setslice__(self, *args, **kwargs):
-        self._modified_c = True
-        self._modified_m = True
-        self._modified_x = True
-        super(self.__class__, self).__setslice__(*args,
-                                                 **kwargs)
+        Parameters
+        ------------
+        key : str
+          Key the view will be stored at
+        target : DataStore
+          DataStore the view will be stored in
+
+        Returns
+        ------------
+        shared : TrackedArray
+          Read-only view of the same memory
+        """
+        # view as a plain array first so this array
+        # isn't marked as changed by the new view
+        shared = self.view(np.ndarray).view(type(self))
+        shared.flags.writeable = False
+        shared._owner = (weakref.ref(target), key)
+        shared._keep_hashes(self)
+
+        # register the view with whatever owns the memory
+        owner = id(_memory_owner(shared))
+        ident = id(shared)
+
+        def collected(reference):
+            with _mutex:
+                views = _shared.get(owner)
+                if views is not None:
+                    views.pop(ident, None)
+                    if len(views) == 0:
+                        _shared.pop(owner, None)
+
+        with _mutex:
+            _shared.setdefault(owner, {})[ident] = (
+                weakref.ref(target), key, weakref.ref(shared, collected))
+        return shared
+
+    def _keep_hashes(self, other):
+        """
+        Take the hashes of another array with identical data.
+
+        Parameters
+        ------------
+        other : TrackedArray
+          Array with the same data as this one
+        """
+        for name in ('_modified_c', '_modified_m', '_modified_x',
+                     '_hashed_crc', '_hashed_md5', '_hashed_xx'):
+            if name in other.__dict__:
+                setattr(self, name, other.__dict__[name])
+        self._chunks = {kind: [list(state[0]), state[1].copy(), state[2]]
+                        for kind, state in other._chunks.items()}
+
+    def _writable(self):
+        """
+        Get an array which writes to this read-only array
+        should go to, copying memory shared with another
+        DataStore on the first write.
+
+        Returns
+        ------------
+        writable : None or TrackedArray
+          Writable array in the DataStore or a view of it
+          matching this array, None if this isn't shared
+        """
+        root = self if self._owner is not None else self._root
+        if root is None or root._owner is None:
+            return None
+        store, key = root._owner[0](), root._owner[1]
+        if store is None:
+            return None
+        current = store.data.get(key)
+        if current is root:
+            # first write so copy the shared memory
+            current = root._unshared()
+            store.data[key] = current
+        elif (current is not None and
+              not current.flags.writeable and
+              current._owner is not None):
+            # the DataStore was shared again
+            current = current._writable()
+        if (current is None or
+                not current.flags.writeable or
+                current.shape != root.shape or
+                current.dtype != root.dtype or
+                not current.flags['C_CONTIGUOUS'] or
+                not root.flags['C_CONTIGUOUS']):
+            return None
+        if self is root:
+            return current
+        # the same view of the writable memory
+        offset = (self.__array_interface__['data'][0] -
+                  root.__array_interface__['data'][0])
+        view = np.ndarray(shape=self.shape,
+                          dtype=self.dtype,
+                          buffer=current,
+                          offset=offset,
+                          strides=self.strides).view(type(self))
+        # mark the chunks of memory the view can change
+        view.__array_finalize__(current)
+        return view
+
+    def _unshared(self):
+        """
+        Get a writable copy of this array with its hashes.
+
+        Returns
+        ------------
+        copied : TrackedArray
+          Copy of the data of this array
+        """
+        copied = tracked_array(np.array(self))
+        copied._keep_hashes(self)
+        return copied
+
+    def _write_target(self):
+        """
+        Get the array a write to this array should go to.
+
+        Memory shared with another DataStore is copied first:
+        a writable array gives any DataStore viewing it its own
+        copy, and a read-only view from `_share` is replaced
+        in its DataStore by a copy which is written instead.
+
+        Returns
+        ------------
+        target : TrackedArray
+          This array or the copy to write to
+        """
+        if self.flags.writeable:
+            _detach(self)
+            return self
+        target = self._writable()
+        if target is None:
+            # not shared so numpy raises the usual error
+            return self
+        return target
 
     if hasX:
         # if xxhash is installed use it
@@ -349,19 +751,282 @@ class TrackedArray(np.ndarray):
         fast_hash = crc
 
 
+def _memory_owner(array):
+    """
+    Find the array at the bottom of a chain of views.
+
+    Parameters
+    ------------
+    array : np.ndarray
+      Any array
+
+    Returns
+    ------------
+    owner : np.ndarray
+      Array which every view of the same memory is based on
+    """
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
+
+
+def _detach(array):
+    """
+    Before an array is written to, give every DataStore with a
+    view of its memory from `TrackedArray._share` its own copy.
+
+    Parameters
+    ------------
+    array : np.ndarray
+      Array which is about to be written to
+    """
+    if len(_shared) == 0 or not array.flags.writeable:
+        return
+    with _mutex:
+        views = _shared.pop(id(_memory_owner(array)), None)
+        if views is None:
+            return
+        for store, key, view in list(views.values()):
+            store, view = store(), view()
+            if (store is not None and view is not None and
+                    store.data.get(key) is view):
+                store.data[key] = view._unshared()
+
+
+def _in_place(name):
+    """
+    Create a method for TrackedArray which writes to the
+    array in- place, like `__iadd__` or `sort`.
+
+    Parameters
+    ------------
+    name : str
+      Name of numpy.ndarray method, i.e. '__iadd__'
+
+    Returns
+    ------------
+    method : function
+      Flags the array as changed and applies the method
+    """
+    def method(self, *args, **kwargs):
+        target = self._write_target()
+        target._mark(None)
+        return getattr(np.ndarray, name)(target, *args, **kwargs)
+    method.__name__ = name
+    return method
+
+
+def _written(array):
+    """
+    Get the array a numpy function should write to in place
+    of an array passed to it as an output.
+
+    Parameters
+    ------------
+    array : any
+      Argument being written to
+
+    Returns
+    ------------
+    written : any
+      Array to pass to the function instead
+    """
+    if isinstance(array, TrackedArray):
+        array = array._write_target()
+        array._mark(None)
+    elif isinstance(array, np.ndarray):
+        # a plain view of memory a DataStore may share
+        _detach(array)
+    return array
+
+
+# the i* operations and methods like sort write to the
+# array in- place, so we better catch all of them
+for _name in ['__iadd__',
+              '__isub__',
+              '__imul__',
+              '__idiv__',
+              '__itruediv__',
+              '__imatmul__',
+              '__ipow__',
+              '__imod__',
+              '__ifloordiv__',
+              '__ilshift__',
+              '__irshift__',
+              '__iand__',
+              '__ixor__',
+              '__ior__',
+              'fill',
+              'sort',
+              'put',
+              'itemset',
+              'partition',
+              'setfield']:
+    if hasattr(np.ndarray, _name):
+        setattr(TrackedArray, _name, _in_place(_name))
+
+
+# {function : name of argument} for numpy functions
+# which write to their first argument
+_write_functions = {getattr(np, name): arg for name, arg in [
+    ('copyto', 'dst'),
+    ('place', 'arr'),
+    ('put', 'a'),
+    ('putmask', 'a'),
+    ('put_along_axis', 'arr'),
+    ('fill_diagonal', 'a')] if hasattr(np, name)}
+
+
+def _as_bytes(array):
+    """
+    Get a flat uint8 view of a C- contiguous array.
+    """
+    return array.view(np.ndarray).reshape(-1).view(np.uint8)
+
+
+def _byte_bounds(array):
+    """
+    Get the range of memory addresses an array can touch.
+
+    Parameters
+    ------------
+    array : np.ndarray
+      Any array
+
+    Returns
+    ------------
+    low : int
+      First address
+    high : int
+      One past the last address
+    """
+    low = high = array.__array_interface__['data'][0]
+    for count, stride in zip(array.shape, array.strides):
+        if count == 0:
+            return low, low
+        if stride < 0:
+            low += stride * (count - 1)
+        else:
+            high += stride * (count - 1)
+    return low, high + array.itemsize
+
+
+def _crc_combine(digests, size, last):
+    """
+    Combine the crc32 of adjacent chunks into the crc32 of
+    all of them, like zlib's crc32_combine.
+
+    Parameters
+    ------------
+    digests : (n,) int
+      Checksum of each chunk
+    size : int
+      Length in bytes of every chunk but the last
+    last : int
+      Length in bytes of the last chunk
+
+    Returns
+    ------------
+    crc : int
+      Checksum of the chunks joined together
+    """
+    if len(digests) == 1:
+        return digests[0]
+    crc = digests[0]
+    shift = _crc_shift(size)
+    for digest in digests[1:-1]:
+        crc = _gf2_times(shift, crc) ^ digest
+    return _gf2_times(_crc_shift(last), crc) ^ digests[-1]
+
+
+def _gf2_times(matrix, vector):
+    """
+    Multiply a 32 bit vector by a 32x32 matrix over GF(2)
+    whose columns are stored as integers.
+    """
+    result = 0
+    for column in matrix:
+        if not vector:
+            break
+        if vector & 1:
+            result ^= column
+        vector >>= 1
+    return result
+
+
+def _crc_shift(length):
+    """
+    Get the GF(2) matrix which advances a crc32 over a
+    number of zero bytes.
+
+    Parameters
+    ------------
+    length : int
+      Number of bytes
+
+    Returns
+    ------------
+    matrix : (32,) int
+      Columns of the matrix
+    """
+    matrix = _crc_shifts.get(length)
+    if matrix is not None:
+        return matrix
+    # the operator for a single zero bit is the reversed
+    # crc32 polynomial then the identity shifted by one
+    step = [0xedb88320] + [1 << i for i in range(31)]
+    # square it three times to get one zero byte
+    for _ in range(3):
+        step = [_gf2_times(step, column) for column in step]
+    matrix = [1 << i for i in range(32)]
+    count = int(length)
+    while count:
+        if count & 1:
+            matrix = [_gf2_times(step, column) for column in matrix]
+        count >>= 1
+        if count:
+            step = [_gf2_times(step, column) for column in step]
+    _crc_shifts[length] = matrix
+    return matrix
+
+
+def _xx_chunk(data):
+    return xxhash.xxh64(data).intdigest()
+
+
+def _xx_combine(digests, size, last):
+    if len(digests) == 1:
+        return digests[0]
+    return xxhash.xxh64(np.array(digests, dtype=np.uint64)).intdigest()
+
+
 class Cache:
     """
     Class to cache values which will be stored until the
     result of an ID function changes.
+
+    The estimated size of every value is tracked by the global
+    `caching.budget`, which evicts least recently used values
+    from any Cache if a memory limit is set. Keys which are
+    pinned with `Cache.pin` are never evicted.
+
+    Caches may be read from many threads: checking the ID
+    function takes no lock, values decorated with
+    `cache_decorator` are computed by one thread at a time
+    per key, and changes to what is stored are made while
+    holding `caching._mutex`.
     """
 
-    def __init__(self, id_function):
+    def __init__(self, id_function, data=None):
         """
         Create a cache object.
 
         Parameters
         ------------
         id_function: function, that returns hashable value
+        data : None or DataStore
+          If passed, values which declare the keys of data
+          they depend on are only cleared when those change
         """
         self._id_function = id_function
 
@@ -369,12 +1034,73 @@ class Cache:
         self._lock = 0
         self.cache = {}
 
+        # {cache key : frozenset of data keys} for values
+        # which only need to be cleared when those change
+        self._depends = {}
+        self._data = data
+        self._data_hashes = self._hash_data()
+
+        # keys which may never be evicted
+        self.pinned = set()
+        # number of values evicted to stay under budget
+        self.evictions = 0
+        # estimated size in bytes of each value
+        self._sizes = {}
+        # values stored while computing another value are
+        # evicted together with it as a group
+        self._group = {}
+        self._members = {}
+        # {name : number of threads} of values currently
+        # being computed, and a stack of names per thread
+        self._computing = {}
+        self._local = threading.local()
+        # {name : lock} held while computing a value
+        self._key_locks = {}
+
+    @property
+    def nbytes(self):
+        """
+        Estimated size of every value in the cache.
+
+        Returns
+        ------------
+        nbytes : int
+          Estimated size in bytes
+        """
+        with _mutex:
+            return sum(self._sizes.values())
+
+    def pin(self, key):
+        """
+        Never evict a key from the cache to stay under the
+        memory budget, although it is still cleared when the
+        value of id_function changes.
+
+        Parameters
+        ------------
+        key : hashable
+          Key to pin
+        """
+        self.pinned.add(key)
+
+    def unpin(self, key):
+        """
+        Allow a pinned key to be evicted again.
+
+        Parameters
+        ------------
+        key : hashable
+          Key to unpin
+        """
+        self.pinned.discard(key)
+
     def delete(self, key):
         """
         Remove a key from the cache.
         """
-        if key in self.cache:
+        with _mutex:
             self.cache.pop(key, None)
+            self._forget([key])
 
     def verify(self):
         """
@@ -388,43 +1114,305 @@ class Cache:
 
         # check the hash of our data
         id_new = self._id_function()
+        if id_new == self.id_current:
+            return
 
-        # things changed
-        if id_new != self.id_current:
-            if len(self.cache) > 0:
-                log.debug('%d items cleared from cache: %s',
-                          len(self.cache),
-                          str(list(self.cache.keys())))
-            # hash changed, so dump the cache
-            # do it manually rather than calling clear()
-            # as we are internal logic and can avoid function calls
-            self.cache = {}
+        with _mutex:
+            # another thread may have already cleared it
+            if id_new == self.id_current or self._lock != 0:
+                return
+            if len(self._depends) > 0 and self._data is not None:
+                # only dump values which depend on changed data
+                self._invalidate()
+            else:
+                if len(self.cache) > 0:
+                    log.debug('%d items cleared from cache: %s',
+                              len(self.cache),
+                              str(list(self.cache.keys())))
+                if metrics.enabled:
+                    metrics.invalidate(self.cache.keys())
+                # hash changed, so dump the cache
+                # do it manually rather than calling clear()
+                # as we are internal logic and can avoid function calls
+                self.cache = {}
+                if len(self._sizes) > 0:
+                    self._forget(list(self._sizes.keys()))
+                self._data_hashes = self._hash_data()
             # set the id to the new data hash
             self.id_current = id_new
 
-    def clear(self, exclude=None):
+    def _hash_data(self):
         """
-        Remove all elements in the cache.
+        Get the hash of every key in the tracked DataStore.
+
+        Returns
+        ------------
+        hashes : dict
+          {data key : fast_hash}
         """
-        if exclude is None:
-            self.cache = {}
-        else:
-            self.cache = {k: v for k, v in self.cache.items()
-                          if k in exclude}
+        if self._data is None:
+            return {}
+        return {k: v.fast_hash() for k, v in self._data.data.items()}
 
-    def update(self, items):
+    def _invalidate(self):
         """
-        Update the cache with a set of key, value pairs without
-        checking id_function.
+        Remove values which depend on data which has changed
+        since the hashes were last stored.
         """
-        self.cache.update(items)
-        self.id_set()
+        hashes = self._hash_data()
+        previous = self._data_hashes
+        changed = set(k for k in set(hashes).union(previous)
+                      if hashes.get(k) != previous.get(k))
+
+        # values without declared dependencies always go
+        remove = [k for k in self.cache
+                  if k not in self._depends or
+                  not changed.isdisjoint(self._depends[k])]
+        if len(remove) > 0:
+            log.debug('%d items cleared from cache: %s',
+                      len(remove),
+                      str(remove))
+        if metrics.enabled:
+            metrics.invalidate(remove)
+        for key in remove:
+            self.cache.pop(key, None)
+        self._forget([k for k in self._sizes
+                      if k not in self.cache])
+        self._data_hashes = hashes
 
-    def id_set(self):
+    def copy_values(self):
         """
-        Set the current ID to the value of the ID function.
+        Copy the cached values which are still valid for an
+        identical copy of the data and don't reference the
+        object the cache belongs to.
+
+        Returns
+        ------------
+        values : dict
+          {key : copied value}
         """
-        self.id_current = self._id_function()
+        self.verify()
+        with _mutex:
+            cached = list(self.cache.items())
+        values = {}
+        for key, value in cached:
+            try:
+                values[key] = _copy_value(value)
+            except TypeError:
+                # values like intersectors reference the object
+                continue
+        return values
+
+    def depend(self, key, depends):
+        """
+        Declare which keys of the DataStore a cached value is
+        computed from, so it is kept when only other keys change.
+
+        Parameters
+        ------------
+        key : hashable
+          Key in the cache
+        depends : sequence of str
+          Keys of the DataStore
+        """
+        self._depends[key] = frozenset(depends)
+
+    def clear(self, exclude=None):
+        """
+        Remove all elements in the cache.
+        """
+        with _mutex:
+            if exclude is None:
+                self.cache = {}
+            else:
+                self.cache = {k: v for k, v in self.cache.items()
+                              if k in exclude}
+            self._forget([k for k in self._sizes
+                          if k not in self.cache])
+
+    def update(self, items):
+        """
+        Update the cache with a set of key, value pairs without
+        checking id_function.
+        """
+        with _mutex:
+            for key, value in items.items():
+                self._store(key, value)
+            self.id_set()
+
+    def id_set(self):
+        """
+        Set the current ID to the value of the ID function.
+        """
+        with _mutex:
+            self.id_current = self._id_function()
+            self._data_hashes = self._hash_data()
+
+    def _store(self, key, value):
+        """
+        Store a value and account for its size in the budget,
+        evicting other values if over the limit.
+
+        Parameters
+        ------------
+        key : hashable
+          Key to reference value
+        value : any
+          Value to store in cache
+        """
+        size = estimate_size(value)
+        with _mutex:
+            self.cache[key] = value
+            self._sizes[key] = size
+
+            if key not in self._group:
+                # values stored while this thread is computing
+                # another value join the group of that value
+                stack = self._stack()
+                if len(stack) > 0:
+                    root = stack[-1]
+                else:
+                    root = key
+                self._group[key] = root
+                self._members.setdefault(root, set()).add(key)
+                # and depend on the same data
+                if root in self._depends and key not in self._depends:
+                    self._depends[key] = self._depends[root]
+
+            budget.add(self, key, size)
+
+    def _stack(self):
+        """
+        Get the names of values the current thread is computing.
+
+        Returns
+        ------------
+        stack : list
+          Names with the innermost last
+        """
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    def _begin(self, name):
+        """
+        Record that the current thread started computing a value.
+
+        Parameters
+        ------------
+        name : hashable
+          Key the value will be stored at
+        """
+        self._stack().append(name)
+        with _mutex:
+            self._computing[name] = self._computing.get(name, 0) + 1
+
+    def _end(self, name):
+        """
+        Record that the current thread finished computing a value.
+
+        Parameters
+        ------------
+        name : hashable
+          Key the value was stored at
+        """
+        self._stack().pop()
+        with _mutex:
+            count = self._computing.get(name, 0) - 1
+            if count > 0:
+                self._computing[name] = count
+            else:
+                self._computing.pop(name, None)
+
+    def _key_lock(self, name):
+        """
+        Get the lock held while computing a value.
+
+        Parameters
+        ------------
+        name : hashable
+          Key the value is stored at
+
+        Returns
+        ------------
+        lock : threading.RLock
+          Lock for the key
+        """
+        lock = self._key_locks.get(name)
+        if lock is None:
+            with _mutex:
+                lock = self._key_locks.setdefault(
+                    name, threading.RLock())
+        return lock
+
+    def _touch(self, key):
+        """
+        Mark a key as recently used.
+        """
+        budget.touch(self, key)
+
+    def _forget(self, keys):
+        """
+        Stop tracking the size and group of keys.
+
+        Parameters
+        ------------
+        keys : sequence of hashable
+          Keys which are no longer in the cache
+        """
+        for key in keys:
+            self._sizes.pop(key, None)
+            root = self._group.pop(key, None)
+            if root in self._members:
+                members = self._members[root]
+                members.discard(key)
+                if len(members) == 0:
+                    self._members.pop(root, None)
+            budget.remove(self, key)
+
+    def _evictable(self, key):
+        """
+        Get every key which would be evicted with a key.
+
+        Parameters
+        ------------
+        key : hashable
+          Key to evict
+
+        Returns
+        ------------
+        keys : list or None
+          Keys to evict, or None if any are pinned
+        """
+        root = self._group.get(key, key)
+        if root in self._computing:
+            # the group is still being stored
+            return None
+        keys = list(self._members.get(root, [key]))
+        if key not in keys:
+            keys.append(key)
+        if any(k in self.pinned for k in keys):
+            return None
+        return keys
+
+    def _evict(self, keys):
+        """
+        Remove keys from the cache to stay under budget.
+
+        Parameters
+        ------------
+        keys : list of hashable
+          Result of `_evictable`
+        """
+        for key in keys:
+            self.cache.pop(key, None)
+        self._forget(keys)
+        self.evictions += len(keys)
+        if metrics.enabled:
+            metrics.evict(keys)
+        log.debug('evicted from cache: %s', str(keys))
 
     def __getitem__(self, key):
         """
@@ -441,9 +1429,11 @@ class Cache:
         cached : object, or None
         """
         self.verify()
-        if key in self.cache:
-            return self.cache[key]
-        return None
+        value = self.cache.get(key, _missing)
+        if value is _missing:
+            return None
+        self._touch(key)
+        return value
 
     def __setitem__(self, key, value):
         """
@@ -457,7 +1447,7 @@ class Cache:
                   Value to store in cache
         """
         self.verify()
-        self.cache[key] = value
+        self._store(key, value)
         return value
 
     def __contains__(self, key):
@@ -469,11 +1459,817 @@ class Cache:
         return len(self.cache)
 
     def __enter__(self):
-        self._lock += 1
+        with _mutex:
+            self._lock += 1
 
     def __exit__(self, *args):
-        self._lock -= 1
-        self.id_current = self._id_function()
+        with _mutex:
+            self._lock -= 1
+            self.id_set()
+
+    def __getstate__(self):
+        # locks and thread-local stacks can't be copied
+        state = self.__dict__.copy()
+        for key in ('_local', '_key_locks', '_computing'):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._computing = {}
+        self._local = threading.local()
+        self._key_locks = {}
+
+
+class MemoryBudget(object):
+    """
+    Track the estimated size of values stored in every Cache
+    and evict the least recently used values across all of
+    them when the total is over a limit.
+    """
+
+    def __init__(self, limit=None):
+        """
+        Create a memory budget.
+
+        Parameters
+        ------------
+        limit : None or int
+          Maximum size in bytes of cached values,
+          or None for no limit
+        """
+        self._limit = limit
+        # total estimated size of tracked values
+        self.used = 0
+        # number of values evicted from all caches
+        self.evictions = 0
+        # {(id(cache), key) : size} from least to most recent
+        self._order = collections.OrderedDict()
+        # {id(cache) : weakref} of caches with tracked values
+        self._caches = {}
+
+    @property
+    def limit(self):
+        """
+        Maximum size in bytes of every cached value.
+
+        Returns
+        ------------
+        limit : None or int
+          Limit in bytes or None for no limit
+        """
+        return self._limit
+
+    @limit.setter
+    def limit(self, value):
+        if value is not None:
+            value = int(value)
+        with _mutex:
+            self._limit = value
+            self.enforce()
+
+    def add(self, cache, key, size):
+        """
+        Track a value which was stored in a cache and evict
+        other values if over the limit.
+
+        Parameters
+        ------------
+        cache : Cache
+          Cache value was stored in
+        key : hashable
+          Key value was stored at
+        size : int
+          Estimated size of value in bytes
+        """
+        ident = id(cache)
+        with _mutex:
+            if ident not in self._caches:
+                self._caches[ident] = weakref.ref(
+                    cache, self._collected(ident, cache._sizes))
+            entry = (ident, key)
+            self.used += size - self._order.pop(entry, 0)
+            self._order[entry] = size
+            if self._limit is not None and self.used > self._limit:
+                self.enforce(keep=entry)
+
+    def touch(self, cache, key):
+        """
+        Mark a value as the most recently used.
+
+        Parameters
+        ------------
+        cache : Cache
+          Cache value is stored in
+        key : hashable
+          Key value is stored at
+        """
+        entry = (id(cache), key)
+        # popping and re- inserting must not race with add
+        # or remove or the entry may be counted twice or lost
+        with _mutex:
+            size = self._order.pop(entry, None)
+            if size is not None:
+                self._order[entry] = size
+
+    def remove(self, cache, key):
+        """
+        Stop tracking a value.
+
+        Parameters
+        ------------
+        cache : Cache
+          Cache value was stored in
+        key : hashable
+          Key value was stored at
+        """
+        with _mutex:
+            self.used -= self._order.pop((id(cache), key), 0)
+
+    def enforce(self, keep=None):
+        """
+        Evict least recently used values until under the limit.
+
+        Parameters
+        ------------
+        keep : None or (int, hashable)
+          Entry which should not be evicted
+        """
+        if self._limit is None or self.used <= self._limit:
+            return
+        with _mutex:
+            for ident, key in list(self._order.keys()):
+                if self.used <= self._limit:
+                    break
+                if ((ident, key) not in self._order or
+                        (ident, key) == keep):
+                    continue
+                cache = self._caches[ident]()
+                if cache is None:
+                    continue
+                keys = cache._evictable(key)
+                if keys is None or (keep is not None and
+                                    keep[0] == ident and
+                                    keep[1] in keys):
+                    continue
+                cache._evict(keys)
+                self.evictions += len(keys)
+
+    def _collected(self, ident, sizes):
+        """
+        Create a callback to stop tracking values of a cache
+        when it is garbage collected.
+
+        Parameters
+        ------------
+        ident : int
+          id of the cache
+        sizes : dict
+          Sizes of values in the cache
+
+        Returns
+        ------------
+        callback : function
+          To pass to weakref.ref
+        """
+        def callback(reference):
+            with _mutex:
+                self._caches.pop(ident, None)
+                for key in list(sizes.keys()):
+                    self.used -= self._order.pop((ident, key), 0)
+        return callback
+
+
+class DiskCache(object):
+    """
+    Store values of cached properties in a directory so they
+    don't have to be recomputed by other processes.
+
+    Values are stored in `.npz` files addressed by the MD5 of
+    the geometry, the class, the property name and the trimesh
+    version, so stale values are never loaded. Only properties
+    declared with `cache_decorator(persist=True)` are stored and
+    only arrays, sequences of arrays and meshes are supported.
+
+    Files are written to a temporary name and renamed so any
+    number of processes may share a directory, and the least
+    recently used files are deleted when over `limit`.
+    """
+
+    def __init__(self, path=None, limit=None):
+        """
+        Create a disk cache.
+
+        Parameters
+        ------------
+        path : None or str
+          Directory to store values in, or None to disable
+        limit : None or int
+          Maximum size in bytes of stored files,
+          or None for no limit
+        """
+        self._path = None
+        self._limit = limit
+        # estimated size of files in the directory
+        self._used = None
+        self.path = path
+
+    @property
+    def path(self):
+        """
+        Directory values are stored in.
+
+        Returns
+        ------------
+        path : None or str
+          Directory, or None if disabled
+        """
+        return self._path
+
+    @path.setter
+    def path(self, value):
+        if value is not None:
+            value = os.path.abspath(os.path.expanduser(value))
+        self._path = value
+        self._used = None
+
+    @property
+    def enabled(self):
+        """
+        Is the disk cache enabled.
+
+        Returns
+        ------------
+        enabled : bool
+          True if a path is set
+        """
+        return self._path is not None
+
+    @property
+    def limit(self):
+        """
+        Maximum size in bytes of stored files.
+
+        Returns
+        ------------
+        limit : None or int
+          Limit in bytes or None for no limit
+        """
+        return self._limit
+
+    @limit.setter
+    def limit(self, value):
+        if value is not None:
+            value = int(value)
+        self._limit = value
+        self.prune()
+
+    def key(self, obj, name):
+        """
+        Get the file name a property of an object is stored at.
+
+        Parameters
+        ------------
+        obj : object
+          Has an `md5` method which hashes its data
+        name : str
+          Name of property
+
+        Returns
+        ------------
+        key : str
+          MD5 in hexadecimal
+        """
+        from .version import __version__
+        hasher = hashlib.md5()
+        for part in (__version__,
+                     type(obj).__module__,
+                     type(obj).__name__,
+                     name,
+                     obj.md5()):
+            hasher.update(str(part).encode('utf-8'))
+        return hasher.hexdigest()
+
+    def _file(self, key):
+        """
+        Get the path of a file from its key, using the first
+        characters as a subdirectory to keep listings short.
+        """
+        return os.path.join(self._path, key[:2], key + '.npz')
+
+    def load(self, obj, name):
+        """
+        Load the values stored for a property of an object.
+
+        Parameters
+        ------------
+        obj : object
+          Has an `md5` method which hashes its data
+        name : str
+          Name of property
+
+        Returns
+        ------------
+        values : None or dict
+          {cache key : value} or None if not stored
+        """
+        if self._path is None:
+            return None
+        path = self._file(self.key(obj, name))
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                values = _disk_decode(archive)
+        except (IOError, OSError):
+            # not stored or deleted by another process
+            return None
+        except Exception:
+            log.debug('removing unreadable cache file %s', path,
+                      exc_info=True)
+            _remove(path)
+            return None
+        try:
+            # mark as recently used
+            os.utime(path, None)
+        except OSError:
+            pass
+        return values
+
+    def save(self, obj, name, values):
+        """
+        Store the values of a property of an object.
+
+        Parameters
+        ------------
+        obj : object
+          Has an `md5` method which hashes its data
+        name : str
+          Name of property
+        values : dict
+          {cache key : value} where values which
+          can't be stored are skipped
+
+        Returns
+        ------------
+        saved : bool
+          True if a file was written
+        """
+        if self._path is None:
+            return False
+        arrays = _disk_encode(values)
+        if arrays is None:
+            return False
+        path = self._file(self.key(obj, name))
+        directory = os.path.dirname(path)
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+        except OSError:
+            # another process may have created it
+            if not os.path.isdir(directory):
+                raise
+        handle, temp = tempfile.mkstemp(
+            dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as f:
+                np.savez(f, **arrays)
+            # rename is atomic so readers never see a partial file
+            _replace(temp, path)
+        except BaseException:
+            _remove(temp)
+            raise
+        if self._used is not None:
+            self._used += os.path.getsize(path)
+        if self._limit is not None and (
+                self._used is None or self._used > self._limit):
+            self.prune()
+        return True
+
+    def prune(self):
+        """
+        Delete the least recently used files until the
+        directory is under the limit.
+        """
+        if self._path is None or not os.path.isdir(self._path):
+            self._used = 0
+            return
+        now = time.time()
+        files = []
+        for root, dirs, names in os.walk(self._path):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if name.endswith('.npz'):
+                    files.append((stat.st_mtime, stat.st_size, path))
+                elif name.endswith('.tmp') and now - stat.st_mtime > 3600:
+                    # left behind by a process which died mid-write
+                    _remove(path)
+        used = sum(f[1] for f in files)
+        if self._limit is not None and used > self._limit:
+            # prune below the limit so every save doesn't prune
+            target = self._limit * 0.9
+            for mtime, size, path in sorted(files):
+                if used <= target:
+                    break
+                _remove(path)
+                used -= size
+        self._used = used
+
+    def clear(self):
+        """
+        Delete every stored file.
+        """
+        if self._path is None or not os.path.isdir(self._path):
+            return
+        for root, dirs, names in os.walk(self._path):
+            for name in names:
+                if name.endswith('.npz'):
+                    _remove(os.path.join(root, name))
+        self._used = 0
+
+
+def _disk_encode(values):
+    """
+    Convert cached values to arrays which can be stored
+    in an `.npz` file without pickling.
+
+    Parameters
+    ------------
+    values : dict
+      {cache key : value}
+
+    Returns
+    ------------
+    arrays : None or dict
+      {name : np.ndarray} or None if nothing can be stored
+    """
+    arrays = {}
+    header = []
+    for key, value in values.items():
+        if not isinstance(key, str):
+            continue
+        if (isinstance(value, np.ndarray) and
+                value.dtype.kind in 'biuf'):
+            kind, parts = 'array', [value]
+        elif isinstance(value, np.ndarray) and value.dtype.kind == 'O':
+            kind, parts = 'objects', list(value)
+        elif isinstance(value, (list, tuple)):
+            kind, parts = 'list', list(value)
+        elif (isinstance(getattr(value, '_data', None), DataStore) and
+                hasattr(value, 'faces')):
+            kind, parts = 'mesh', [value.vertices, value.faces]
+            normals = value._cache.cache.get('face_normals')
+            if normals is not None:
+                parts.append(normals)
+        else:
+            continue
+        parts = [np.asanyarray(p) for p in parts]
+        if not all(p.dtype.kind in 'biuf' for p in parts):
+            continue
+        index = len(header)
+        header.append([key, kind, len(parts)])
+        for i, part in enumerate(parts):
+            arrays['{}_{}'.format(index, i)] = part.view(np.ndarray)
+    if len(header) == 0:
+        return None
+    arrays['header'] = np.frombuffer(
+        json.dumps(header).encode('utf-8'), dtype=np.uint8)
+    return arrays
+
+
+def _disk_decode(archive):
+    """
+    Convert arrays loaded from an `.npz` file back into the
+    values passed to `_disk_encode`.
+
+    Parameters
+    ------------
+    archive : dict-like
+      {name : np.ndarray}
+
+    Returns
+    ------------
+    values : dict
+      {cache key : value}
+    """
+    header = json.loads(archive['header'].tobytes().decode('utf-8'))
+    values = {}
+    for index, (key, kind, count) in enumerate(header):
+        parts = [archive['{}_{}'.format(index, i)]
+                 for i in range(count)]
+        if kind == 'array':
+            value = parts[0]
+        elif kind == 'objects':
+            value = np.empty(count, dtype=object)
+            for i, part in enumerate(parts):
+                value[i] = part
+        elif kind == 'list':
+            value = parts
+        elif kind == 'mesh':
+            from .base import Trimesh
+            value = Trimesh(vertices=parts[0],
+                            faces=parts[1],
+                            face_normals=(parts[2] if count > 2
+                                          else None),
+                            process=False)
+        else:
+            raise ValueError('unknown kind {}'.format(kind))
+        values[key] = value
+    return values
+
+
+def _replace(source, destination):
+    """
+    Rename a file, replacing the destination if it exists.
+    """
+    if hasattr(os, 'replace'):
+        os.replace(source, destination)
+    elif os.name == 'nt' and os.path.exists(destination):
+        # python 2 on windows can't rename over a file
+        _remove(destination)
+        os.rename(source, destination)
+    else:
+        os.rename(source, destination)
+
+
+def _remove(path):
+    """
+    Remove a file, ignoring it if another process already did.
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class Stats(object):
+    """
+    Record how often cached values are used, computed and
+    cleared by name across every object, along with the time
+    spent computing them and in methods wrapped by
+    `constants.log_time`.
+
+    Recording is off until `enabled` is set to True, for
+    example `trimesh.caching.metrics.enabled = True`, and
+    `caching.stats()` returns a snapshot which can be
+    passed directly to `json.dumps`.
+    """
+
+    # counters kept for every name
+    fields = ('hits',
+              'misses',
+              'loads',
+              'invalidations',
+              'evictions',
+              'calls',
+              'time')
+
+    def __init__(self, enabled=False):
+        """
+        Create a registry of statistics.
+
+        Parameters
+        ------------
+        enabled : bool
+          Start recording immediately
+        """
+        self.enabled = enabled
+        # {name : {field : value}}
+        self._records = {}
+        # held while changing counters so increments from
+        # many threads aren't lost
+        self._lock = threading.Lock()
+
+    def _add(self, name, field, elapsed=None):
+        """
+        Increment a counter for a name and optionally add to
+        its time, creating the counters if needed.
+        """
+        with self._lock:
+            record = self._records.get(name)
+            if record is None:
+                record = dict.fromkeys(self.fields, 0)
+                record['time'] = 0.0
+                self._records[name] = record
+            record[field] += 1
+            if elapsed is not None:
+                record['time'] += elapsed
+
+    def hit(self, name):
+        """
+        Record a value returned from a cache.
+
+        Parameters
+        ------------
+        name : str
+          Name of value
+        """
+        self._add(name, 'hits')
+
+    def miss(self, name, elapsed):
+        """
+        Record a value which had to be computed.
+
+        Parameters
+        ------------
+        name : str
+          Name of value
+        elapsed : float
+          Seconds spent computing the value
+        """
+        self._add(name, 'misses', elapsed)
+
+    def load(self, name):
+        """
+        Record a value loaded from `caching.disk`.
+
+        Parameters
+        ------------
+        name : str
+          Name of value
+        """
+        self._add(name, 'loads')
+
+    def invalidate(self, names):
+        """
+        Record values cleared because their data changed.
+
+        Parameters
+        ------------
+        names : sequence of str
+          Names of values
+        """
+        for name in names:
+            self._add(name, 'invalidations')
+
+    def evict(self, names):
+        """
+        Record values evicted to stay under `caching.budget`.
+
+        Parameters
+        ------------
+        names : sequence of str
+          Names of values
+        """
+        for name in names:
+            self._add(name, 'evictions')
+
+    def call(self, name, elapsed):
+        """
+        Record a call to a timed function.
+
+        Parameters
+        ------------
+        name : str
+          Name of function
+        elapsed : float
+          Seconds spent in the function
+        """
+        self._add(name, 'calls', elapsed)
+
+    def snapshot(self):
+        """
+        Get a copy of every recorded counter.
+
+        Returns
+        ------------
+        snapshot : dict
+          {name : {field : int or float}}
+        """
+        with self._lock:
+            return {str(name): dict(record)
+                    for name, record in self._records.items()}
+
+    def clear(self):
+        """
+        Reset every counter.
+        """
+        with self._lock:
+            self._records = {}
+
+
+def _copy_value(value):
+    """
+    Copy a cached value so it may be stored in another cache.
+
+    Parameters
+    ------------
+    value : any
+      Value stored in a cache
+
+    Returns
+    ------------
+    copied : any
+      Copy of value
+
+    Raises
+    ------------
+    TypeError
+      If value isn't known to be safe to copy
+    """
+    if value is None or isinstance(
+            value, (bool, int, float, str, bytes, np.generic)):
+        return value
+    elif isinstance(value, np.ndarray):
+        copied = value.copy()
+        copied.flags.writeable = value.flags.writeable
+        return copied
+    elif isinstance(value, (list, tuple)):
+        return type(value)(_copy_value(v) for v in value)
+    elif isinstance(value, dict):
+        return {k: _copy_value(v) for k, v in value.items()}
+    elif isinstance(getattr(value, '_data', None), DataStore):
+        # geometry like a convex hull shares its data
+        return value.copy()
+    elif hasattr(value, 'tocsr'):
+        # scipy sparse matrix
+        return value.copy()
+    elif hasattr(value, 'query_ball_point'):
+        # scipy KD trees can't be changed after construction
+        return value
+    elif hasattr(value, 'twin'):
+        # half- edges are read only after construction
+        return value
+    raise TypeError('unable to copy {}'.format(type(value)))
+
+
+def estimate_size(value):
+    """
+    Estimate the size in bytes of a value stored in a cache.
+
+    Parameters
+    ------------
+    value : any
+      Value to estimate
+
+    Returns
+    ------------
+    size : int
+      Estimated size in bytes
+    """
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    elif isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(v) for v in value.values())
+    elif isinstance(value, (list, tuple, set, collections.deque)):
+        return sys.getsizeof(value) + sum(
+            estimate_size(v) for v in value)
+    elif isinstance(getattr(value, '_data', None), DataStore):
+        # geometry like a convex hull: count the data only as
+        # its own cache is tracked separately
+        return sum(int(v.nbytes) for v in value._data.values())
+    elif hasattr(value, 'nbytes'):
+        # half- edges, trees and intersectors report their size
+        return int(value.nbytes)
+    elif hasattr(value, 'intersection') and hasattr(value, 'properties'):
+        # an rtree index is allocated outside of python
+        return _rtree_size(value)
+    # sparse matrices and trees store arrays as attributes
+    arrays = [getattr(value, name, None)
+              for name in ('data', 'row', 'col',
+                           'indices', 'indptr')]
+    arrays = [a for a in arrays if isinstance(a, np.ndarray)]
+    if len(arrays) > 0:
+        size = sum(int(a.nbytes) for a in arrays)
+        if hasattr(value, 'leafsize'):
+            # a KD tree also stores a node structure and
+            # a permutation of the data of about the same size
+            size *= 2
+        return size
+    try:
+        return sys.getsizeof(value)
+    except TypeError:
+        return 0
+
+
+def _rtree_size(tree):
+    """
+    Estimate the size in bytes of an rtree index from the
+    number of leaf entries it contains.
+
+    Parameters
+    ------------
+    tree : rtree.index.Index
+      Tree to estimate
+
+    Returns
+    ------------
+    size : int
+      Estimated size in bytes
+    """
+    try:
+        count = len(tree)
+    except TypeError:
+        # older versions of rtree don't define __len__
+        count = tree.get_size()
+    properties = tree.properties
+    # every entry stores an id and the low and high corner of its
+    # box plus node overhead, and nodes are only partially filled
+    entry = 40 + 16 * properties.dimension
+    return int(count * entry / properties.fill_factor)
 
 
 class DataStore:
@@ -526,6 +2322,25 @@ class DataStore:
         """
         self.data = {}
 
+    def share(self, other):
+        """
+        Replace the data with views of the data in another
+        DataStore, which both keep until they are written to
+        when the written array is copied first.
+
+        Parameters
+        ------------
+        other : DataStore
+          DataStore to share data with
+        """
+        data = {}
+        for key, value in other.data.items():
+            if not isinstance(value, TrackedArray):
+                value = tracked_array(value)
+                other.data[key] = value
+            data[key] = value._share(key, self)
+        self.data = data
+
     def __getitem__(self, key):
         try:
             return self.data[key]
@@ -595,40 +2410,36 @@ class DataStore:
         return fast
 
 
-def _fast_crc(count=50):
-    """
-    On certain platforms/builds zlib.adler32 is substantially
-    faster than zlib.crc32, but it is not consistent across
-    Windows/Linux/OSX.
+# the memory budget shared by every Cache
+budget = MemoryBudget()
+disk = DiskCache()
+metrics = Stats()
+
 
-    This function runs a quick check (2ms on my machines) to
-    determine the fastest hashing function available in zlib.
+def stats(clear=False):
+    """
+    Get the statistics recorded by `caching.metrics` while
+    it is enabled, which is a dict that may be dumped to JSON.
 
     Parameters
     ------------
-    count: int, number of repetitions to do on the speed trial
+    clear : bool
+      Reset the counters after taking the snapshot
 
     Returns
-    ----------
-    crc32: function, either zlib.adler32 or zlib.crc32
+    ------------
+    snapshot : dict
+      {name : {'hits', 'misses', 'loads', 'invalidations',
+               'evictions', 'calls', 'time'}}
     """
-    import timeit
-
-    setup = 'import numpy, zlib;'
-    setup += 'd = numpy.random.random((500,3));'
-
-    crc32 = timeit.timeit(setup=setup,
-                          stmt='zlib.crc32(d)',
-                          number=count)
-    adler32 = timeit.timeit(setup=setup,
-                            stmt='zlib.adler32(d)',
-                            number=count)
-    if adler32 < crc32:
-        return zlib.adler32
-    else:
-        return zlib.crc32
+    snapshot = metrics.snapshot()
+    if clear:
+        metrics.clear()
+    return snapshot
 
 
-# get the fastest CRC32 available on the
-# current platform when trimesh is imported
-crc32 = _fast_crc()
+# zlib.adler32 is faster than zlib.crc32 on some builds
+# but which one is faster is not consistent across platforms
+# and timing them on import is slow and makes checksums
+# differ between machines, so always use zlib.crc32
+crc32 = zlib.crc32
@@ -121,14 +121,22 @@ def log_time(method):
     A decorator for methods which will time the method
     and then emit a log.debug message with the method name
     and how long it took to execute.
+
+    The time is also recorded in `trimesh.caching.metrics`
+    if it is enabled.
     """
 
     def timed(*args, **kwargs):
         tic = time_function()
         result = method(*args, **kwargs)
+        elapsed = time_function() - tic
         log.debug('%s executed in %.4f seconds.',
                   method.__name__,
-                  time_function() - tic)
+                  elapsed)
+        # caching imports constants so import here
+        from .caching import metrics
+        if metrics.enabled:
+            metrics.call(method.__name__, elapsed)
         return result
     timed.__name__ = method.__name__
     timed.__doc__ = method.__doc__
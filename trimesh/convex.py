@@ -11,18 +11,12 @@ Convex is defined as:
 
 import numpy as np
 
-from .constants import tol, log
+from .constants import tol
 
 from . import util
 from . import triangles
 
 
-try:
-    from scipy import spatial
-except ImportError:
-    log.warning('Scipy import failed!')
-
-
 def convex_hull(obj, qhull_options='QbB Pp QJn'):
     """
     Get a new Trimesh object representing the convex hull of the
@@ -39,6 +33,7 @@ def convex_hull(obj, qhull_options='QbB Pp QJn'):
     convex : Trimesh
       Mesh of convex hull
     """
+    from scipy import spatial
     from .base import Trimesh
 
     if isinstance(obj, Trimesh):
@@ -201,6 +196,7 @@ def hull_points(obj, qhull_options='QbB Pp'):
     --------
     points: (o,d) convex set of points
     """
+    from scipy import spatial
     if hasattr(obj, 'convex_hull'):
         return obj.convex_hull.vertices
 
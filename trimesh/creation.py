@@ -17,16 +17,6 @@ from . import transformations
 import numpy as np
 import collections
 
-try:
-    # shapely is a soft dependency
-    from shapely.geometry import Polygon
-    from shapely.wkb import loads as load_wkb
-except BaseException:
-    # shapely will sometimes raise OSErrors
-    # on import rather than just ImportError
-    log.warning('shapely.geometry.Polygon not available!',
-                exc_info=True)
-
 
 def validate_polygon(obj):
     """
@@ -47,6 +37,10 @@ def validate_polygon(obj):
     ValueError
       If a valid finite- area polygon isn't available
     """
+    # shapely is a soft dependency and slow to import
+    from shapely.geometry import Polygon
+    from shapely.wkb import loads as load_wkb
+
     if isinstance(obj, Polygon):
         polygon = obj
     elif util.is_shape(obj, (-1, 2)):
@@ -188,6 +182,7 @@ def sweep_polygon(polygon,
     vertices, faces = util.append_faces(vertices, faces)
 
     # Create final cap
+    from shapely.geometry import Polygon
     x, y, z = util.generate_basis(path[-1] - path[-2])
     vecs = verts_3d - path[-1]
     coords = np.c_[np.einsum('ij,j->i', vecs, x),
@@ -385,6 +380,7 @@ def _polygon_to_kwargs(polygon):
     result : dict
       Has keys: vertices, segments, holes
     """
+    from shapely.geometry import Polygon
 
     if not polygon.is_valid:
         raise ValueError('invalid shapely polygon passed!')
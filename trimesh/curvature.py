@@ -8,11 +8,6 @@ import numpy as np
 
 from . import util
 
-try:
-    from scipy.sparse.coo import coo_matrix
-except ImportError:
-    pass
-
 
 def face_angles_sparse(mesh):
     """
@@ -24,6 +19,7 @@ def face_angles_sparse(mesh):
             dtype: float
             shape: (len(mesh.vertices), len(mesh.faces))
     """
+    from scipy.sparse import coo_matrix
     matrix = coo_matrix((mesh.face_angles.flatten(),
                          (mesh.faces_sparse.row, mesh.faces_sparse.col)),
                         mesh.faces_sparse.shape)
@@ -21,25 +21,62 @@ from .wavefront import _obj_loaders
 from .xml_based import _xml_loaders
 
 
-try:
-    from ..path.exchange.load import load_path, path_formats
-except BaseException as E:
-    # save a traceback to see why path didn't import
-    _path_exception = E
+# the path module and its dependencies are slow to import
+# so it is imported on first use and the result kept here
+_path_module = {}
 
-    def load_path(*args, **kwargs):
-        """
-        Dummy load path function that will raise an exception
-        on use. Import of path failed, probably because a
-        dependency is not installed.
 
-        Raises
-        ----------
-        path_exception : Whatever failed when we imported path
-        """
-        raise _path_exception
+def _import_path():
+    """
+    Import `trimesh.path.exchange.load` on first use.
+
+    Returns
+    ----------
+    module : module
+      The path loading module
+
+    Raises
+    ----------
+    path_exception : Whatever failed when we imported path
+    """
+    if 'module' not in _path_module:
+        try:
+            from ..path.exchange import load as module
+        except BaseException as E:
+            # save a traceback to see why path didn't import
+            module = E
+        _path_module['module'] = module
+    module = _path_module['module']
+    if isinstance(module, BaseException):
+        raise module
+    return module
+
+
+def load_path(*args, **kwargs):
+    """
+    Load a file to a Path object, see
+    `trimesh.path.exchange.load.load_path`
 
-    def path_formats():
+    Raises
+    ----------
+    path_exception : Whatever failed when we imported path
+    """
+    return _import_path().load_path(*args, **kwargs)
+
+
+def path_formats():
+    """
+    Get a list of supported path formats.
+
+    Returns
+    ------------
+    loaders : list of str
+      Extensions of loadable formats, or empty if
+      path failed to import
+    """
+    try:
+        return _import_path().path_formats()
+    except BaseException:
         return []
 
 
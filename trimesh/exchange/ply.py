@@ -1,8 +1,13 @@
 import numpy as np
 
-from distutils.spawn import find_executable
 from string import Template
 
+try:
+    # distutils is slow to import so avoid it where possible
+    from shutil import which as find_executable
+except ImportError:
+    from distutils.spawn import find_executable
+
 import json
 import tempfile
 import subprocess
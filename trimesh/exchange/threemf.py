@@ -1,5 +1,4 @@
 import numpy as np
-import networkx as nx
 
 import collections
 
@@ -23,6 +22,7 @@ def load_3MF(file_obj,
     ------------
     kwargs: dict, with keys 'graph', 'geometry', 'base_frame'
     """
+    import networkx as nx
     # dict, {name in archive: BytesIo}
     archive = util.decompress(file_obj, file_type='zip')
     # load the XML into an LXML tree
@@ -3,7 +3,6 @@ import os
 import numpy as np
 
 from ..constants import log
-from ..decomposition import convex_decomposition
 from ..version import __version__ as trimesh_version
 
 
@@ -32,6 +31,8 @@ def export_urdf(mesh,
     import lxml.etree as et
     # TODO: fix circular import
     from .export import export_mesh
+    # decomposition imports the external program interfaces
+    from ..decomposition import convex_decomposition
     # Extract the save directory and the file name
     fullpath = os.path.abspath(directory)
     name = os.path.basename(fullpath)
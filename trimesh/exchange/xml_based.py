@@ -1,5 +1,4 @@
 import numpy as np
-import networkx as nx
 
 import collections
 import json
@@ -163,6 +162,7 @@ def load_3DXML(file_obj, *args, **kwargs):
     kwargs : dict
       Can be passed to trimesh.exchange.load.load_kwargs
     """
+    import networkx as nx
     archive = util.decompress(file_obj, file_type='zip')
 
     # a dictionary of file name : lxml etree
@@ -3,11 +3,6 @@ import numpy as np
 from . import util
 from .constants import tol, log
 
-try:
-    from scipy.sparse import coo_matrix
-except ImportError:
-    log.warning('scipy.sparse.coo_matrix unavailable')
-
 
 def plane_transform(origin, normal):
     """
@@ -294,6 +289,7 @@ def index_sparse(column_count, indices):
     In [7]: dense.sum(axis=0)
     Out[7]: array([3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3])
     """
+    from scipy.sparse import coo_matrix
     indices = np.asanyarray(indices)
     column_count = int(column_count)
 
@@ -10,7 +10,6 @@ backends.
 """
 
 import numpy as np
-import networkx as nx
 import collections
 
 from . import util
@@ -26,11 +25,6 @@ try:
 except ImportError:
     _has_gt = False
 
-try:
-    from scipy.sparse import csgraph, coo_matrix
-except ImportError:
-    log.warning('no scipy')
-
 
 def face_adjacency(faces=None,
                    mesh=None,
@@ -210,6 +204,7 @@ def vertex_adjacency_graph(mesh):
     >>> graph.neighbors(0)
     > [1,3,4]
     """
+    import networkx as nx
     g = nx.Graph()
     g.add_edges_from(mesh.edges_unique)
     return g
@@ -240,6 +235,7 @@ def connected_edges(G, nodes):
     are connected to nodes
 
     """
+    import networkx as nx
     nodes_in_G = collections.deque()
     for node in nodes:
         if not G.has_node(node):
@@ -358,6 +354,7 @@ def connected_components(edges,
         """
         Find connected components using networkx
         """
+        import networkx as nx
         graph = nx.from_edgelist(edges)
         # make sure every face has a node, so single triangles
         # aren't discarded (as they aren't adjacent to anything)
@@ -460,8 +457,8 @@ def connected_components(edges,
     for function in engines.values():
         try:
             return function()
-        # will be raised if the library didn't import correctly above
-        except NameError:
+        # will be raised if the library didn't import correctly
+        except (NameError, ImportError):
             continue
     raise ImportError('No connected component engines available!')
 
@@ -482,6 +479,7 @@ def connected_component_labels(edges, node_count=None):
     labels : (node_count,) int
         Component labels for each node
     """
+    from scipy.sparse import csgraph
     matrix = edges_to_coo(edges, node_count)
     body_count, labels = csgraph.connected_components(
         matrix, directed=False)
@@ -641,6 +639,7 @@ def traversals(edges, mode='bfs'):
     traversals: (m,) sequence of (p,) int,
                 ordered DFS or BFS traversals of the graph.
     """
+    from scipy.sparse import csgraph
     edges = np.asanyarray(edges, dtype=np.int64)
     if len(edges) == 0:
         return []
@@ -704,6 +703,7 @@ def edges_to_coo(edges, count=None, data=None):
     matrix: (count, count) scipy.sparse.coo_matrix
       Sparse COO
     """
+    from scipy.sparse import coo_matrix
     edges = np.asanyarray(edges, dtype=np.int64)
     if not (len(edges) == 0 or
             util.is_shape(edges, (-1, 2))):
@@ -809,9 +809,9 @@ def graph_to_svg(graph):
     ---------
     svg: string, pictoral layout in SVG format
     """
-
     import tempfile
     import subprocess
+    import networkx as nx
     with tempfile.NamedTemporaryFile() as dot_file:
         nx.drawing.nx_agraph.write_dot(graph, dot_file.name)
         svg = subprocess.check_output(['dot', dot_file.name, '-Tsvg'])
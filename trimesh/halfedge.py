@@ -0,0 +1,319 @@
+"""
+halfedge.py
+-------------
+
+An array- backed half- edge structure for triangle meshes.
+
+It is computed once from faces and topological queries such
+as edges, face adjacency, boundaries and vertex neighbors are
+all views of the same flat arrays rather than each doing
+their own sort of the edges.
+"""
+import numpy as np
+
+from . import util
+from . import grouping
+
+
+class HalfEdges(object):
+    """
+    Half- edges of a triangle mesh stored in flat arrays.
+
+    Half- edge `3 * f + k` runs from vertex `faces[f][k]` to
+    vertex `faces[f][(k + 1) % 3]`, which is the same order as
+    `geometry.faces_to_edges`, so half- edges index `mesh.edges`.
+
+    All arrays are read only once constructed.
+
+    Attributes
+    ------------
+    vertex : (3 * len(faces),) int
+      Vertex each half- edge starts at
+    face : (3 * len(faces),) int
+      Face each half- edge belongs to
+    next : (3 * len(faces),) int
+      Next half- edge around the same face
+    prev : (3 * len(faces),) int
+      Previous half- edge around the same face
+    twin : (3 * len(faces),) int
+      Half- edge running along the same edge in the other
+      face, or -1 if the edge isn't shared by exactly two faces
+    edge : (3 * len(faces),) int
+      Index of edges_unique each half- edge runs along
+    edges_sorted : (3 * len(faces), 2) int
+      Vertices of each half- edge sorted along axis 1
+    edges_unique : (m, 2) int
+      Sorted vertices of each undirected edge
+    edges_unique_idx : (m,) int
+      First half- edge along each unique edge
+    shared : (j,) int
+      One half- edge of every edge shared by exactly two faces
+    outgoing : (max(faces) + 1,) int
+      A half- edge starting at each vertex, which is on the
+      boundary if the vertex is, or -1 for unused vertices
+    """
+
+    def __init__(self, faces):
+        """
+        Build half- edges from triangular faces.
+
+        Parameters
+        ------------
+        faces : (n, 3) int
+          Indexes of vertices which make up triangles
+        """
+        faces = np.asanyarray(faces).view(np.ndarray)
+        if faces.size == 0:
+            faces = faces.reshape((-1, 3))
+        if not util.is_shape(faces, (-1, 3)):
+            raise ValueError('half- edges require (n, 3) faces!')
+
+        # half- edges are stored in the order of faces and
+        # copied so changing faces in- place can't change them
+        self.vertex = faces.reshape(-1).copy()
+        index = np.arange(len(self.vertex))
+        self.face = index // 3
+
+        # the other half- edges in the same face
+        corner = index % 3
+        self.next = index - corner + (corner + 1) % 3
+        self.prev = index - corner + (corner + 2) % 3
+
+        # group half- edges which run along the same edge
+        edges = np.column_stack((self.vertex,
+                                 self.vertex[self.next]))
+        edges.sort(axis=1)
+        unique, inverse = grouping.unique_rows(edges)
+        self.edges_sorted = edges
+        self.edges_unique = edges[unique]
+        self.edges_unique_idx = unique
+        self.edge = inverse
+
+        # half- edges ordered so those along an edge are adjacent
+        counts = np.bincount(inverse, minlength=len(unique))
+        order = inverse.argsort(kind='mergesort')
+        start = np.cumsum(counts) - counts
+        # only edges used by exactly two faces have a twin
+        pair = start[counts == 2]
+        self.shared = order[pair]
+        self.twin = np.full(len(index), -1, dtype=np.int64)
+        self.twin[order[pair]] = order[pair + 1]
+        self.twin[order[pair + 1]] = order[pair]
+
+        # any half- edge starting at each vertex
+        self.outgoing = np.full(
+            int(self.vertex.max()) + 1 if len(self.vertex) > 0 else 0,
+            -1,
+            dtype=np.int64)
+        self.outgoing[self.vertex] = index
+        # walks around a boundary vertex have to start at the
+        # boundary so override with half- edges missing a twin
+        open_edge = np.nonzero(self.twin < 0)[0]
+        self.outgoing[self.vertex[open_edge]] = open_edge
+
+        for value in self.__dict__.values():
+            value.flags.writeable = False
+
+    def __len__(self):
+        return len(self.vertex)
+
+    @property
+    def nbytes(self):
+        """
+        Memory used by the half- edge arrays.
+
+        Returns
+        ----------
+        nbytes : int
+          Total bytes of every array
+        """
+        return sum(int(v.nbytes) for v in self.__dict__.values())
+
+    @property
+    def edges(self):
+        """
+        Vertices of every half- edge in order.
+
+        Returns
+        ----------
+        edges : (3 * len(faces), 2) int
+          Start and end vertex of each half- edge
+        """
+        return np.column_stack((self.vertex,
+                                self.vertex[self.next]))
+
+    @property
+    def face_adjacency(self):
+        """
+        Pairs of faces which share an edge.
+
+        Returns
+        ----------
+        adjacency : (len(self.shared), 2) int
+          Face indexes sorted along axis 1
+        """
+        adjacency = np.column_stack((self.face[self.shared],
+                                     self.face[self.twin[self.shared]]))
+        adjacency.sort(axis=1)
+        return adjacency
+
+    @property
+    def is_watertight(self):
+        """
+        Is every edge shared by exactly two faces.
+
+        Returns
+        ----------
+        watertight : bool
+          True if every half- edge has a twin
+        """
+        return bool((self.twin >= 0).all())
+
+    @property
+    def is_winding_consistent(self):
+        """
+        Does every shared edge run in opposite directions in
+        its two faces.
+
+        Returns
+        ----------
+        consistent : bool
+          True if twins are reversed
+        """
+        twin = self.twin[self.shared]
+        return bool((self.vertex[twin] ==
+                     self.vertex[self.next[self.shared]]).all())
+
+    def rotate(self, halfedge):
+        """
+        Step to the next half- edge leaving the same vertex,
+        across the previous edge of the current face.
+
+        Parameters
+        ------------
+        halfedge : int or (n,) int
+          Half- edges starting at a vertex
+
+        Returns
+        ------------
+        rotated : int or (n,) int
+          Half- edges starting at the same vertex in the
+          adjacent face, or -1 at a boundary
+        """
+        return self.twin[self.prev[halfedge]]
+
+    def one_ring(self, vertex):
+        """
+        Vertices connected to a vertex by an edge, in order
+        around the vertex.
+
+        The walk takes time proportional to the valence of the
+        vertex and assumes a manifold fan with consistent winding.
+
+        Parameters
+        ------------
+        vertex : int
+          Index of a vertex
+
+        Returns
+        ------------
+        ring : (m,) int
+          Neighboring vertices, starting and ending on the
+          boundary if the vertex is on one
+        """
+        if vertex >= len(self.outgoing) or self.outgoing[vertex] < 0:
+            return np.array([], dtype=np.int64)
+
+        start = self.outgoing[vertex]
+        current = start
+        ring = []
+        for i in range(len(self.vertex)):
+            ring.append(self.vertex[self.next[current]])
+            rotated = self.rotate(current)
+            if rotated < 0:
+                # reached the other side of a boundary
+                ring.append(self.vertex[self.prev[current]])
+                break
+            if rotated == start or self.vertex[rotated] != vertex:
+                break
+            current = rotated
+        return np.array(ring, dtype=np.int64)
+
+    def neighbors(self, count=None):
+        """
+        Vertices connected to every vertex by an edge.
+
+        Parameters
+        ------------
+        count : None or int
+          Number of vertices, to include unused vertices
+
+        Returns
+        ------------
+        neighbors : (count,) list of (m,) int
+          Sorted neighbors of each vertex
+        """
+        if count is None:
+            count = len(self.outgoing)
+        # every unique edge in both directions, where
+        # a degenerate edge is its own reverse
+        edges = self.edges_unique
+        pairs = np.vstack((edges,
+                           edges[edges[:, 0] != edges[:, 1]][:, ::-1]))
+        pairs = pairs[np.lexsort(pairs.T[::-1])]
+        split = np.cumsum(np.bincount(pairs[:, 0], minlength=count))
+        return np.split(pairs[:, 1], split[:-1])
+
+    def boundaries(self):
+        """
+        Closed loops of vertices along edges which are only
+        used by a single face.
+
+        Returns
+        ------------
+        loops : (n,) list of (m,) int
+          Vertex indexes of each loop in order
+        """
+        counts = np.bincount(self.edge)
+        boundary = np.nonzero(counts[self.edge] == 1)[0]
+
+        loops = []
+        visited = np.zeros(len(self.vertex), dtype=bool)
+        for start in boundary:
+            if visited[start]:
+                continue
+            loop = []
+            current = start
+            while not visited[current]:
+                visited[current] = True
+                loop.append(self.vertex[current])
+                current = self._boundary_next(current)
+                if current < 0:
+                    break
+            loops.append(np.array(loop, dtype=np.int64))
+        return loops
+
+    def _boundary_next(self, halfedge):
+        """
+        Find the boundary half- edge which continues from
+        the end of a boundary half- edge.
+
+        Parameters
+        ------------
+        halfedge : int
+          Half- edge without a twin
+
+        Returns
+        ------------
+        following : int
+          Half- edge without a twin starting where
+          halfedge ends, or -1 if the walk fails
+        """
+        current = self.next[halfedge]
+        for i in range(len(self.vertex)):
+            if self.twin[current] < 0:
+                return current
+            current = self.next[self.twin[current]]
+            if current == self.next[halfedge]:
+                break
+        return -1
@@ -11,12 +11,6 @@ from . import convex
 
 from .constants import log, tol
 
-try:
-    from scipy import spatial
-    from scipy.optimize import leastsq
-except ImportError:
-    log.warning('No scipy!')
-
 
 def minimum_nsphere(obj):
     """
@@ -37,6 +31,7 @@ def minimum_nsphere(obj):
     center: (d) float, center of n- sphere
     radius: float, radius of n-sphere
     """
+    from scipy import spatial
     # reduce the input points or mesh to the vertices of the convex hull
     # since we are computing the furthest site voronoi diagram this reduces
     # the input complexity substantially and returns the same value
@@ -118,6 +113,7 @@ def fit_nsphere(points, prior=None):
     error : float
       Peak to peak value of deviation from mean radius
     """
+    from scipy.optimize import leastsq
     # make sure points are numpy array
     points = np.asanyarray(points, dtype=np.float64)
     # create ones so we can dot instead of using slower sum
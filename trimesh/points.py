@@ -347,19 +347,39 @@ class PointCloud(Geometry):
     in a scene.
     """
 
-    def __init__(self, *args, **kwargs):
+    # dtype of vertices, changed with `precision`
+    _dtypes = util.precision_dtypes()
+
+    def __init__(self,
+                 vertices=None,
+                 color=None,
+                 precision=None,
+                 **kwargs):
+        """
+        Create a PointCloud object.
+
+        Parameters
+        ------------
+        vertices : (n, 3) float
+          Points in space
+        color : None or (n, 4) uint8 or (4,) uint8
+          Color of every point or one color for all points
+        precision : None or str
+          'float32' stores vertices as float32 to halve memory,
+          None or 'float64' for float64 vertices
+        """
         self._data = caching.DataStore()
         self._cache = caching.Cache(self._data.md5)
         self.metadata = {}
 
-        # load vertices from args/kwargs
-        if 'vertices' in kwargs:
-            self.vertices = kwargs['vertices']
-        elif len(args) == 1:
-            self.vertices = args[0]
+        if precision is not None:
+            self._dtypes = util.precision_dtypes(precision)
 
-        if 'color' in kwargs:
-            self.colors = kwargs['color']
+        if vertices is not None:
+            self.vertices = vertices
+
+        if color is not None:
+            self.colors = color
 
     def __setitem__(self, *args, **kwargs):
         return self.vertices.__setitem__(*args, **kwargs)
@@ -395,6 +415,7 @@ class PointCloud(Geometry):
           Copy of current point cloud
         """
         copied = PointCloud()
+        copied._dtypes = self._dtypes
 
         # copy vertex and face data
         copied._data.data = copy.deepcopy(self._data.data)
@@ -497,12 +518,30 @@ class PointCloud(Geometry):
     @vertices.setter
     def vertices(self, data):
         # we want to copy data for new object
-        data = np.array(data, dtype=np.float64, copy=True)
+        data = np.array(data, dtype=self._dtypes[0], copy=True)
         if not util.is_shape(data, (-1, 3)):
             raise ValueError(
                 'point clouds only consist of (n,3) points!')
         self._data['vertices'] = data
 
+    @property
+    def precision(self):
+        """
+        The precision vertices are stored with.
+
+        Returns
+        ------------
+        precision : str
+          'float64' or 'float32'
+        """
+        return np.dtype(self._dtypes[0]).name
+
+    @precision.setter
+    def precision(self, value):
+        self._dtypes = util.precision_dtypes(value)
+        if 'vertices' in self._data:
+            self.vertices = self._data['vertices']
+
     @property
     def colors(self):
         """
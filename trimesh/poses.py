@@ -4,7 +4,6 @@ poses.py
 
 Find stable orientations of meshes.
 """
-import networkx as nx
 import numpy as np
 
 from .triangles import points_to_barycentric
@@ -235,6 +234,7 @@ def _create_topple_graph(cvh_mesh, com):
     graph: networkx.DiGraph(), graph representing static probabilities and toppling
                                order for the convex hull
     """
+    import networkx as nx
     adj_graph = nx.Graph()
     topple_graph = nx.DiGraph()
 
@@ -109,6 +109,50 @@ def closest_point_naive(mesh, points):
     return closest, distance, triangle_id
 
 
+def nearby_faces_bvh(mesh, points, batch_size=10000):
+    """
+    For each point find every face which could be the closest
+    face using an exact branch- and- bound search of the mesh BVH.
+
+    Unlike `nearby_faces` the number of candidates doesn't grow
+    when points are far from large triangles, as the search is
+    bounded by the best distance found so far rather than the
+    distance to the nearest vertex.
+
+    Parameters
+    ----------
+    mesh : Trimesh object
+    points : (n,3) float, points in space
+    batch_size : int, number of points to search at once
+
+    Returns
+    -----------
+    query_tri_id : (c,) int, candidate indexes for mesh.faces
+    count : (n,) int, number of candidates for each point
+    """
+    points = np.asanyarray(points, dtype=np.float64)
+    if not util.is_shape(points, (-1, 3)):
+        raise ValueError('points must be (n,3)!')
+
+    tree = mesh.triangles_bvh
+    batch_size = max(int(batch_size), 1)
+
+    query_tri_id = deque()
+    count = deque()
+    for start in range(0, len(points), batch_size):
+        batch = points[start:start + batch_size]
+        # the closest point tie- break compares squared distances
+        # to tol.merge, and any face which could be tied with the
+        # closest is no more than sqrt(tol.merge) farther away
+        tri, point = tree.nearest_candidates(batch, pad=tol.merge ** 0.5)
+        query_tri_id.append(tri)
+        count.append(np.bincount(point, minlength=len(batch)))
+
+    if len(query_tri_id) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(query_tri_id), np.concatenate(count)
+
+
 def closest_point(mesh, points):
     """
     Given a mesh and a list of points, find the closest point on any triangle.
@@ -129,79 +173,190 @@ def closest_point(mesh, points):
     if not util.is_shape(points, (-1, 3)):
         raise ValueError('points must be (n,3)!')
 
-    # do a tree- based query for faces near each point
-    candidates = nearby_faces(mesh, points)
+    # evaluating candidates needs memory proportional to the
+    # number of candidates so only do a batch of points at once
+    batch_size = 10000
+    if len(points) <= batch_size:
+        # do an exact tree- based search for faces near each point
+        query_tri_id, count = nearby_faces_bvh(mesh, points)
+        closest, distance, triangle_id, ambiguous = _closest_candidates(
+            mesh, points, query_tri_id, count, return_ambiguous=True)
+        if ambiguous.any():
+            # faces which are exactly tied are picked by the order of
+            # the candidates, so use the same candidates as the
+            # r-tree search to pick the same face as it would
+            try:
+                candidates = nearby_faces(mesh, points[ambiguous])
+            except ImportError:
+                # without rtree keep the lowest tied face index
+                return closest, distance, triangle_id
+            (closest[ambiguous],
+             distance[ambiguous],
+             triangle_id[ambiguous]) = _closest_candidates(
+                 mesh,
+                 points[ambiguous],
+                 np.concatenate(candidates).astype(np.int64),
+                 [len(i) for i in candidates])
+        return closest, distance, triangle_id
+
+    result = [closest_point(mesh, points[start:start + batch_size])
+              for start in range(0, len(points), batch_size)]
+    closest, distance, triangle_id = zip(*result)
+    return (np.vstack(closest),
+            np.concatenate(distance),
+            np.concatenate(triangle_id))
+
+
+def _closest_candidates(mesh,
+                        points,
+                        query_tri_id,
+                        count,
+                        return_ambiguous=False):
+    """
+    Find the closest point on a set of candidate faces
+    for each point.
+
+    Parameters
+    ----------
+    mesh         : Trimesh object
+    points       : (m,3) float, points in space
+    query_tri_id : (c,) int, candidate faces of every point
+    count        : (m,) int, number of candidates for each point
+    return_ambiguous : bool, also return which points picked
+                       between exactly tied faces by candidate order
+
+    Returns
+    ----------
+    closest     : (m,3) float, closest point on triangles for each point
+    distance    : (m,)  float, distance
+    triangle_id : (m,)  int, index of triangle containing closest point
+    ambiguous   : (m,)  bool, only if return_ambiguous is True
+    """
     # view triangles as an ndarray so we don't have to recompute
     # the MD5 during all of the subsequent advanced indexing
     triangles = mesh.triangles.view(np.ndarray)
 
-    # create the corresponding list of triangles
-    # and query points to send to the closest_point function
-    query_point = deque()
-    query_tri = deque()
-    for triangle_ids, point in zip(candidates, points):
-        query_point.append(np.tile(point, (len(triangle_ids), 1)))
-        query_tri.append(triangles[triangle_ids])
-
-    # stack points into an (n,3) array
-    query_point = np.vstack(query_point)
-    # stack triangles into an (n,3,3) array
-    query_tri = np.vstack(query_tri)
+    query_tri_id = np.asanyarray(query_tri_id, dtype=np.int64)
+    count = np.asanyarray(count, dtype=np.int64)
+    # candidates are in a CSR- style representation
+    # where each point owns a contiguous range of candidates
+    query_group = np.repeat(np.arange(len(points)), count)
+    # the index of the first candidate of each point
+    query_start = np.cumsum(count) - count
 
     # do the computation for closest point
-    query_close = closest_point_corresponding(query_tri, query_point)
-    query_group = np.cumsum(np.array([len(i) for i in candidates]))[:-1]
-
+    query_point = points[query_group]
+    query_close = closest_point_corresponding(
+        triangles[query_tri_id], query_point)
     distance_2 = ((query_close - query_point) ** 2).sum(axis=1)
 
-    # find the single closest point for each group of candidates
-    result_close = np.zeros((len(points), 3), dtype=np.float64)
-    result_tid = np.zeros(len(points), dtype=np.int64)
-    result_distance = np.zeros(len(points), dtype=np.float64)
-
-    # go through results to get minimum distance result
-    for i, close_points, distance, candidate in zip(
-            np.arange(len(points)),
-            np.array_split(query_close, query_group),
-            np.array_split(distance_2, query_group),
-            candidates):
-
-        # unless some other check is true use the smallest distance
-        idx = distance.argmin()
-
-        # if we have multiple candidates check them
-        if len(candidate) > 1:
-            # (2, ) int, list of 2 closest candidate indices
-            idxs = distance.argsort()[:2]
-            # make sure the two distances are identical
-            check_distance = distance[idxs].ptp() < tol.merge
-            # make sure the magnitude of both distances are nonzero
-            check_magnitude = (np.abs(distance[idxs]) > tol.merge).all()
-
-            # check if query-points are actually off-surface
-            if check_distance and check_magnitude:
-                # get face normals for two points
-                normals = mesh.face_normals[np.array(candidate)[idxs]]
-                # compute normalized surface-point to query-point vectors
-                vectors = ((points[i] - close_points[idxs]) /
-                           distance[idxs, np.newaxis] ** 0.5)
-                # compare enclosed angle for both face normals
-                dots = util.diagonal_dot(normals, vectors)
-                # take the idx with the most positive angle
-                idx = idxs[dots.argmax()]
-
-        # take the single closest value from the group of values
-        result_close[i] = close_points[idx]
-        result_tid[i] = candidate[idx]
-        result_distance[i] = distance[idx]
+    # the closest candidate for every point using segmented
+    # reductions, which break ties by taking the lowest candidate
+    # index so the result is ordered by (distance, candidate)
+    result_idx = _segment_argmin(distance_2, query_start, query_group)
+
+    # points with more than one candidate need to check if
+    # the two closest candidates are tied
+    multiple = np.nonzero(count > 1)[0]
+    # mask out the closest candidate to find the second closest
+    # which is again the lowest candidate index of any ties
+    masked = distance_2.copy()
+    masked[result_idx] = np.inf
+    second = _segment_argmin(masked, query_start, query_group)
+    idxs = np.column_stack((result_idx[multiple],
+                            second[multiple]))
+    pair_distance = distance_2[idxs]
+    # make sure the two distances are identical
+    check_distance = pair_distance.ptp(axis=1) < tol.merge
+    # make sure the magnitude of both distances are nonzero
+    check_magnitude = (np.abs(pair_distance) > tol.merge).all(axis=1)
+    # check if query-points are actually off-surface
+    check = np.logical_and(check_distance, check_magnitude)
+
+    # when the closest candidates are exactly tied the
+    # result depends on the order of the candidates
+    tied = pair_distance[:, 0] == pair_distance[:, 1]
+    ambiguous = np.zeros(len(points), dtype=bool)
+    ambiguous[multiple[np.logical_and(tied, ~check)]] = True
+
+    if check.any():
+        multiple = multiple[check]
+        idxs = idxs[check]
+        tied = tied[check]
+        # if the second closest is exactly tied with a third
+        # candidate the pair depends on the sort, so pick the
+        # same pair of candidates that `argsort` would
+        masked[second] = np.inf
+        third = _segment_argmin(masked, query_start, query_group)
+        triple = np.logical_and(
+            count[multiple] > 2,
+            distance_2[third[multiple]] == distance_2[idxs[:, 1]])
+        for i in np.nonzero(triple)[0]:
+            start = query_start[multiple[i]]
+            idxs[i] = start + distance_2[
+                start:start + count[multiple[i]]].argsort()[:2]
+        # get face normals for both candidates
+        normals = mesh.face_normals[query_tri_id[idxs]]
+        # compute normalized surface-point to query-point vectors
+        vectors = ((points[multiple].reshape((-1, 1, 3)) -
+                    query_close[idxs]) /
+                   distance_2[idxs].reshape((-1, 2, 1)) ** 0.5)
+        # compare enclosed angle for both face normals
+        dots = (normals * vectors).sum(axis=2)
+        # take the idx with the most positive angle
+        result_idx[multiple] = idxs[np.arange(len(idxs)),
+                                    dots.argmax(axis=1)]
+        # exactly tied candidates at the same angle are
+        # picked by whichever one `argsort` puts first
+        same = np.logical_and(tied, dots[:, 0] == dots[:, 1])
+        for i in np.nonzero(np.logical_and(same, ~triple))[0]:
+            start = query_start[multiple[i]]
+            result_idx[multiple[i]] = start + distance_2[
+                start:start + count[multiple[i]]].argsort()[0]
+        ambiguous[multiple[np.logical_or(triple, same)]] = True
+
+    # take the single closest value from each group of values
+    result_close = query_close[result_idx]
+    result_tid = query_tri_id[result_idx]
+    result_distance = distance_2[result_idx]
 
     # we were comparing the distance squared so
     # now take the square root in one vectorized operation
     result_distance **= .5
 
+    if return_ambiguous:
+        return result_close, result_distance, result_tid, ambiguous
     return result_close, result_distance, result_tid
 
 
+def _segment_argmin(values, start, group):
+    """
+    Find the index of the first minimum value in every
+    contiguous nonempty segment of an array.
+
+    Parameters
+    ----------
+    values : (n,) float
+      Values to find the minimum of
+    start : (m,) int
+      Index of the first value of each segment
+    group : (n,) int
+      Segment index for every value
+
+    Returns
+    ----------
+    index : (m,) int
+      Index of values for the minimum of each segment
+    """
+    minimum = np.minimum.reduceat(values, start)
+    # positions which aren't a minimum are set past the end
+    position = np.where(values == minimum[group],
+                        np.arange(len(values)),
+                        len(values))
+    index = np.minimum.reduceat(position, start)
+    return index
+
+
 def signed_distance(mesh, points):
     """
     Find the signed distance from a mesh to a list of points.
@@ -378,6 +533,36 @@ def max_tangent_sphere(mesh,
     centers : (n,3) float, centers of spheres
     radii : (n,) float, radii of spheres
 
+    """
+    centers, radii, contacts = _shrink_spheres(mesh=mesh,
+                                               points=points,
+                                               inwards=inwards,
+                                               normals=normals,
+                                               threshold=threshold,
+                                               max_iter=max_iter)
+    return centers, radii
+
+
+def _shrink_spheres(mesh,
+                    points,
+                    inwards=True,
+                    normals=None,
+                    threshold=1e-6,
+                    max_iter=100):
+    """
+    Run the shrinking sphere iteration on every point at once,
+    dropping points from the active set as they converge.
+
+    Parameters
+    ----------
+    See `max_tangent_sphere`
+
+    Returns
+    ----------
+    centers : (n,3) float, centers of spheres
+    radii : (n,) float, radii of spheres
+    contacts : (n,3) float, second point where each sphere
+               touches the mesh, NaN for infinite spheres
     """
     points = np.asanyarray(points, dtype=np.float64)
     if not util.is_shape(points, (-1, 3)):
@@ -399,26 +584,41 @@ def max_tangent_sphere(mesh,
     # Find initial tangent spheres
     distances = longest_ray(mesh, points, normals)
     radii = distances * 0.5
-    not_converged = np.ones(len(points), dtype=np.bool)  # boolean mask
+    contacts = points + normals * distances.reshape((-1, 1))
 
     # If ray is infinite, find the vertex which is furthest from our point
     # when projected onto the ray. I.e. find v which maximises
-    # (v-p).n = v.n - p.n.
-    # We use a loop rather a vectorised approach to reduce memory cost
-    # it also seems to run faster.
-    for i in np.where(np.isinf(distances))[0]:
-        projections = np.dot(mesh.vertices - points[i], normals[i])
-
-        # If no points lie outside the tangent plane, then the radius is infinite
-        # otherwise we have a point outside the tangent plane, take the one with maximal
-        # projection
-        if projections.max() < tol.planar:
-            radii[i] = np.inf
-            not_converged[i] = False
-        else:
-            vertex = mesh.vertices[projections.argmax()]
-            radii[i] = (np.dot(vertex - points[i], vertex - points[i]) /
-                        (2 * np.dot(vertex - points[i], normals[i])))
+    # (v-p).n = v.n - p.n which only a convex hull vertex can do
+    infinite = np.nonzero(np.isinf(distances))[0]
+    if len(infinite) > 0:
+        try:
+            vertices = mesh.convex_hull.vertices.view(np.ndarray)
+        except RuntimeError:
+            # qhull errors subclass RuntimeError, and any
+            # vertex is still a valid candidate
+            vertices = mesh.vertices.view(np.ndarray)
+        # evaluate projections in chunks to bound memory
+        chunk = max(1, int(1e7 // len(vertices)))
+        for start in range(0, len(infinite), chunk):
+            index = infinite[start:start + chunk]
+            projections = (np.dot(normals[index], vertices.T) -
+                           util.diagonal_dot(points[index],
+                                             normals[index]).reshape((-1, 1)))
+            best = projections.argmax(axis=1)
+            vertex = vertices[best]
+            diff = vertex - points[index]
+            # If no points lie outside the tangent plane, then the
+            # radius is infinite otherwise take the one with
+            # maximal projection
+            with np.errstate(divide='ignore', invalid='ignore'):
+                radii[index] = np.where(
+                    projections[np.arange(len(index)), best] < tol.planar,
+                    np.inf,
+                    util.diagonal_dot(diff, diff) /
+                    (2 * util.diagonal_dot(diff, normals[index])))
+            contacts[index] = vertex
+
+    contacts[np.isinf(radii)] = np.nan
 
     # Compute centers
     centers = points + normals * np.nan_to_num(radii.reshape(-1, 1))
@@ -428,41 +628,80 @@ def max_tangent_sphere(mesh,
     # radius is less than threshold*D
     D = np.linalg.norm(mesh.bounds[1] - mesh.bounds[0])
     convergence_threshold = threshold * D
+
+    # indexes of points which have not converged
+    active = np.nonzero(np.isfinite(radii))[0]
     n_iter = 0
-    while not_converged.sum() > 0 and n_iter < max_iter:
+    while len(active) > 0 and n_iter < max_iter:
         n_iter += 1
         n_points, n_dists, n_faces = mesh.nearest.on_surface(
-            centers[not_converged])
+            centers[active])
 
         # If the distance to the nearest point is the same as the distance
         # to the start point then we are done.
-        done = np.abs(
-            n_dists -
-            np.linalg.norm(
-                centers[not_converged] -
-                points[not_converged],
-                axis=1)) < tol.planar
-        not_converged[np.where(not_converged)[0][done]] = False
+        done = np.abs(n_dists - radii[active]) < tol.planar
+        active = active[~done]
+        n_points = n_points[~done]
+        if len(active) == 0:
+            break
 
         # Otherwise find the radius and center of the sphere tangent to the mesh
         # at the point and the nearest point.
-        diff = n_points[~done] - points[not_converged]
-        old_radii = radii[not_converged].copy()
-        # np.einsum produces element wise dot product
-        radii[not_converged] = (np.einsum('ij, ij->i',
-                                          diff,
-                                          diff) /
-                                (2 * np.einsum('ij, ij->i',
-                                               diff,
-                                               normals[not_converged])))
-        centers[not_converged] = points[not_converged] + \
-            normals[not_converged] * radii[not_converged].reshape(-1, 1)
+        diff = n_points - points[active]
+        old_radii = radii[active]
+        new_radii = (util.diagonal_dot(diff, diff) /
+                     (2 * util.diagonal_dot(diff, normals[active])))
+        radii[active] = new_radii
+        centers[active] = points[active] + \
+            normals[active] * new_radii.reshape((-1, 1))
+        contacts[active] = n_points
 
         # If change in radius is less than threshold we have converged
-        cvged = old_radii - radii[not_converged] < convergence_threshold
-        not_converged[np.where(not_converged)[0][cvged]] = False
+        active = active[old_radii - new_radii >= convergence_threshold]
 
-    return centers, radii
+    return centers, radii, contacts
+
+
+def medial_axis(mesh,
+                inwards=True,
+                count=None,
+                threshold=1e-6,
+                max_iter=100):
+    """
+    Approximate the medial axis of a mesh with the maximal
+    tangent spheres at samples on its surface.
+
+    Parameters
+    ----------
+    mesh : Trimesh object
+    inwards : bool, whether to have the spheres inside or outside
+    count : None or int, number of surface samples to use
+            or one per face centroid if None
+    threshold : float, convergence threshold for the spheres
+    max_iter : int, maximum number of shrinking iterations
+
+    Returns
+    ----------
+    centers : (m,3) float, centers of medial spheres
+    radii : (m,) float, radii of medial spheres
+    origins : (m,3) float, sample point each sphere is tangent at
+    contacts : (m,3) float, second point each sphere is tangent at
+    """
+    if count is None:
+        origins = mesh.triangles_center
+        normals = mesh.face_normals
+    else:
+        from .sample import sample_surface
+        origins, index = sample_surface(mesh, count)
+        normals = mesh.face_normals[index]
+
+    centers, radii, contacts = _shrink_spheres(mesh=mesh,
+                                               points=origins,
+                                               inwards=inwards,
+                                               normals=normals,
+                                               threshold=threshold,
+                                               max_iter=max_iter)
+    return centers, radii, origins, contacts
 
 
 def thickness(mesh,
@@ -515,3 +754,277 @@ def thickness(mesh,
             return longest_ray(mesh, points, -normals)
     else:
         raise ValueError('Invalid method, use "max_sphere" or "ray"')
+
+
+def directed_hausdorff(mesh,
+                       other,
+                       tolerance=None,
+                       threshold=None,
+                       max_iter=10,
+                       max_triangles=100000):
+    """
+    Find the largest distance from any point on the surface of
+    a mesh to the surface of another mesh.
+
+    Distance to a single triangle is convex so its maximum over
+    a triangle is at one of the corners, and distance to the
+    surface is at most the distance to any one of its faces.
+    The largest distance from the corners of a triangle to
+    the face closest to one of its corners or its center is
+    therefore an upper bound for every point on the triangle,
+    and it is exact wherever a single face of other is closest.
+    Triangles whose upper bound exceeds the best distance found
+    so far are subdivided until the upper and lower bounds are
+    within tolerance of each other.
+
+    Parameters
+    ------------
+    mesh : Trimesh object
+      Mesh to measure deviation of
+    other : Trimesh object
+      Mesh to measure deviation from
+    tolerance : None or float
+      Maximum difference between the returned bounds,
+      1/1000 of the mesh scale if None
+    threshold : None or float
+      Stop as soon as the bounds are both above or both
+      below this distance
+    max_iter : int
+      Maximum number of subdivision iterations
+    max_triangles : int
+      Maximum number of triangles to subdivide per iteration,
+      which are picked by largest upper bound
+
+    Returns
+    ------------
+    lower : float
+      Largest distance found, a lower bound
+    upper : float
+      Upper bound on the directed Hausdorff distance
+    face_deviation : (len(mesh.faces),) float
+      Largest distance found on each face of mesh
+    """
+    if tolerance is None:
+        tolerance = mesh.scale / 1000.0
+    tolerance = float(tolerance)
+
+    # distance from every vertex and the face it is closest to
+    vertex_distance, vertex_face = closest_point(other, mesh.vertices)[1:]
+    triangles = mesh.triangles.view(np.ndarray)
+    corner = vertex_distance[mesh.faces]
+    corner_face = vertex_face[mesh.faces]
+    parent = np.arange(len(triangles))
+    other_triangles = other.triangles.view(np.ndarray)
+
+    face_deviation = np.zeros(len(mesh.faces), dtype=np.float64)
+    # the largest upper bound of triangles no longer refined
+    retired = 0.0
+    for iteration in range(max_iter + 1):
+        center = triangles.mean(axis=1)
+        center_distance, center_face = closest_point(other, center)[1:]
+
+        # bounds of the distance on each triangle
+        low = np.maximum(corner.max(axis=1), center_distance)
+        high = _corner_bound(
+            triangles,
+            other_triangles,
+            np.column_stack((corner_face, center_face)))
+        np.maximum.at(face_deviation, parent, low)
+
+        lower = face_deviation.max()
+        upper = max(high.max(), retired)
+
+        # stop if the bounds are tight or decide a threshold
+        if upper - lower <= tolerance:
+            break
+        if threshold is not None and (lower > threshold or
+                                      upper <= threshold):
+            break
+        if iteration == max_iter:
+            break
+
+        # only triangles which may hold a larger distance
+        active = high > lower + tolerance
+        retired = max(retired, high[~active].max()
+                      if not active.all() else 0.0)
+        active = np.nonzero(active)[0]
+        if len(active) > max_triangles:
+            # refine the most promising triangles and keep
+            # the rest around unchanged for later iterations
+            split = high[active].argsort()[::-1]
+            keep = active[split[max_triangles:]]
+            active = active[split[:max_triangles]]
+        else:
+            keep = np.zeros(0, dtype=np.int64)
+
+        # subdivide active triangles into four
+        tri = triangles[active]
+        mid = np.stack((tri[:, [0, 1]].mean(axis=1),
+                        tri[:, [1, 2]].mean(axis=1),
+                        tri[:, [2, 0]].mean(axis=1)), axis=1)
+        mid_distance, mid_face = closest_point(
+            other, mid.reshape((-1, 3)))[1:]
+        stacked = np.concatenate((tri, mid), axis=1)
+        stacked_distance = np.column_stack((corner[active],
+                                            mid_distance.reshape((-1, 3))))
+        stacked_face = np.column_stack((corner_face[active],
+                                        mid_face.reshape((-1, 3))))
+        # vertex indexes of each new triangle in stacked
+        split = np.array([[0, 3, 5],
+                          [1, 4, 3],
+                          [2, 5, 4],
+                          [3, 4, 5]])
+        triangles = np.vstack((
+            stacked[:, split].reshape((-1, 3, 3)),
+            triangles[keep]))
+        corner = np.vstack((
+            stacked_distance[:, split].reshape((-1, 3)),
+            corner[keep]))
+        corner_face = np.vstack((
+            stacked_face[:, split].reshape((-1, 3)),
+            corner_face[keep]))
+        parent = np.concatenate((np.repeat(parent[active], 4),
+                                 parent[keep]))
+
+    return lower, upper, face_deviation
+
+
+def _corner_bound(triangles, other_triangles, candidates, batch_size=10000):
+    """
+    Find an upper bound on the distance from every point on
+    each triangle to a set of other triangles, from the largest
+    distance of its corners to the best of some candidates.
+
+    Parameters
+    ------------
+    triangles : (n, 3, 3) float
+      Triangles to bound the distance of
+    other_triangles : (m, 3, 3) float
+      Triangles to measure distance to
+    candidates : (n, c) int
+      Index of other_triangles to check for each triangle
+    batch_size : int
+      Number of triangles to check at once
+
+    Returns
+    ------------
+    bound : (n,) float
+      Upper bound of the distance on each triangle
+    """
+    count = candidates.shape[1]
+    bound = np.zeros(len(triangles), dtype=np.float64)
+    for start in range(0, len(triangles), batch_size):
+        end = start + batch_size
+        # every corner paired with every candidate face
+        points = np.repeat(triangles[start:end],
+                           count, axis=0).reshape((-1, 3))
+        faces = np.repeat(
+            other_triangles[candidates[start:end].reshape(-1)],
+            3, axis=0)
+        close = closest_point_corresponding(faces, points)
+        distance = (((close - points) ** 2).sum(axis=1) ** .5).reshape(
+            (-1, count, 3))
+        # farthest corner from the closest candidate face
+        bound[start:end] = distance.max(axis=2).min(axis=1)
+    return bound
+
+
+def hausdorff(a, b, tolerance=None, threshold=None, return_faces=False):
+    """
+    Find the symmetric Hausdorff distance between two meshes,
+    which is the largest distance from any point on either
+    surface to the other surface.
+
+    Parameters
+    ------------
+    a : Trimesh object
+      First mesh
+    b : Trimesh object
+      Second mesh
+    tolerance : None or float
+      Maximum error of the result,
+      1/1000 of the larger mesh scale if None
+    threshold : None or float
+      Stop as soon as the result is proven to be above or
+      below this distance, in which case it is only a bound
+    return_faces : bool
+      Also return the largest distance on each face
+
+    Returns
+    ------------
+    distance : float
+      Hausdorff distance between a and b, which may
+      be less than the true value by up to tolerance
+    deviation_a : (len(a.faces),) float
+      Largest distance to b on each face of a
+    deviation_b : (len(b.faces),) float
+      Largest distance to a on each face of b
+    """
+    if tolerance is None:
+        tolerance = max(a.scale, b.scale) / 1000.0
+
+    lower_a, upper_a, deviation_a = directed_hausdorff(
+        a, b, tolerance=tolerance, threshold=threshold)
+    if (threshold is not None and lower_a > threshold and
+            not return_faces):
+        # the threshold is already exceeded
+        return lower_a
+
+    lower_b, upper_b, deviation_b = directed_hausdorff(
+        b, a, tolerance=tolerance, threshold=threshold)
+    distance = max(lower_a, lower_b)
+
+    if return_faces:
+        return distance, deviation_a, deviation_b
+    return distance
+
+
+def chamfer(a, b, count=10000, tolerance=None, batch_size=1000):
+    """
+    Find the Chamfer distance between two meshes, which is the
+    mean distance from each surface to the other summed for
+    both directions.
+
+    The means are estimated from random surface samples, which
+    are drawn in batches until the standard error of the
+    estimate is below tolerance or count samples are used.
+
+    Parameters
+    ------------
+    a : Trimesh object
+      First mesh
+    b : Trimesh object
+      Second mesh
+    count : int
+      Maximum number of samples on each mesh
+    tolerance : None or float
+      Stop when the standard error of the estimate is smaller
+      than this, or always use count samples if None
+    batch_size : int
+      Number of samples to add on each mesh at a time
+
+    Returns
+    ------------
+    distance : float
+      Estimated Chamfer distance
+    """
+    from .sample import sample_surface
+
+    distances = [deque(), deque()]
+    total = 0
+    while total < count:
+        size = min(batch_size, count - total)
+        for mesh, other, result in ((a, b, distances[0]),
+                                    (b, a, distances[1])):
+            points = sample_surface(mesh, size)[0]
+            result.append(closest_point(other, points)[1])
+        total += size
+
+        if tolerance is not None and total >= 2:
+            # variance of the sum of two independent means
+            error = np.sqrt(sum(np.concatenate(d).var(ddof=1)
+                                for d in distances) / total)
+            if error < tolerance:
+                break
+
+    return sum(np.concatenate(d).mean() for d in distances)
@@ -1,7 +1,8 @@
 from .import ray_triangle
+from . import ray_scene
 
 # add to __all__ as per pep8
-__all__ = [ray_triangle]
+__all__ = [ray_triangle, ray_scene]
 
 # optionally load an interface to the embree raytracer
 try:
@@ -13,6 +13,7 @@ from pyembree.mesh_construction import TriangleMesh
 
 from pkg_resources import parse_version
 
+from . import ray_util
 from .ray_util import contains_points
 
 from .. import util
@@ -24,6 +25,10 @@ from .. import intersections
 _ray_offset_factor = 1e-4
 # we want to clip our offset to a sane distance
 _ray_offset_floor = 1e-8
+# rough number of bytes allocated per ray for each query depth
+_ray_bytes = 256
+# rough number of bytes embree allocates per triangle for its BVH
+_triangle_bytes = 128
 
 # see if we're using a newer version of the pyembree wrapper
 _embree_new = parse_version(_ver) >= parse_version('0.1.4')
@@ -52,6 +57,19 @@ class RayMeshIntersector(object):
         self._scale_to_box = scale_to_box
         self._cache = caching.Cache(id_function=self.mesh.crc)
 
+    @property
+    def nbytes(self):
+        """
+        Estimated memory used by the embree scene if it
+        has been built.
+
+        Returns
+        ----------
+        nbytes : int
+          Estimated size in bytes
+        """
+        return self._cache.nbytes
+
     @property
     def _scale(self):
         """
@@ -65,6 +83,16 @@ class RayMeshIntersector(object):
             scale = 1.0
         return scale
 
+    def refit(self):
+        """
+        Rebuild the embree scene for the current vertices.
+
+        The pyembree scenes are static so there is no cheaper
+        refit, but this allows the same call for both engines.
+        """
+        ray_util.clear_vertex_cache(self.mesh)
+        self._cache.clear()
+
     @caching.cache_decorator
     def _scene(self):
         """
@@ -77,7 +105,8 @@ class RayMeshIntersector(object):
     def intersects_location(self,
                             ray_origins,
                             ray_directions,
-                            multiple_hits=True):
+                            multiple_hits=True,
+                            **kwargs):
         """
         Return the location of where a ray hits a surface.
 
@@ -99,16 +128,76 @@ class RayMeshIntersector(object):
              ray_origins=ray_origins,
              ray_directions=ray_directions,
              multiple_hits=multiple_hits,
-             return_locations=True)
+             return_locations=True,
+             **kwargs)
 
         return locations, index_ray, index_tri
 
+    def intersects_iter(self,
+                        ray_origins,
+                        ray_directions,
+                        multiple_hits=True,
+                        max_hits=20,
+                        return_locations=True,
+                        chunk_size=None,
+                        max_memory=None):
+        """
+        Find the triangles hit by a list of rays, processing the
+        rays in chunks and yielding results for each chunk so that
+        callers may reduce them without holding every hit in memory.
+
+        Parameters
+        ----------
+        ray_origins:      (n,3) float, origins of rays
+        ray_directions:   (n,3) float, direction (vector) of rays
+        multiple_hits:    bool, if True will return every hit along the ray
+                                if False will only return first hit
+        return_locations: bool, yield hit locations or not
+        chunk_size:       int, number of rays to query at a time
+        max_memory:       int, approximate bytes to allocate per chunk
+                          if neither is passed, 1e8 bytes is used
+
+        Yields
+        ----------
+        index_tri: (m,) int, index of triangle the ray hit
+        index_ray: (m,) int, index of ray
+        locations: (m,3) float, (optional) locations in space
+        """
+        ray_origins = np.asanyarray(ray_origins, dtype=np.float64)
+        ray_directions = np.asanyarray(ray_directions, dtype=np.float64)
+
+        if chunk_size is None and max_memory is None:
+            max_memory = 1e8
+
+        # every query depth allocates some memory per ray
+        depth = 1
+        if multiple_hits:
+            depth = max_hits
+        size = ray_util.chunk_size(count=len(ray_origins),
+                                   bytes_per_ray=_ray_bytes * depth,
+                                   chunk_size=chunk_size,
+                                   max_memory=max_memory)
+
+        # always query at least one chunk even if it is empty
+        # so callers get consistently shaped results
+        for start in range(0, max(len(ray_origins), 1), size):
+            end = start + size
+            result = self.intersects_id(
+                ray_origins=ray_origins[start:end],
+                ray_directions=ray_directions[start:end],
+                multiple_hits=multiple_hits,
+                max_hits=max_hits,
+                return_locations=return_locations)
+            yield ray_util.offset_chunk(result, start)
+
     def intersects_id(self,
                       ray_origins,
                       ray_directions,
                       multiple_hits=True,
                       max_hits=20,
-                      return_locations=False):
+                      return_locations=False,
+                      chunk_size=None,
+                      max_memory=None):
         """
         Find the triangles hit by a list of rays, including
         optionally multiple hits along a single ray.
@@ -120,6 +209,9 @@ class RayMeshIntersector(object):
         multiple_hits:    bool, if True will return every hit along the ray
                                 if False will only return first hit
         return_locations: bool, should we return hit locations or not
+        chunk_size:       int, if passed query this many rays at a time
+        max_memory:       int, if passed query rays in chunks sized to
+                          allocate approximately this many bytes each
 
         Returns
         ----------
@@ -127,6 +219,16 @@ class RayMeshIntersector(object):
         index_ray: (m,) int, index of ray
         locations: (m,3) float, locations in space
         """
+        if chunk_size is not None or max_memory is not None:
+            return ray_util.stack_chunks(self.intersects_iter(
+                ray_origins=ray_origins,
+                ray_directions=ray_directions,
+                multiple_hits=multiple_hits,
+                max_hits=max_hits,
+                return_locations=return_locations,
+                chunk_size=chunk_size,
+                max_memory=max_memory))
+
         # make sure input is _dtype for embree
         ray_origins = np.asanyarray(
             deepcopy(ray_origins),
@@ -229,27 +331,44 @@ class RayMeshIntersector(object):
 
     def intersects_first(self,
                          ray_origins,
-                         ray_directions):
+                         ray_directions,
+                         return_distance=False,
+                         **kwargs):
         """
         Find the index of the first triangle a ray hits.
 
 
         Parameters
         ----------
-        ray_origins:    (n,3) float, origins of rays
-        ray_directions: (n,3) float, direction (vector) of rays
+        ray_origins:     (n,3) float, origins of rays
+        ray_directions:  (n,3) float, direction (vector) of rays
+        return_distance: bool, also return distance to each hit
 
         Returns
         ----------
         triangle_index: (n,) int, index of triangle ray hit, or -1 if not hit
+        distance:       (n,) float, (optional) distance to hit or inf
         """
 
         ray_origins = np.asanyarray(deepcopy(ray_origins))
         ray_directions = np.asanyarray(ray_directions)
 
-        triangle_index = self._scene.run(ray_origins,
-                                         ray_directions)
-        return triangle_index
+        if not return_distance:
+            triangle_index = self._scene.run(ray_origins,
+                                             ray_directions)
+            return triangle_index
+
+        # output=1 will also return the ray parameter of the hit
+        result = self._scene.run(ray_origins,
+                                 ray_directions,
+                                 output=1)
+        triangle_index = np.asanyarray(result['primID'], dtype=np.int64)
+        # the ray parameter is in the scaled frame of the scene
+        distance = (np.asanyarray(result['tfar'], dtype=np.float64) *
+                    np.linalg.norm(ray_directions, axis=1) /
+                    self._scene.scale)
+        distance[triangle_index < 0] = np.inf
+        return triangle_index, distance
 
     def intersects_any(self,
                        ray_origins,
@@ -311,6 +430,25 @@ class _EmbreeWrap(object):
             scene=self.scene,
             vertices=scaled.astype(_embree_dtype),
             indices=faces.astype(np.int32))
+        # embree copies the geometry into its own buffers
+        self._vertex_count = len(scaled)
+        self._face_count = len(faces)
+
+    @property
+    def nbytes(self):
+        """
+        Estimated memory allocated by embree for the scene.
+
+        Returns
+        ----------
+        nbytes : int
+          Estimated size in bytes
+        """
+        # vertices are padded to four values and faces are
+        # three indexes, plus the acceleration structure
+        itemsize = np.dtype(_embree_dtype).itemsize
+        return int(self._vertex_count * 4 * itemsize +
+                   self._face_count * (12 + _triangle_bytes))
 
     def run(self, origins, normals, **kwargs):
         scaled = (np.asanyarray(origins,
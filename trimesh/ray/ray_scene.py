@@ -0,0 +1,462 @@
+"""
+Ray queries for a Scene using a two- level hierarchy.
+
+The top level is a BVH over the world frame bounds of every
+instance in the scene graph, and the bottom level is the ray
+intersector of each unique geometry. Rays are transformed into
+the local frame of each instance they might hit, so repeated
+geometry is never copied or transformed into the world frame.
+"""
+import numpy as np
+
+from .. import bvh
+from .. import util
+from .. import bounds as bounds_module
+
+
+class RaySceneIntersector(object):
+    """
+    An object to query a Scene for ray intersections.
+    """
+
+    def __init__(self, scene):
+        """
+        Create an intersector for a scene.
+
+        Parameters
+        ------------
+        scene : trimesh.Scene
+          Scene to query, which is referenced and not copied
+        """
+        self.scene = scene
+        # the graph MD5 and geometry checksums of the scene
+        # when the acceleration structure was last updated
+        self._state = None
+        # the node and geometry of each instance which
+        # decides if the top level needs a rebuild
+        self._key = None
+        self._transforms = None
+
+    def update(self):
+        """
+        Make sure the acceleration structure matches the
+        current state of the scene.
+
+        If the same geometry is in the same nodes and only
+        transforms have changed the top level tree is refit
+        rather than rebuilt, and the bottom level structures
+        are cached on the geometry so they are never rebuilt
+        unless the geometry itself changes.
+        """
+        scene = self.scene
+        # the graph MD5 changes with every transform update and
+        # geometry checksums are cached, so this is cheap to
+        # check before every query
+        state = (scene.graph.md5(),
+                 tuple((name, id(geometry), geometry.crc())
+                       for name, geometry in scene.geometry.items()
+                       if hasattr(geometry, 'triangles')))
+        if state == self._state:
+            return
+
+        nodes = []
+        names = []
+        transforms = []
+        for node in scene.graph.nodes_geometry:
+            transform, name = scene.graph[node]
+            if not hasattr(scene.geometry[name], 'triangles'):
+                continue
+            nodes.append(node)
+            names.append(name)
+            transforms.append(transform)
+
+        key = [(node,
+                id(scene.geometry[name]),
+                scene.geometry[name].crc())
+               for node, name in zip(nodes, names)]
+        transforms = np.array(transforms,
+                              dtype=np.float64).reshape((-1, 4, 4))
+
+        if key != self._key:
+            self._rebuild(nodes, names, key, transforms)
+        elif not np.array_equal(transforms, self._transforms):
+            self._transforms = transforms
+            self._inverse = np.linalg.inv(transforms)
+            self.tree.refit(self._instance_bounds())
+        self._state = state
+
+    def _rebuild(self, nodes, names, key, transforms):
+        """
+        Rebuild the top level tree and the map from instance
+        to bottom level geometry.
+
+        Parameters
+        ------------
+        nodes : (n,) hashable
+          Node names with triangle geometry
+        names : (n,) str
+          Geometry name for each node
+        key : (n,) tuple
+          (node name, geometry id, geometry crc) for each node
+        transforms : (n, 4, 4) float
+          Transform from each instance to the world frame
+        """
+        self._key = key
+        self._transforms = transforms
+        self._inverse = np.linalg.inv(transforms)
+
+        # the node name for each instance
+        self.nodes = np.empty(len(nodes), dtype=object)
+        self.nodes[:] = nodes
+
+        # instances of identical geometry share one bottom level
+        # structure even if they are different geometry objects
+        unique = {}
+        self.geometry = []
+        self._instance_geometry = np.zeros(len(nodes), dtype=np.int64)
+        for i, name in enumerate(names):
+            md5 = self.scene.geometry[name].md5()
+            if md5 not in unique:
+                unique[md5] = len(self.geometry)
+                self.geometry.append(self.scene.geometry[name])
+            self._instance_geometry[i] = unique[md5]
+
+        # the index of the first triangle of each instance
+        # in the flattened Scene.triangles
+        count = np.array([len(self.geometry[i].faces)
+                          for i in self._instance_geometry],
+                         dtype=np.int64)
+        self.triangles_offset = np.cumsum(count) - count
+
+        if len(nodes) == 0:
+            self.tree = None
+        else:
+            self.tree = bvh.BVH(self._instance_bounds())
+
+    def _instance_bounds(self):
+        """
+        The world frame axis aligned bounds of every instance.
+
+        Returns
+        ------------
+        bounds : (n, 2, 3) float
+          Bounds of each instance
+        """
+        corners = np.array([bounds_module.corners(g.bounds)
+                            for g in self.geometry])[self._instance_geometry]
+        # transform the corners of each instance
+        corners = np.einsum('nij,nkj->nki',
+                            self._transforms[:, :3, :3],
+                            corners) + self._transforms[:, None, :3, 3]
+        return np.stack((corners.min(axis=1),
+                         corners.max(axis=1)), axis=1)
+
+    def _intersects(self,
+                    ray_origins,
+                    ray_directions,
+                    multiple_hits=True):
+        """
+        Find every hit between rays and the scene.
+
+        Parameters
+        ------------
+        ray_origins : (m, 3) float
+          Ray origin points in the world frame
+        ray_directions : (m, 3) float
+          Ray direction vectors in the world frame
+        multiple_hits : bool
+          If False only return the closest hit per ray
+
+        Returns
+        ------------
+        index_tri : (h,) int
+          Face index of hit in the geometry of the instance
+        index_ray : (h,) int
+          Index of ray that hit
+        index_instance : (h,) int
+          Index of self.nodes for each hit
+        locations : (h, 3) float
+          World frame location of each hit
+        distance : (h,) float
+          World frame distance from origin to each hit
+        """
+        ray_origins = np.asanyarray(ray_origins, dtype=np.float64)
+        ray_directions = np.asanyarray(ray_directions, dtype=np.float64)
+        if not util.is_shape(ray_origins, (-1, 3)):
+            raise ValueError('ray origins must be (n, 3)!')
+
+        self.update()
+        if self.tree is None:
+            return (np.zeros(0, dtype=np.int64),
+                    np.zeros(0, dtype=np.int64),
+                    np.zeros(0, dtype=np.int64),
+                    np.zeros((0, 3), dtype=np.float64),
+                    np.zeros(0, dtype=np.float64))
+
+        # every (instance, ray) pair whose instance box the ray hits
+        pair_instance, pair_ray = self.tree.ray_candidates(
+            ray_origins, ray_directions)
+
+        # move every candidate ray into the frame of its instance
+        inverse = self._inverse[pair_instance]
+        local_origins = np.einsum(
+            'nij,nj->ni',
+            inverse[:, :3, :3],
+            ray_origins[pair_ray]) + inverse[:, :3, 3]
+        local_directions = np.einsum(
+            'nij,nj->ni',
+            inverse[:, :3, :3],
+            ray_directions[pair_ray])
+
+        index_tri = []
+        index_pair = []
+        locations = []
+        pair_geometry = self._instance_geometry[pair_instance]
+        # query every instance of a geometry at the same time
+        for i, geometry in enumerate(self.geometry):
+            pairs = np.nonzero(pair_geometry == i)[0]
+            if len(pairs) == 0:
+                continue
+            tri, ray, location = geometry.ray.intersects_id(
+                local_origins[pairs],
+                local_directions[pairs],
+                multiple_hits=multiple_hits,
+                return_locations=True)
+            index_tri.append(tri)
+            index_pair.append(pairs[ray])
+            locations.append(location)
+
+        if len(index_tri) == 0:
+            index_tri = np.zeros(0, dtype=np.int64)
+            index_pair = np.zeros(0, dtype=np.int64)
+            locations = np.zeros((0, 3), dtype=np.float64)
+        else:
+            index_tri = np.concatenate(index_tri).astype(np.int64)
+            index_pair = np.concatenate(index_pair).astype(np.int64)
+            locations = np.vstack(locations).reshape((-1, 3))
+
+        index_ray = pair_ray[index_pair]
+        index_instance = pair_instance[index_pair]
+
+        # move hit locations back into the world frame
+        transform = self._transforms[index_instance]
+        locations = np.einsum('nij,nj->ni',
+                              transform[:, :3, :3],
+                              locations) + transform[:, :3, 3]
+        distance = np.linalg.norm(
+            locations - ray_origins[index_ray], axis=1)
+
+        if multiple_hits:
+            # sort so results don't depend on instance order
+            order = np.lexsort((index_tri, index_instance, index_ray))
+        else:
+            # take the closest hit of every instance for each ray
+            order = np.lexsort((distance, index_ray))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = index_ray[order][1:] != index_ray[order][:-1]
+            order = order[first]
+
+        return (index_tri[order],
+                index_ray[order],
+                index_instance[order],
+                locations[order],
+                distance[order])
+
+    def intersects_id(self,
+                      ray_origins,
+                      ray_directions,
+                      multiple_hits=True,
+                      return_locations=False):
+        """
+        Find the triangles and scene nodes hit by a list of rays.
+
+        Parameters
+        ------------
+        ray_origins : (m, 3) float
+          Ray origin points in the world frame
+        ray_directions : (m, 3) float
+          Ray direction vectors in the world frame
+        multiple_hits : bool
+          If False only return the closest hit per ray
+        return_locations : bool
+          Return world frame hit locations or not
+
+        Returns
+        ------------
+        index_tri : (h,) int
+          Face index in the geometry of the node hit
+        index_ray : (h,) int
+          Index of ray that hit
+        nodes : (h,) hashable
+          Name of the node in scene.graph for each hit
+        locations : (h, 3) float
+          World frame hit locations, if requested
+        """
+        (index_tri,
+         index_ray,
+         index_instance,
+         locations,
+         distance) = self._intersects(ray_origins,
+                                      ray_directions,
+                                      multiple_hits=multiple_hits)
+        nodes = self.nodes[index_instance]
+        if return_locations:
+            return index_tri, index_ray, nodes, locations
+        return index_tri, index_ray, nodes
+
+    def intersects_location(self,
+                            ray_origins,
+                            ray_directions,
+                            multiple_hits=True):
+        """
+        Find the world frame locations where rays hit the scene.
+
+        Parameters
+        ------------
+        ray_origins : (m, 3) float
+          Ray origin points in the world frame
+        ray_directions : (m, 3) float
+          Ray direction vectors in the world frame
+        multiple_hits : bool
+          If False only return the closest hit per ray
+
+        Returns
+        ------------
+        locations : (h, 3) float
+          World frame hit locations
+        index_ray : (h,) int
+          Index of ray that hit
+        nodes : (h,) hashable
+          Name of the node in scene.graph for each hit
+        """
+        index_tri, index_ray, nodes, locations = self.intersects_id(
+            ray_origins,
+            ray_directions,
+            multiple_hits=multiple_hits,
+            return_locations=True)
+        return locations, index_ray, nodes
+
+    def intersects_first(self,
+                         ray_origins,
+                         ray_directions,
+                         return_distance=False):
+        """
+        Find the first triangle and node each ray hits.
+
+        Parameters
+        ------------
+        ray_origins : (m, 3) float
+          Ray origin points in the world frame
+        ray_directions : (m, 3) float
+          Ray direction vectors in the world frame
+        return_distance : bool
+          Also return the distance to each hit
+
+        Returns
+        ------------
+        index_tri : (m,) int
+          Face index in the geometry of the node hit or -1
+        nodes : (m,) hashable
+          Name of the node hit or None
+        distance : (m,) float
+          Distance to each hit or inf, if requested
+        """
+        (tri,
+         ray,
+         instance,
+         locations,
+         distance) = self._intersects(ray_origins,
+                                      ray_directions,
+                                      multiple_hits=False)
+        count = len(ray_origins)
+        index_tri = np.full(count, -1, dtype=np.int64)
+        index_tri[ray] = tri
+        nodes = np.empty(count, dtype=object)
+        nodes[ray] = self.nodes[instance]
+        if return_distance:
+            first = np.full(count, np.inf)
+            first[ray] = distance
+            return index_tri, nodes, first
+        return index_tri, nodes
+
+    def intersects_surface(self,
+                           ray_origins,
+                           ray_directions,
+                           multiple_hits=False):
+        """
+        Find the distance to and the world frame normal of the
+        surface hit by rays, which is what shading needs.
+
+        Parameters
+        ------------
+        ray_origins : (m, 3) float
+          Ray origin points in the world frame
+        ray_directions : (m, 3) float
+          Ray direction vectors in the world frame
+        multiple_hits : bool
+          If False only return the closest hit per ray
+
+        Returns
+        ------------
+        index_triangle : (h,) int
+          Index of scene.triangles hit
+        index_ray : (h,) int
+          Index of ray that hit
+        distance : (h,) float
+          World frame distance from origin to each hit
+        normals : (h, 3) float
+          World frame unit normal of the triangle hit
+        """
+        (index_tri,
+         index_ray,
+         instance,
+         locations,
+         distance) = self._intersects(ray_origins,
+                                      ray_directions,
+                                      multiple_hits=multiple_hits)
+        if len(index_tri) == 0:
+            return (index_tri,
+                    index_ray,
+                    distance,
+                    np.zeros((0, 3), dtype=np.float64))
+
+        # index of the triangle in the flattened scene
+        index_triangle = index_tri + self.triangles_offset[instance]
+
+        # local frame normal of every triangle hit
+        normals = np.zeros((len(index_tri), 3), dtype=np.float64)
+        geometry = self._instance_geometry[instance]
+        for i, g in enumerate(self.geometry):
+            mask = geometry == i
+            normals[mask] = g.face_normals[index_tri[mask]]
+        # rotate normals with the inverse transpose
+        normals = util.unitize(np.einsum('nji,nj->ni',
+                                         self._inverse[instance, :3, :3],
+                                         normals))
+
+        return index_triangle, index_ray, distance, normals
+
+    def intersects_any(self,
+                       ray_origins,
+                       ray_directions):
+        """
+        Find out if each ray hit anything in the scene.
+
+        Parameters
+        ------------
+        ray_origins : (m, 3) float
+          Ray origin points in the world frame
+        ray_directions : (m, 3) float
+          Ray direction vectors in the world frame
+
+        Returns
+        ------------
+        hit : (m,) bool
+          Whether each ray hit anything
+        """
+        index_ray = self._intersects(ray_origins,
+                                     ray_directions,
+                                     multiple_hits=False)[1]
+        hit = np.zeros(len(ray_origins), dtype=bool)
+        hit[index_ray] = True
+        return hit
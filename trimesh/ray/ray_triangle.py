@@ -3,33 +3,89 @@ A basic slow implementation of ray- triangle queries.
 """
 import numpy as np
 
+import atexit
+import multiprocessing
 
+from . import ray_util
 from .ray_util import contains_points
 
-from ..constants import tol
+from ..constants import tol, log
 
+from .. import bvh
 from .. import util
+from .. import shared
 from .. import caching
 from .. import grouping
 from .. import intersections
 from .. import triangles as triangles_mod
 
+# rough number of bytes allocated for every candidate
+# (ray, triangle) pair during the narrow phase
+_candidate_bytes = 512
+# number of rays to sample when estimating candidates per ray
+_candidate_sample = 100
+
 
 class RayMeshIntersector(object):
     """
     An object to query a mesh for ray intersections.
-    Precomputes an r-tree for each triangle on the mesh.
+    Precomputes a bounding volume hierarchy for the triangles
+    of the mesh.
     """
 
     def __init__(self, mesh):
         self.mesh = mesh
         self._cache = caching.Cache(self.mesh.crc)
 
+    @property
+    def nbytes(self):
+        """
+        Estimated memory used by the intersector, including
+        the BVH of the mesh if it has been built.
+
+        Returns
+        ----------
+        nbytes : int
+          Estimated size in bytes
+        """
+        nbytes = self._cache.nbytes
+        tree = self.mesh._cache.cache.get('triangles_bvh')
+        if tree is not None:
+            nbytes += tree.nbytes
+        return nbytes
+
+    def refit(self):
+        """
+        Update the bounds of the mesh BVH for the current vertices
+        without rebuilding it.
+
+        This happens automatically when vertices are changed and
+        faces are not, but can be called explicitly if vertices
+        were modified in a way the mesh hash doesn't detect.
+
+        Returns
+        ----------
+        tree : trimesh.bvh.BVH
+          The refit tree of the mesh
+        """
+        # triangles, normals and the tree are stale but anything
+        # only derived from faces is still valid
+        ray_util.clear_vertex_cache(self.mesh)
+        # faces are unchanged so the tree is refit
+        tree = self.mesh.triangles_bvh
+        # anything derived from the old bounds is stale
+        self._cache.clear()
+        return tree
+
     def intersects_id(self,
                       ray_origins,
                       ray_directions,
                       return_locations=False,
                       multiple_hits=True,
+                      chunk_size=None,
+                      max_memory=None,
+                      workers=None,
+                      pool=None,
                       **kwargs):
         """
         Find the intersections between the current mesh and a list of rays.
@@ -40,6 +96,15 @@ class RayMeshIntersector(object):
         ray_directions:   (m,3) float, ray direction vectors
         multiple_hits:    bool, consider multiple hits of each ray or not
         return_locations: bool, return hit locations or not
+        chunk_size:       int, if passed query this many rays at a time
+        max_memory:       int, if passed query rays in chunks sized to
+                          allocate approximately this many bytes each
+        workers:          int, if more than one split rays across this
+                          many processes which read the mesh from
+                          shared memory, which requires Python 3.8+
+        pool:             multiprocessing.Pool, if passed split rays
+                          across its processes rather than a pool
+                          which is kept and reused for `workers`
 
         Returns
         -----------
@@ -47,21 +112,197 @@ class RayMeshIntersector(object):
         index_ray:      (h,) int,    index of ray that hit triangle
         locations:      (h,3) float, (optional) position of intersection in space
         """
-        (index_tri,
-         index_ray,
-         locations) = ray_triangle_id(triangles=self.mesh.triangles,
-                                      ray_origins=ray_origins,
-                                      ray_directions=ray_directions,
-                                      tree=self.mesh.triangles_tree,
-                                      multiple_hits=multiple_hits,
-                                      triangles_normal=self.mesh.face_normals)
-        if return_locations:
-            if len(index_tri) == 0:
-                return index_tri, index_ray, locations
-            unique = grouping.unique_rows(np.column_stack((locations,
-                                                           index_ray)))[0]
-            return index_tri[unique], index_ray[unique], locations[unique]
-        return index_tri, index_ray
+        if pool is not None or (workers is not None and workers > 1):
+            if shared.shared_memory is not None:
+                return self._intersects_parallel(
+                    ray_origins=ray_origins,
+                    ray_directions=ray_directions,
+                    multiple_hits=multiple_hits,
+                    return_locations=return_locations,
+                    chunk_size=chunk_size,
+                    max_memory=max_memory,
+                    workers=workers,
+                    pool=pool)
+            log.warning('shared memory unavailable, using one process!')
+
+        if chunk_size is not None or max_memory is not None:
+            return ray_util.stack_chunks(self.intersects_iter(
+                ray_origins=ray_origins,
+                ray_directions=ray_directions,
+                multiple_hits=multiple_hits,
+                return_locations=return_locations,
+                chunk_size=chunk_size,
+                max_memory=max_memory))
+
+        result = ray_triangle_id(triangles=self.mesh.triangles,
+                                 ray_origins=ray_origins,
+                                 ray_directions=ray_directions,
+                                 tree=self.mesh.triangles_bvh,
+                                 multiple_hits=multiple_hits,
+                                 triangles_normal=self.mesh.face_normals)
+        return _format_hits(result, return_locations)
+
+    def intersects_iter(self,
+                        ray_origins,
+                        ray_directions,
+                        multiple_hits=True,
+                        return_locations=True,
+                        chunk_size=None,
+                        max_memory=None,
+                        **kwargs):
+        """
+        Find the intersections between the current mesh and a
+        list of rays, processing the rays in chunks and yielding
+        results for each chunk so that callers may reduce them
+        without holding every hit in memory.
+
+        Parameters
+        ----------
+        ray_origins:      (m,3) float, ray origin points
+        ray_directions:   (m,3) float, ray direction vectors
+        multiple_hits:    bool, consider multiple hits of each ray or not
+        return_locations: bool, yield hit locations or not
+        chunk_size:       int, number of rays to query at a time
+        max_memory:       int, approximate bytes to allocate per chunk
+                          if neither is passed, 1e8 bytes is used
+
+        Yields
+        ----------
+        index_tri: (h,) int,    index of triangles hit
+        index_ray: (h,) int,    index of ray that hit triangle
+        locations: (h,3) float, (optional) position of intersection in space
+        """
+        ray_origins = np.asanyarray(ray_origins, dtype=np.float64)
+        ray_directions = np.asanyarray(ray_directions, dtype=np.float64)
+
+        size = self._chunk_size(ray_origins=ray_origins,
+                                ray_directions=ray_directions,
+                                chunk_size=chunk_size,
+                                max_memory=max_memory)
+
+        # always query at least one chunk even if it is empty
+        # so callers get consistently shaped results
+        for start in range(0, max(len(ray_origins), 1), size):
+            end = start + size
+            result = self.intersects_id(
+                ray_origins=ray_origins[start:end],
+                ray_directions=ray_directions[start:end],
+                multiple_hits=multiple_hits,
+                return_locations=return_locations)
+            yield ray_util.offset_chunk(result, start)
+
+    def _chunk_size(self,
+                    ray_origins,
+                    ray_directions,
+                    chunk_size=None,
+                    max_memory=None):
+        """
+        Find the number of rays to query at once.
+
+        Parameters
+        ----------
+        ray_origins:    (m,3) float, ray origin points
+        ray_directions: (m,3) float, ray direction vectors
+        chunk_size:     int, number of rays to query at a time
+        max_memory:     int, approximate bytes to allocate per chunk
+                        if neither is passed, 1e8 bytes is used
+
+        Returns
+        ----------
+        size: int, number of rays per chunk
+        """
+        if chunk_size is None and max_memory is None:
+            max_memory = 1e8
+
+        per_ray = 1.0
+        if chunk_size is None and len(ray_origins) > 0:
+            # estimate the number of candidates per ray by running
+            # the broad phase on an evenly spaced sample of rays
+            sample = np.unique(np.linspace(
+                0, len(ray_origins) - 1,
+                _candidate_sample).astype(np.int64))
+            candidates = ray_triangle_candidates(
+                ray_origins=ray_origins[sample],
+                ray_directions=ray_directions[sample],
+                tree=self.mesh.triangles_bvh)[0]
+            per_ray = (float(len(candidates)) / len(sample)) + 1.0
+
+        return ray_util.chunk_size(count=len(ray_origins),
+                                   bytes_per_ray=per_ray * _candidate_bytes,
+                                   chunk_size=chunk_size,
+                                   max_memory=max_memory)
+
+    def _intersects_parallel(self,
+                             ray_origins,
+                             ray_directions,
+                             multiple_hits,
+                             return_locations,
+                             chunk_size,
+                             max_memory,
+                             workers,
+                             pool):
+        """
+        Find the intersections between the current mesh and a
+        list of rays by splitting the rays across processes.
+
+        The mesh and the rays are published to shared memory
+        once per call and released when it returns, so each
+        task only sends their names and the range of rays.
+
+        Parameters
+        ----------
+        ray_origins:      (m,3) float, ray origin points
+        ray_directions:   (m,3) float, ray direction vectors
+        multiple_hits:    bool, consider multiple hits of each ray or not
+        return_locations: bool, return hit locations or not
+        chunk_size:       int, maximum number of rays per task
+        max_memory:       int, approximate bytes to allocate per task
+        workers:          None or int, number of processes to use
+        pool:             None or multiprocessing.Pool to use
+
+        Returns
+        -----------
+        index_triangle: (h,) int,    index of triangles hit
+        index_ray:      (h,) int,    index of ray that hit triangle
+        locations:      (h,3) float, (optional) position of intersection in space
+        """
+        ray_origins = np.asanyarray(ray_origins, dtype=np.float64)
+        ray_directions = np.asanyarray(ray_directions, dtype=np.float64)
+        count = len(ray_origins)
+
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        # give each worker a few tasks to balance the load
+        size = int(np.ceil(count / (workers * 4.0)))
+        if chunk_size is not None or max_memory is not None:
+            size = min(size, self._chunk_size(
+                ray_origins=ray_origins,
+                ray_directions=ray_directions,
+                chunk_size=chunk_size,
+                max_memory=max_memory))
+        size = max(size, 1)
+
+        arrays = {'triangles': self.mesh.triangles,
+                  'normals': self.mesh.face_normals,
+                  'origins': ray_origins,
+                  'directions': ray_directions}
+        arrays.update(('bvh_' + k, v) for k, v in
+                      self.mesh.triangles_bvh.arrays.items())
+
+        with shared.SharedArrays(arrays) as published:
+            tasks = [(published.spec,
+                      start,
+                      min(start + size, count),
+                      multiple_hits,
+                      return_locations)
+                     for start in range(0, max(count, 1), size)]
+            if pool is not None:
+                # map returns results in the same order as tasks
+                chunks = pool.map(_worker_query, tasks)
+            else:
+                chunks = _map_pool(int(workers), _worker_query, tasks)
+
+        return ray_util.stack_chunks(chunks)
 
     def intersects_location(self,
                             ray_origins,
@@ -92,6 +333,47 @@ class RayMeshIntersector(object):
                                          **kwargs)
         return locations, index_ray, index_tri
 
+    def intersects_first(self,
+                         ray_origins,
+                         ray_directions,
+                         return_distance=False,
+                         **kwargs):
+        """
+        Find the index of the first triangle a ray hits.
+
+        Parameters
+        ----------
+        ray_origins:     (m,3) float, ray origin points
+        ray_directions:  (m,3) float, ray direction vectors
+        return_distance: bool, also return distance to each hit
+
+        Returns
+        ----------
+        triangle_index: (m,) int, index of triangle ray hit, or -1 if not hit
+        distance:       (m,) float, (optional) distance to hit or inf
+        """
+        ray_origins = np.asanyarray(ray_origins, dtype=np.float64)
+        ray_directions = np.asanyarray(ray_directions, dtype=np.float64)
+
+        (index_tri,
+         index_ray,
+         locations,
+         distance) = ray_triangle_id(triangles=self.mesh.triangles,
+                                     ray_origins=ray_origins,
+                                     ray_directions=ray_directions,
+                                     tree=self.mesh.triangles_bvh,
+                                     multiple_hits=False,
+                                     return_distance=True,
+                                     triangles_normal=self.mesh.face_normals)
+
+        triangle_index = np.full(len(ray_origins), -1, dtype=np.int64)
+        triangle_index[index_ray] = index_tri
+        if return_distance:
+            first = np.full(len(ray_origins), np.inf)
+            first[index_ray] = distance
+            return triangle_index, first
+        return triangle_index
+
     def intersects_any(self,
                        ray_origins,
                        ray_directions,
@@ -109,7 +391,8 @@ class RayMeshIntersector(object):
         hit: boolean, whether any ray hit any triangle on the mesh
         """
         index_tri, index_ray = self.intersects_id(ray_origins,
-                                                  ray_directions)
+                                                  ray_directions,
+                                                  **kwargs)
         hit_any = np.zeros(len(ray_origins), dtype=np.bool)
         hit_idx = np.unique(index_ray)
         if len(hit_idx) > 0:
@@ -134,40 +417,177 @@ class RayMeshIntersector(object):
         return contains_points(self, points)
 
 
+def _format_hits(result, return_locations):
+    """
+    Format the result of `ray_triangle_id` for an intersector,
+    removing duplicate locations if they are requested.
+
+    Parameters
+    ----------
+    result:           (3,) tuple, (index_tri, index_ray, locations)
+    return_locations: bool, return hit locations or not
+
+    Returns
+    -----------
+    index_triangle: (h,) int,    index of triangles hit
+    index_ray:      (h,) int,    index of ray that hit triangle
+    locations:      (h,3) float, (optional) position of intersection in space
+    """
+    index_tri, index_ray, locations = result[:3]
+    if not return_locations:
+        return index_tri, index_ray
+    if len(index_tri) == 0:
+        return index_tri, index_ray, locations
+    unique = grouping.unique_rows(np.column_stack((locations,
+                                                   index_ray)))[0]
+    # keep hits in the same order they were found
+    unique.sort()
+    return index_tri[unique], index_ray[unique], locations[unique]
+
+
+# {processes : multiprocessing.Pool} kept between queries
+_pools = {}
+# the mesh and rays a worker process is attached to
+_worker = {}
+
+
+def _map_pool(workers, function, tasks):
+    """
+    Run tasks in a pool of processes which is started on first
+    use and kept for later queries with the same number of
+    workers, so processes aren't started for every query.
+
+    Parameters
+    ----------
+    workers:  int, number of processes
+    function: function, applied to every task
+    tasks:    list, arguments for function
+
+    Returns
+    ----------
+    results: list, result of every task in order
+    """
+    pool = _pools.get(workers)
+    if pool is None:
+        pool = multiprocessing.Pool(processes=workers)
+        _pools[workers] = pool
+    try:
+        return pool.map(function, tasks)
+    except BaseException:
+        # the pool may be left in a bad state so
+        # stop it and start a new one next time
+        _pools.pop(workers, None)
+        pool.terminate()
+        pool.join()
+        raise
+
+
+@atexit.register
+def _close_pools():
+    """
+    Stop every kept pool of processes.
+    """
+    for pool in _pools.values():
+        pool.terminate()
+        pool.join()
+    _pools.clear()
+
+
+def _worker_attach(spec):
+    """
+    Attach a worker process to arrays in shared memory, keeping
+    the attachment until it is given a different spec.
+
+    Parameters
+    ----------
+    spec: dict, from shared.SharedArrays.spec
+
+    Returns
+    ----------
+    arrays: dict, read- only arrays keyed by name
+    tree:   bvh.BVH, of the shared mesh
+    """
+    if _worker.get('spec') != spec:
+        blocks = _worker.get('blocks', [])
+        # arrays viewing the blocks have to be released first
+        _worker.clear()
+        for block in blocks:
+            block.close()
+        arrays, blocks = shared.attach(spec)
+        _worker['spec'] = spec
+        _worker['arrays'] = arrays
+        # keep the blocks referenced while the arrays are in use
+        _worker['blocks'] = blocks
+        _worker['tree'] = bvh.BVH.from_arrays(
+            {k[4:]: v for k, v in arrays.items() if k.startswith('bvh_')})
+    return _worker['arrays'], _worker['tree']
+
+
+def _worker_query(task):
+    """
+    Query a range of rays against the shared mesh.
+
+    Parameters
+    ----------
+    task: (5,) tuple, (spec, start, end, multiple_hits, return_locations)
+
+    Returns
+    -----------
+    chunk: tuple, (index_tri, index_ray, [locations])
+    """
+    spec, start, end, multiple_hits, return_locations = task
+    arrays, tree = _worker_attach(spec)
+    result = ray_triangle_id(triangles=arrays['triangles'],
+                             ray_origins=arrays['origins'][start:end],
+                             ray_directions=arrays['directions'][start:end],
+                             tree=tree,
+                             multiple_hits=multiple_hits,
+                             triangles_normal=arrays['normals'])
+    return ray_util.offset_chunk(_format_hits(result, return_locations),
+                                 start)
+
+
 def ray_triangle_id(triangles,
                     ray_origins,
                     ray_directions,
                     triangles_normal=None,
                     tree=None,
-                    multiple_hits=True):
+                    multiple_hits=True,
+                    return_distance=False,
+                    return_barycentric=False):
     """
     Find the intersections between a group of triangles and rays
 
     Parameters
     ----------
-    triangles:        (n,3,3) float, triangles in space
-    ray_origins:      (m,3) float, ray origin points
-    ray_directions:   (m,3) float, ray direction vectors
-    triangles_normal: (n,3) float, normal vector of triangles, optional
-    tree:             rtree object holding triangle bounds
+    triangles:          (n,3,3) float, triangles in space
+    ray_origins:        (m,3) float, ray origin points
+    ray_directions:     (m,3) float, ray direction vectors
+    triangles_normal:   (n,3) float, normal vector of triangles, optional
+    tree:               bvh.BVH or rtree object holding triangle bounds
+    multiple_hits:      bool, if False only return the closest hit per ray
+    return_distance:    bool, also return distance along ray to each hit
+    return_barycentric: bool, also return barycentric coordinates of hits
 
     Returns
     -----------
     index_triangle: (h,) int,    index of triangles hit
     index_ray:      (h,) int,    index of ray that hit triangle
     locations:      (h,3) float, position of intersection in space
+    distance:       (h,) float,  (optional) distance from ray origin
+    barycentric:    (h,3) float, (optional) barycentric coordinates of hit
     """
     triangles = np.asanyarray(triangles, dtype=np.float64)
     ray_origins = np.asanyarray(ray_origins, dtype=np.float64)
     ray_directions = np.asanyarray(ray_directions, dtype=np.float64)
 
-    # if we didn't get passed an r-tree for the bounds of each triangle create
+    # if we didn't get passed a tree for the bounds of each triangle create
     # one here
     if tree is None:
-        tree = triangles_mod.bounds_tree(triangles)
+        tree = triangles_mod.bounds_bvh(triangles)
 
     # find the list of likely triangles and which ray they correspond to with
-    # rtree queries
+    # tree queries
     ray_candidates, ray_id = ray_triangle_candidates(
         ray_origins=ray_origins, ray_directions=ray_directions, tree=tree)
 
@@ -195,7 +615,14 @@ def ray_triangle_id(triangles,
 
     if (len(triangle_candidates) == 0 or
             not valid.any()):
-        return [], [], []
+        # return empty arrays with the correct shape
+        return _hit_result(index_tri=np.zeros(0, dtype=np.int64),
+                           index_ray=np.zeros(0, dtype=np.int64),
+                           location=np.zeros((0, 3), dtype=np.float64),
+                           distance=np.zeros(0, dtype=np.float64),
+                           barycentric=np.zeros((0, 3), dtype=np.float64),
+                           return_distance=return_distance,
+                           return_barycentric=return_barycentric)
 
     # find the barycentric coordinates of each plane intersection on the
     # triangle candidates
@@ -215,6 +642,7 @@ def ray_triangle_id(triangles,
     index_ray = ray_id[valid][hit]
     # locations are already valid plane intersections, just mask by hits
     location = location[hit]
+    barycentric = barycentric[hit]
 
     # only return points that are forward from the origin
     vector = location - ray_origins[index_ray]
@@ -225,22 +653,59 @@ def ray_triangle_id(triangles,
     index_ray = index_ray[forward]
     location = location[forward]
     distance = distance[forward]
+    barycentric = barycentric[forward]
+
+    if not multiple_hits and len(index_ray) > 0:
+        # since we are not returning multiple hits, we need to
+        # figure out which hit is first: sort with ray as the major
+        # key and distance as the minor key then take the first
+        # hit for each ray, which is stable for tied distances
+        order = np.lexsort((distance, index_ray))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = index_ray[order][1:] != index_ray[order][:-1]
+        first = order[first]
+
+        index_tri = index_tri[first]
+        index_ray = index_ray[first]
+        location = location[first]
+        distance = distance[first]
+        barycentric = barycentric[first]
+
+    if return_distance:
+        # distance was projected onto the (possibly non- unit)
+        # direction vector so convert it to distance in space
+        distance = distance / np.linalg.norm(
+            ray_directions[index_ray], axis=1)
+
+    return _hit_result(index_tri=index_tri,
+                       index_ray=index_ray,
+                       location=location,
+                       distance=distance,
+                       barycentric=barycentric,
+                       return_distance=return_distance,
+                       return_barycentric=return_barycentric)
+
+
+def _hit_result(index_tri,
+                index_ray,
+                location,
+                distance,
+                barycentric,
+                return_distance,
+                return_barycentric):
+    """
+    Assemble the return value of `ray_triangle_id`.
 
-    if multiple_hits:
-        return index_tri, index_ray, location
-
-    # since we are not returning multiple hits, we need to
-    # figure out which hit is first
-    if len(index_ray) == 0:
-        return index_tri, index_ray, location
-
-    first = np.zeros(len(index_ray), dtype=np.bool)
-    groups = grouping.group(index_ray)
-    for group in groups:
-        index = group[distance[group].argmin()]
-        first[index] = True
-
-    return index_tri[first], index_ray[first], location[first]
+    Returns
+    -----------
+    result: tuple, (index_tri, index_ray, location, [distance], [barycentric])
+    """
+    result = [index_tri, index_ray, location]
+    if return_distance:
+        result.append(distance)
+    if return_barycentric:
+        result.append(barycentric)
+    return tuple(result)
 
 
 def ray_triangle_candidates(ray_origins,
@@ -250,20 +715,26 @@ def ray_triangle_candidates(ray_origins,
     Do broad- phase search for triangles that the rays
     may intersect.
 
-    Does this by creating a bounding box for the ray as it
-    passes through the volume occupied by the tree
+    If passed a BVH this traverses it for every ray at once
+    using a ray- box slab test. If passed an r-tree it creates
+    a bounding box for each ray as it passes through the volume
+    occupied by the tree and queries it one ray at a time.
 
     Parameters
     ----------
     ray_origins:      (m,3) float, ray origin points
     ray_directions:   (m,3) float, ray direction vectors
-    tree:             rtree object, contains AABB of each triangle
+    tree:             bvh.BVH or rtree object, contains AABB of each triangle
 
     Returns
     ----------
     ray_candidates: (n,) int, triangle indexes
     ray_id:         (n,) int, corresponding ray index for a triangle candidate
     """
+    if hasattr(tree, 'ray_candidates'):
+        return tree.ray_candidates(ray_origins=ray_origins,
+                                   ray_directions=ray_directions)
+
     ray_bounding = ray_bounds(ray_origins=ray_origins,
                               ray_directions=ray_directions,
                               bounds=tree.bounds)
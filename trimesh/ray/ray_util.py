@@ -130,3 +130,116 @@ def contains_points(intersector,
             broken.sum())
 
     return contains
+
+
+def chunk_size(count,
+               bytes_per_ray,
+               chunk_size=None,
+               max_memory=None):
+    """
+    Find how many rays should be processed at once.
+
+    Parameters
+    ------------
+    count : int
+      Total number of rays
+    bytes_per_ray : float
+      Estimate of memory used per ray while querying
+    chunk_size : None or int
+      If passed, use this number of rays per chunk
+    max_memory : None or int
+      If passed, the approximate number of bytes
+      a single chunk should be allowed to allocate
+
+    Returns
+    ------------
+    size : int
+      Number of rays per chunk, at least one
+    """
+    if chunk_size is not None:
+        size = int(chunk_size)
+    elif max_memory is not None:
+        size = int(max_memory // max(bytes_per_ray, 1.0))
+    else:
+        size = count
+    return int(np.clip(size, 1, max(count, 1)))
+
+
+def offset_chunk(chunk, offset):
+    """
+    Convert the result of a query on a chunk of rays into
+    consistent arrays with ray indexes referencing the
+    original, unchunked rays.
+
+    Parameters
+    ------------
+    chunk : (2,) or (3,) tuple
+      Contains (index_tri, index_ray, [locations])
+    offset : int
+      Index of the first ray in the chunk
+
+    Returns
+    ------------
+    index_tri : (h,) int
+      Index of triangle hit
+    index_ray : (h,) int
+      Index of ray that hit triangle
+    locations : (h, 3) float
+      Only included if passed in chunk
+    """
+    result = [np.asanyarray(chunk[0], dtype=np.int64),
+              np.asanyarray(chunk[1], dtype=np.int64) + offset]
+    if len(chunk) > 2:
+        result.append(np.asanyarray(
+            chunk[2], dtype=np.float64).reshape((-1, 3)))
+    return tuple(result)
+
+
+def stack_chunks(chunks):
+    """
+    Stack the results of querying chunks of rays into
+    single arrays.
+
+    Parameters
+    ------------
+    chunks : sequence of tuple
+      Each is (index_tri, index_ray, [locations])
+      as returned from `offset_chunk`
+
+    Returns
+    ------------
+    index_tri : (h,) int
+      Index of triangle hit
+    index_ray : (h,) int
+      Index of ray that hit triangle
+    locations : (h, 3) float
+      Only included if included in chunks
+    """
+    chunks = list(chunks)
+    if len(chunks) == 0:
+        return (np.zeros(0, dtype=np.int64),
+                np.zeros(0, dtype=np.int64))
+    result = [np.concatenate([c[0] for c in chunks]),
+              np.concatenate([c[1] for c in chunks])]
+    if len(chunks[0]) > 2:
+        result.append(np.vstack([c[2] for c in chunks]))
+    return tuple(result)
+
+
+def clear_vertex_cache(mesh):
+    """
+    Remove every cached value of a mesh which depends on its
+    vertices, for changes the mesh hash didn't detect such as
+    writes through `mesh.vertices.view(np.ndarray)`.
+
+    Values declared to only depend on faces are kept.
+
+    Parameters
+    ------------
+    mesh : trimesh.Trimesh
+      Mesh whose vertices were changed in place
+    """
+    cache = mesh._cache
+    keep = [key for key, depends in cache._depends.items()
+            if 'vertices' not in depends]
+    cache.clear(exclude=keep)
@@ -7,8 +7,6 @@ Functions for registering (aligning) point clouds with meshes.
 
 import numpy as np
 
-from scipy.spatial import cKDTree
-
 from . import util
 from . import bounds
 from . import transformations
@@ -289,6 +287,7 @@ def icp(a,
     cost : float
       The cost of the transformation
     """
+    from scipy.spatial import cKDTree
 
     a = np.asanyarray(a, dtype=np.float64)
     if not util.is_shape(a, (-1, 3)):
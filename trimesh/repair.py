@@ -6,7 +6,6 @@ Fill holes and fix winding and normals of meshes.
 """
 
 import numpy as np
-import networkx as nx
 
 from . import graph
 from . import triangles
@@ -30,6 +29,7 @@ def fix_winding(mesh):
     -------------
     mesh.face: will reverse columns of certain faces
     """
+    import networkx as nx
     # anything we would fix is already done
     if mesh.is_winding_consistent:
         return
@@ -169,6 +169,7 @@ def broken_faces(mesh, color=None):
     ---------------
     broken: (n, ) int, indexes of mesh.faces
     """
+    import networkx as nx
     adjacency = nx.from_edgelist(mesh.face_adjacency)
     broken = [k for k, v in dict(adjacency.degree()).items()
               if v != 3]
@@ -193,6 +194,7 @@ def fill_holes(mesh):
     ---------
     mesh: Trimesh object
     """
+    import networkx as nx
 
     def hole_to_faces(hole):
         """
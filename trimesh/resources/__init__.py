@@ -1,6 +1,8 @@
 import os
 
-from pkg_resources import resource_string
+# find the current absolute path to this directory
+_pwd = os.path.expanduser(os.path.abspath(
+    os.path.dirname(__file__)))
 
 
 def get_resource(name):
@@ -15,9 +17,16 @@ def get_resource(name):
     -------------
     resource: str, string of file data
     """
-    # get the resource
-    resource = resource_string('trimesh',
-                               os.path.join('resources', name))
+    try:
+        # read the file directly as importing
+        # pkg_resources is slow and happens on import
+        with open(os.path.join(_pwd, name), 'rb') as f:
+            resource = f.read()
+    except IOError:
+        # the package may be zipped
+        from pkg_resources import resource_string
+        resource = resource_string('trimesh',
+                                   os.path.join('resources', name))
     # make sure we return it as a string
     if hasattr(resource, 'decode'):
         return resource.decode('utf-8')
@@ -289,3 +289,47 @@ def look_at(points, fov, rotation=None):
     cam_pose[:3, 3] = center_w + dist * cam_pose[:3, 2]
 
     return cam_pose
+
+
+def camera_to_rays(camera, rows=None):
+    """
+    Get a ray through the center of every pixel of a camera.
+
+    Uses the OpenGL convention where the camera looks down
+    its -Z axis with +Y up, and row zero is the top of the
+    image.
+
+    Parameters
+    -------------
+    camera : trimesh.scene.Camera
+      Camera with focal length and resolution
+    rows : None, or (2,) int
+      Only generate rays for rows in [start, stop)
+
+    Returns
+    --------------
+    vectors : (n, 3) float
+      Unit ray directions in the camera frame
+    pixels : (n, 2) int
+      The (x, y) pixel index for each ray
+    """
+    # resolution is in (x, y) pixels
+    width, height = camera.resolution
+    if rows is None:
+        rows = (0, height)
+    start, stop = int(rows[0]), min(int(rows[1]), height)
+
+    # pixel indexes with x varying fastest
+    y, x = np.mgrid[start:stop, 0:width]
+    pixels = np.column_stack((x.ravel(), y.ravel()))
+
+    K = camera.K
+    # offset to pixel centers and scale by focal length
+    vectors = np.ones((len(pixels), 3), dtype=np.float64)
+    vectors[:, 0] = (pixels[:, 0] + 0.5 - K[0, 2]) / K[0, 0]
+    # image rows go down while camera Y goes up
+    vectors[:, 1] = (K[1, 2] - pixels[:, 1] - 0.5) / K[1, 1]
+    vectors[:, 2] = -1.0
+    vectors = util.unitize(vectors)
+
+    return vectors, pixels
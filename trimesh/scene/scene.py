@@ -18,6 +18,9 @@ from . import lighting
 
 from .transforms import TransformForest
 
+# approximate number of rays to cast per tile of rows
+_tile_rays = 65536
+
 
 class Scene(Geometry):
     """
@@ -56,6 +59,9 @@ class Scene(Geometry):
 
         # create our cache
         self._cache = caching.Cache(id_function=self.md5)
+        # created on first access and kept up to date with
+        # the scene rather than being cleared with the cache
+        self._ray = None
 
         # add passed geometry to scene
         self.add_geometry(geometry)
@@ -484,6 +490,108 @@ class Scene(Geometry):
         """
         self._camera = camera
 
+    @property
+    def ray(self):
+        """
+        A ray intersector for the scene which uses a two level
+        hierarchy so instanced geometry is never flattened.
+
+        Returns
+        ----------
+        ray : trimesh.ray.ray_scene.RaySceneIntersector
+          Intersector that reports hits by node name
+        """
+        if self._ray is None:
+            from ..ray import ray_scene
+            self._ray = ray_scene.RaySceneIntersector(self)
+        return self._ray
+
+    def camera_rays(self, rows=None):
+        """
+        Get a ray through every pixel of self.camera in the
+        world frame.
+
+        Parameters
+        -----------
+        rows : None, or (2,) int
+          Only return rays for image rows in [start, stop)
+
+        Returns
+        -----------
+        origins : (n, 3) float
+          Ray origins, which are all the camera position
+        vectors : (n, 3) float
+          Unit ray directions in the world frame
+        pixels : (n, 2) int
+          The (x, y) pixel index for each ray
+        """
+        camera = self.camera
+        vectors, pixels = cameras.camera_to_rays(camera, rows=rows)
+        transform = camera.transform
+        # rotate directions into the world frame
+        vectors = np.dot(transform[:3, :3], vectors.T).T
+        origins = np.tile(transform[:3, 3], (len(vectors), 1))
+        return origins, vectors, pixels
+
+    def render_depth(self, tile_rows=None):
+        """
+        Render depth, triangle index and normal images of the
+        scene from self.camera by casting a ray through every
+        pixel, without requiring OpenGL.
+
+        Rays are cast a tile of image rows at a time, so memory
+        is bounded and neighboring rays traverse the same parts
+        of the acceleration structure.
+
+        Parameters
+        -----------
+        tile_rows : None or int
+          Number of image rows to cast at once
+
+        Returns
+        -----------
+        depth : (height, width) float32
+          Distance along the camera -Z axis to the first hit,
+          or inf for pixels which don't hit anything
+        index_tri : (height, width) int
+          Index of self.triangles hit by each pixel, or -1
+        normals : (height, width, 3) float32
+          World frame normal of the triangle hit by each
+          pixel, or zeros
+        """
+        width, height = self.camera.resolution
+        if tile_rows is None:
+            tile_rows = _tile_rays // width
+        tile_rows = max(int(tile_rows), 1)
+
+        depth = np.full((height, width), np.inf, dtype=np.float32)
+        index_tri = np.full((height, width), -1, dtype=np.int64)
+        normals = np.zeros((height, width, 3), dtype=np.float32)
+
+        if len(self.geometry) == 0:
+            return depth, index_tri, normals
+
+        intersector = self.ray
+        # the camera -Z axis in the world frame
+        axis = -self.camera.transform[:3, 2]
+
+        for start in range(0, height, tile_rows):
+            origins, vectors, pixels = self.camera_rays(
+                rows=(start, start + tile_rows))
+            (index,
+             ray,
+             distance,
+             normal) = intersector.intersects_surface(
+                origins, vectors, multiple_hits=False)
+
+            x, y = pixels[ray].T
+            # convert distance along the ray to depth
+            depth[y, x] = distance * np.dot(vectors[ray], axis)
+            index_tri[y, x] = index
+            normals[y, x] = normal
+
+        return depth, index_tri, normals
+
     @property
     def lights(self):
         """
@@ -16,6 +16,8 @@ class TransformForest(object):
 
         self._paths = {}
         self._updated = time.time()
+        # number of updates, as many can happen in the same millisecond
+        self._count = 0
 
         self._cache = caching.Cache(id_function=self.md5)
 
@@ -56,14 +58,16 @@ class TransformForest(object):
         if changed:
             self._paths = {}
         self._updated = time.time()
+        self._count += 1
 
     def md5(self):
         """
         MD5 of transforms.
 
-        Currently only hashing update time.
+        Currently only hashing update time and count.
         """
-        result = str(int(self._updated * 1000)) + str(self.base_frame)
+        result = (str(int(self._updated * 1000)) + '_' +
+                  str(self._count) + str(self.base_frame))
         return result
 
     def copy(self):
@@ -308,6 +312,7 @@ class TransformForest(object):
         self.transforms = EnforcedForest()
         self._paths = {}
         self._updated = time.time()
+        self._count += 1
 
     def _get_path(self, frame_from, frame_to):
         """
@@ -0,0 +1,175 @@
+"""
+shared.py
+------------
+
+Publish numpy arrays into shared memory blocks so other
+processes can read them without the arrays being pickled.
+"""
+import numpy as np
+
+try:
+    # only available on Python 3.8+
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+
+class SharedArrays(object):
+    """
+    Copy a dict of numpy arrays into shared memory, which
+    requires Python 3.8+.
+
+    The blocks are owned by this object and are only released
+    by `close`, so use it as a context manager or close it
+    once other processes are done reading from it.
+    """
+
+    def __init__(self, arrays):
+        """
+        Publish arrays into shared memory.
+
+        Parameters
+        ------------
+        arrays : dict
+          Keyed by name with numpy array values
+        """
+        if shared_memory is None:
+            raise ImportError('shared memory requires Python 3.8+')
+
+        self._blocks = []
+        # the information another process needs to attach
+        self.spec = {}
+        for key, value in arrays.items():
+            value = np.ascontiguousarray(value)
+            # blocks aren't allowed to be zero bytes
+            block = shared_memory.SharedMemory(
+                create=True, size=max(value.nbytes, 1))
+            np.ndarray(value.shape,
+                       dtype=value.dtype,
+                       buffer=block.buf)[...] = value
+            self._blocks.append(block)
+            self.spec[key] = (block.name,
+                              value.shape,
+                              value.dtype.str)
+
+    def close(self):
+        """
+        Release every shared memory block.
+        """
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def attach(spec):
+    """
+    Attach to arrays published by a SharedArrays object.
+
+    The returned blocks need to be kept referenced for as
+    long as the arrays are in use.
+
+    Parameters
+    ------------
+    spec : dict
+      From `SharedArrays.spec`
+
+    Returns
+    ------------
+    arrays : dict
+      Read- only numpy arrays keyed by name
+    blocks : list
+      The SharedMemory objects backing the arrays
+    """
+    if shared_memory is None:
+        raise ImportError('shared memory requires Python 3.8+')
+
+    arrays = {}
+    blocks = []
+    for key, (name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=name)
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        # other processes are reading the same memory
+        array.flags.writeable = False
+        arrays[key] = array
+        blocks.append(block)
+    return arrays, blocks
+
+
+# cached arrays published with a mesh by default
+_mesh_cache = ('face_normals',
+               'face_adjacency',
+               'face_adjacency_edges')
+
+
+def publish_mesh(mesh, cache=None):
+    """
+    Publish the data of a mesh and some of its cached arrays
+    into shared memory so other processes can rebuild it
+    with `attach_mesh` without anything being pickled.
+
+    Parameters
+    ------------
+    mesh : trimesh.Trimesh
+      Mesh to publish
+    cache : None or sequence of str
+      Names of cached properties to publish, computing
+      them if needed, where None uses face normals
+      and face adjacency
+
+    Returns
+    ------------
+    published : SharedArrays
+      Pass `published.spec` to other processes and close
+      it once they are done using the mesh
+    """
+    if cache is None:
+        cache = _mesh_cache
+    arrays = {'data_' + k: v for k, v in mesh._data.data.items()}
+    for name in cache:
+        value = getattr(mesh, name)
+        # only numeric arrays can be placed in shared memory
+        if (isinstance(value, np.ndarray) and
+                value.dtype.kind in 'biuf'):
+            arrays['cache_' + name] = value
+    return SharedArrays(arrays)
+
+
+def attach_mesh(spec):
+    """
+    Rebuild a mesh published with `publish_mesh`.
+
+    The mesh is read- only as its arrays are views of memory
+    other processes are reading.
+
+    Parameters
+    ------------
+    spec : dict
+      From `SharedArrays.spec`
+
+    Returns
+    ------------
+    mesh : trimesh.Trimesh
+      Mesh with data and cache from shared memory
+    """
+    from .base import Trimesh
+
+    arrays, blocks = attach(spec)
+    mesh = Trimesh(process=False)
+    if 'data_vertices' in arrays and 'data_faces' in arrays:
+        # keep the precision the mesh was published with
+        mesh._dtypes = (arrays['data_vertices'].dtype.type,
+                        arrays['data_faces'].dtype.type)
+    mesh._data.update({k[5:]: v for k, v in arrays.items()
+                       if k.startswith('data_')})
+    mesh._cache.update({k[6:]: v for k, v in arrays.items()
+                        if k.startswith('cache_')})
+    # keep the blocks referenced while the mesh is in use
+    mesh._shared_blocks = blocks
+    return mesh
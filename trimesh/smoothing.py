@@ -1,10 +1,5 @@
 import numpy as np
 
-try:
-    from scipy.sparse import coo_matrix
-except ImportError:
-    pass
-
 
 def filter_laplacian(mesh,
                      lamb=0.5,
@@ -32,6 +27,7 @@ def filter_laplacian(mesh,
       Sparse matrix laplacian operator
       Will be autogenerated if None
     """
+    from scipy.sparse import coo_matrix
     # if the laplacian operator was not passed create it here
     if laplacian_operator is None:
         laplacian_operator = laplacian_calculation(mesh)
@@ -169,6 +165,7 @@ def laplacian_calculation(mesh, equal_weight=True):
     laplacian : scipy.sparse.coo.coo_matrix
       Laplacian operator
     """
+    from scipy.sparse import coo_matrix
     # get the vertex neighbors from the cache
     neighbors = mesh.vertex_neighbors
     # avoid hitting crc checks in loops
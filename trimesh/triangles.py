@@ -6,6 +6,7 @@ Functions for dealing with triangle soups in (n, 3, 3) float form.
 """
 import numpy as np
 
+from . import bvh
 from . import util
 
 from .points import point_plane_distance
@@ -191,11 +192,13 @@ def mass_properties(triangles,
     info : dict
       Mass properties
     """
+    # always integrate in float64 even if the mesh is stored
+    # as float32 as volume and inertia lose precision quickly
     triangles = np.asanyarray(triangles, dtype=np.float64)
     if not util.is_shape(triangles, (-1, 3, 3)):
         raise ValueError('Triangles must be (n,3,3)!')
 
-    if crosses is None:
+    if crosses is None or np.asanyarray(crosses).dtype != np.float64:
         crosses = cross(triangles)
 
     # these are the subexpressions of the integral
@@ -329,6 +332,43 @@ def bounds_tree(triangles):
     return tree
 
 
+def bounds_bvh(triangles, leaf_size=4, tree=None):
+    """
+    Given a list of triangles, create a vectorized bounding
+    volume hierarchy for broad- phase queries.
+
+    Parameters
+    ---------
+    triangles : (n, 3, 3) float
+      Triangles in space
+    leaf_size : int
+      Maximum number of triangles in a leaf node
+    tree : None or trimesh.bvh.BVH
+      A tree built from an earlier state of the same faces
+      which a copy of is refit rather than rebuilt
+
+    Returns
+    ---------
+    tree : trimesh.bvh.BVH
+      One primitive per triangle
+    """
+    triangles = np.asanyarray(triangles, dtype=np.float64)
+    if not util.is_shape(triangles, (-1, 3, 3)):
+        raise ValueError('Triangles must be (n,3,3)!')
+
+    # the (n, 2, 3) bounding box for every triangle
+    triangle_bounds = np.stack((triangles.min(axis=1),
+                                triangles.max(axis=1)), axis=1)
+    if tree is not None and len(tree.order) == len(triangles):
+        # the topology is still valid so only update bounds
+        # of a copy, as the tree may still be used elsewhere
+        tree = tree.copy()
+        tree.refit(triangle_bounds)
+        return tree
+    tree = bvh.BVH(triangle_bounds, leaf_size=leaf_size)
+    return tree
+
+
 def nondegenerate(triangles, areas=None, height=None):
     """
     Find all triangles which have an oriented bounding box
@@ -324,6 +324,37 @@ def make_sequence(obj):
         return np.array([obj])
 
 
+# dtypes of (vertices, faces) for each storage precision
+_precision_dtypes = {'float64': (np.float64, np.int64),
+                     'float32': (np.float32, np.int32)}
+
+
+def precision_dtypes(precision=None):
+    """
+    Get the dtypes geometry is stored with at a precision.
+
+    Parameters
+    ------------
+    precision : None, str or np.dtype
+      'float64' (default) or 'float32' which stores vertices
+      as float32 and indexes as int32 to halve memory
+
+    Returns
+    ------------
+    float_dtype : type
+      For vertices and normals
+    int_dtype : type
+      For faces and other indexes
+    """
+    if precision is None:
+        return _precision_dtypes['float64']
+    try:
+        return _precision_dtypes[np.dtype(precision).name]
+    except (KeyError, TypeError):
+        raise ValueError('precision must be one of {} not {}'.format(
+            sorted(_precision_dtypes.keys()), precision))
+
+
 def vector_hemisphere(vectors, return_sign=False):
     """
     For a set of 3D vectors alter the sign so they are all in the
@@ -843,3 +843,285 @@ def boolean_sparse(a, b, operation=np.logical_and):
     coords = np.column_stack(applied.coords) + origin
 
     return coords
+
+
+@log_time
+def sdf_grid(mesh,
+             pitch,
+             bounds=None,
+             band=None,
+             out=None,
+             slab_size=None):
+    """
+    Compute a signed distance field of a mesh sampled on a
+    regular grid, one z- slab at a time.
+
+    If `band` is passed exact distances are only computed for
+    grid points within that distance of the surface, which are
+    found by dilating a surface voxelization, and the rest of the
+    grid is filled by sweeping a wavefront of an eikonal solver
+    outwards from the band. Only the band and the wavefront are
+    stored besides the output grid.
+
+    Distances are positive inside the mesh and negative outside,
+    matching `proximity.signed_distance`.
+
+    Parameters
+    -----------
+    mesh : Trimesh object
+      Mesh to compute distance to, should be watertight
+    pitch : float
+      Distance between adjacent grid points
+    bounds : None or (2, 3) float
+      Region to sample, mesh bounds padded by band if None
+    band : None or float
+      Compute exact distances only within this distance
+      of the surface, or everywhere if None
+    out : None or (l, m, n) float array
+      Array to write into, such as a numpy.memmap, which
+      must match the grid shape
+    slab_size : None or int
+      Number of z planes to compute exact distances for at once
+
+    Returns
+    -----------
+    sdf : (l, m, n) float32
+      Signed distance at every grid point
+    origin : (3,) float
+      Position of sdf[0, 0, 0] in space
+    """
+    from . import proximity
+
+    pitch = float(pitch)
+    if bounds is None:
+        pad = pitch if band is None else float(band) + pitch
+        bounds = mesh.bounds + [[-pad] * 3, [pad] * 3]
+    bounds = np.asanyarray(bounds, dtype=np.float64)
+    if bounds.shape != (2, 3):
+        raise ValueError('bounds must be (2, 3)!')
+
+    # align the grid to integer multiples of pitch which
+    # is the same lattice used by voxelize_subdivide
+    index_min = np.floor(bounds[0] / pitch).astype(np.int64)
+    index_max = np.ceil(bounds[1] / pitch).astype(np.int64)
+    shape = tuple(index_max - index_min + 1)
+    origin = index_min * pitch
+
+    if out is None:
+        sdf = np.empty(shape, dtype=np.float32)
+    else:
+        sdf = out
+        if sdf.shape != shape:
+            raise ValueError('out must be shape {}!'.format(shape))
+
+    if slab_size is None:
+        # roughly a million grid points per slab
+        slab_size = 2 ** 20 // (shape[0] * shape[1])
+    slab_size = max(int(slab_size), 1)
+
+    # grid coordinates of the plane of a single slab
+    plane = np.column_stack([i.ravel() for i in np.meshgrid(
+        np.arange(shape[0]),
+        np.arange(shape[1]),
+        indexing='ij')])
+
+    if band is None:
+        # exact distances everywhere
+        for start in range(0, shape[2], slab_size):
+            stop = min(start + slab_size, shape[2])
+            points = _slab_points(plane, start, stop, pitch, origin)
+            sdf[:, :, start:stop] = proximity.signed_distance(
+                mesh, points).reshape(
+                    (shape[0], shape[1], stop - start))
+        return sdf, origin
+
+    from scipy import ndimage
+
+    band = float(band)
+    # every surface point is within this many cells of a
+    # surface voxel when edges are subdivided to pitch / 2
+    radius = int(np.ceil(band / pitch + 0.5 + np.sqrt(3) / 2))
+    surface, surface_origin = voxelize_subdivide(mesh,
+                                                 pitch,
+                                                 max_iter=None)
+    # put surface voxels on the grid
+    surface = (surface + np.round(
+        surface_origin / pitch).astype(np.int64) - index_min)
+
+    # flat indexes of grid points with an exact distance
+    fixed = []
+    sdf[:] = np.inf
+    for start in range(0, shape[2], slab_size):
+        stop = min(start + slab_size, shape[2])
+        # rasterize surface voxels near the slab
+        near = surface[np.logical_and(
+            surface[:, 2] >= start - radius,
+            surface[:, 2] < stop + radius)]
+        local = np.zeros((shape[0], shape[1],
+                          stop - start + 2 * radius), dtype=bool)
+        near = near - [0, 0, start - radius]
+        inside = np.logical_and((near >= 0).all(axis=1),
+                                (near < local.shape).all(axis=1))
+        local[tuple(near[inside].T)] = True
+        # dilate the surface into the band
+        mask = ndimage.maximum_filter(
+            local, size=2 * radius + 1,
+            mode='constant')[:, :, radius:radius + stop - start]
+
+        if not mask.any():
+            continue
+        points = _slab_points(plane, start, stop, pitch, origin)
+        # nonzero is in the same C- order as the slab points
+        index = np.nonzero(mask)
+        index = (index[0], index[1], index[2] + start)
+        sdf[index] = proximity.signed_distance(
+            mesh, points[mask.ravel()])
+        fixed.append(np.ravel_multi_index(index, shape))
+
+    if len(fixed) > 0:
+        # fill the rest of the grid from the band
+        _sweep(sdf, np.sort(np.concatenate(fixed)), pitch)
+
+    return sdf, origin
+
+
+def _slab_points(plane, start, stop, pitch, origin):
+    """
+    Get the position of every grid point in a z- slab, in
+    the same order as a C- ordered slab of the grid.
+
+    Parameters
+    -----------
+    plane : (n, 2) int
+      Grid XY index of every point in a plane
+    start : int
+      First z index of the slab
+    stop : int
+      Last z index of slab, exclusive
+    pitch : float
+      Distance between adjacent grid points
+    origin : (3,) float
+      Position of grid point zero
+
+    Returns
+    -----------
+    points : (n * (stop - start), 3) float
+      Points in space
+    """
+    count = stop - start
+    index = np.column_stack((np.repeat(plane, count, axis=0),
+                             np.tile(np.arange(start, stop), len(plane))))
+    return index * pitch + origin
+
+
+def _sweep(sdf, fixed, pitch):
+    """
+    Fill unknown values of a signed distance grid in place
+    by sweeping a wavefront outwards from the fixed values
+    with a first order eikonal solver.
+
+    Only the fixed indexes and the current front are stored:
+    every free neighbor of the front is updated at once, and the
+    points whose magnitude decreased become the next front until
+    nothing changes. Points may be updated more than once so this
+    converges to the same values as fast sweeping.
+
+    Signs are taken from the nearest neighbor, which is correct
+    as long as the fixed values completely contain the zero level
+    set.
+
+    Parameters
+    -----------
+    sdf : (l, m, n) float
+      Signed distances, with inf for unknown values
+    fixed : (p,) int
+      Sorted flat indexes of values which are exact and
+      shouldn't be changed
+    pitch : float
+      Distance between adjacent grid points
+    """
+    shape = np.array(sdf.shape, dtype=np.int64)
+    # flat view of the grid
+    values = sdf.reshape(-1)
+    stride = np.array([shape[1] * shape[2], shape[2], 1])
+
+    front = fixed
+    while len(front) > 0:
+        # every neighbor of the front inside the grid
+        index = np.column_stack(np.unravel_index(front, shape))
+        flat = []
+        for axis in range(3):
+            for step in (-1, 1):
+                valid = index[:, axis] + step
+                valid = np.logical_and(valid >= 0,
+                                       valid < shape[axis])
+                flat.append(front[valid] + step * stride[axis])
+        flat = np.unique(np.concatenate(flat))
+        # exact values are never changed
+        position = np.searchsorted(fixed, flat).clip(
+            max=len(fixed) - 1)
+        flat = flat[fixed[position] != flat]
+        if len(flat) == 0:
+            break
+        index = np.column_stack(np.unravel_index(flat, shape))
+
+        # signed values of the six neighbors
+        neighbors = np.full((6, len(flat)), np.inf)
+        for axis in range(3):
+            for side, step in enumerate((-1, 1)):
+                valid = index[:, axis] + step
+                valid = np.logical_and(valid >= 0,
+                                       valid < shape[axis])
+                neighbors[axis * 2 + side][valid] = values[
+                    flat[valid] + step * stride[axis]]
+
+        magnitude = np.abs(neighbors)
+        closest = magnitude.argmin(axis=0)
+        sign = np.sign(neighbors[closest, np.arange(len(flat))])
+        # round to the storage type before comparing so
+        # float32 grids don't keep changing forever
+        update = _eikonal(
+            np.minimum(magnitude[0], magnitude[1]),
+            np.minimum(magnitude[2], magnitude[3]),
+            np.minimum(magnitude[4], magnitude[5]),
+            pitch).astype(values.dtype)
+
+        better = update < np.abs(values[flat])
+        front = flat[better]
+        values[front] = sign[better] * update[better]
+
+
+def _eikonal(a, b, c, pitch):
+    """
+    Solve the first order upwind discretization of |grad u| = 1
+    on a regular grid given the smallest neighbor on each axis.
+
+    Parameters
+    -----------
+    a, b, c : (n,) float
+      Smallest neighbor magnitude along each axis
+    pitch : float
+      Distance between adjacent grid points
+
+    Returns
+    -----------
+    u : (n,) float
+      Updated distance magnitude
+    """
+    # sort the neighbors so a <= b <= c
+    a, b, c = np.sort(np.stack((a, b, c)), axis=0)
+    with np.errstate(invalid='ignore'):
+        # a single neighbor
+        u = a + pitch
+        # two neighbors
+        two = u > b
+        s = a[two] + b[two]
+        u[two] = (s + np.sqrt(
+            2 * pitch ** 2 - (a[two] - b[two]) ** 2)) / 2.0
+        # all three neighbors
+        three = u > c
+        s = a[three] + b[three] + c[three]
+        q = s ** 2 - 3 * (a[three] ** 2 + b[three] ** 2 +
+                          c[three] ** 2 - pitch ** 2)
+        u[three] = (s + np.sqrt(q)) / 3.0
+    return u
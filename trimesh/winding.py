@@ -0,0 +1,263 @@
+"""
+winding.py
+-------------
+
+Generalized winding numbers for triangle soups, which are
+the sum of the signed solid angle of every triangle seen from
+a point divided by 4 pi.
+
+The winding number is 1.0 inside and 0.0 outside of a closed
+mesh, and degrades gracefully on open, non- manifold or self
+intersecting meshes where ray parity tests fail.
+
+Evaluation uses a Barnes- Hut style traversal of the BVH of
+the mesh: nodes which are far from a point relative to their
+size are approximated by a single dipole at their center.
+
+Jacobson, Kavan and Sorkine-Hornung. "Robust Inside-Outside
+Segmentation using Generalized Winding Numbers", 2013.
+"""
+import numpy as np
+
+from collections import deque
+
+from . import bvh
+from . import util
+
+
+def solid_angle(triangles, points):
+    """
+    The signed solid angle of triangles seen from points,
+    using the formula of Van Oosterom and Strackee.
+
+    Parameters
+    ------------
+    triangles : (n, 3, 3) float
+      Vertices of triangles
+    points : (n, 3) float
+      Point to evaluate each triangle from
+
+    Returns
+    ------------
+    angle : (n,) float
+      Signed solid angle, positive when the point is
+      behind the triangle relative to its normal
+    """
+    # component arrays are much faster than reductions
+    # along the short last axis of (n, 3) arrays
+    a, b, c = np.transpose(
+        triangles - points.reshape((-1, 1, 3)), (1, 2, 0))
+
+    def dot(u, v):
+        return u[0] * v[0] + u[1] * v[1] + u[2] * v[2]
+
+    la, lb, lc = [np.sqrt(dot(v, v)) for v in (a, b, c)]
+    numerator = (a[0] * (b[1] * c[2] - b[2] * c[1]) +
+                 a[1] * (b[2] * c[0] - b[0] * c[2]) +
+                 a[2] * (b[0] * c[1] - b[1] * c[0]))
+    denominator = (la * lb * lc +
+                   dot(a, b) * lc +
+                   dot(a, c) * lb +
+                   dot(b, c) * la)
+    return 2.0 * np.arctan2(numerator, denominator)
+
+
+def dipoles(tree, triangles):
+    """
+    Compute a dipole expansion for every node of a tree.
+
+    Parameters
+    ------------
+    tree : trimesh.bvh.BVH
+      Tree with triangles as primitives
+    triangles : (n, 3, 3) float
+      Vertices of triangles
+
+    Returns
+    ------------
+    center : (j, 3) float
+      Area weighted center of each node
+    moment : (j, 3) float
+      Sum of area weighted normals in each node
+    radius : (j,) float
+      Distance from center enclosing each node
+    """
+    # normal vectors with a length of triangle area
+    moment = np.cross(triangles[:, 1] - triangles[:, 0],
+                      triangles[:, 2] - triangles[:, 0]) / 2.0
+    area = np.sqrt((moment ** 2).sum(axis=1))
+    weighted = triangles.mean(axis=1) * area.reshape((-1, 1))
+
+    # every node is a contiguous range of tree.order so
+    # sums over nodes are differences of a cumulative sum
+    def node_sum(values):
+        cumulative = np.zeros((len(values) + 1,) + values.shape[1:])
+        cumulative[1:] = np.cumsum(values[tree.order], axis=0)
+        return (cumulative[tree.start + tree.count] -
+                cumulative[tree.start])
+
+    node_moment = node_sum(moment)
+    node_area = node_sum(area)
+    node_weighted = node_sum(weighted)
+
+    # fall back to the box center for zero area nodes
+    center = tree.bounds.mean(axis=1)
+    nonzero = node_area > 0.0
+    center[nonzero] = (node_weighted[nonzero] /
+                       node_area[nonzero].reshape((-1, 1)))
+
+    # the farthest corner of the node box from the center
+    far = np.maximum(np.abs(center - tree.bounds[:, 0]),
+                     np.abs(tree.bounds[:, 1] - center))
+    radius = np.sqrt((far ** 2).sum(axis=1))
+
+    return center, node_moment, radius
+
+
+def winding_number(mesh, points, beta=2.0, batch_size=10000):
+    """
+    Compute the generalized winding number of a mesh at points.
+
+    Parameters
+    ------------
+    mesh : Trimesh object
+      Mesh to evaluate, which doesn't need to be watertight
+    points : (n, 3) float
+      Points in space
+    beta : float
+      Nodes farther away than beta times their radius are
+      approximated, and larger values are more accurate
+    batch_size : int
+      Number of points to traverse the tree with at once
+
+    Returns
+    ------------
+    winding : (n,) float
+      Winding number at each point, 1.0 inside and
+      0.0 outside of a closed mesh
+    """
+    points = np.asanyarray(points, dtype=np.float64)
+    if not util.is_shape(points, (-1, 3)):
+        raise ValueError('points must be (n, 3)!')
+
+    tree = mesh.triangles_bvh
+    triangles = mesh.triangles
+
+    # node expansions only depend on the mesh so cache them
+    cached = mesh._cache['winding_dipoles']
+    if cached is None:
+        cached = dipoles(tree, triangles)
+        mesh._cache['winding_dipoles'] = cached
+    center, moment, radius = cached
+
+    angle = np.zeros(len(points), dtype=np.float64)
+    for batch in range(0, len(points), batch_size):
+        current = points[batch:batch + batch_size]
+        angle[batch:batch + batch_size] = _evaluate(
+            tree=tree,
+            triangles=triangles,
+            center=center,
+            moment=moment,
+            radius=radius,
+            points=current,
+            beta=beta)
+
+    return angle / (4.0 * np.pi)
+
+
+def _evaluate(tree, triangles, center, moment, radius, points, beta):
+    """
+    Sum the solid angle of a tree at a batch of points.
+
+    Parameters
+    ------------
+    tree : trimesh.bvh.BVH
+      Tree with triangles as primitives
+    triangles : (n, 3, 3) float
+      Vertices of triangles
+    center : (j, 3) float
+      Dipole center of each node
+    moment : (j, 3) float
+      Dipole moment of each node
+    radius : (j,) float
+      Radius of each node
+    points : (m, 3) float
+      Points in space
+    beta : float
+      Ratio of distance to radius to approximate at
+
+    Returns
+    ------------
+    angle : (m,) float
+      Total solid angle at each point
+    """
+    angle = np.zeros(len(points), dtype=np.float64)
+
+    # start every point at the root node
+    index_point = np.arange(len(points))
+    index_node = np.zeros(len(points), dtype=np.int64)
+
+    leaf_point = deque([np.zeros(0, dtype=np.int64)])
+    leaf_node = deque([np.zeros(0, dtype=np.int64)])
+    while len(index_point) > 0:
+        vector = center[index_node] - points[index_point]
+        distance = np.sqrt((vector ** 2).sum(axis=1))
+        far = distance > beta * radius[index_node]
+
+        # far field is the solid angle of a dipole
+        if far.any():
+            contribution = (util.diagonal_dot(
+                moment[index_node[far]], vector[far]) /
+                distance[far] ** 3)
+            angle += np.bincount(index_point[far],
+                                 weights=contribution,
+                                 minlength=len(points))
+
+        near = np.logical_not(far)
+        index_point = index_point[near]
+        index_node = index_node[near]
+
+        # near leaves are evaluated exactly and near
+        # internal nodes are replaced by their children
+        leaf = tree.leaf[index_node]
+        leaf_point.append(index_point[leaf])
+        leaf_node.append(index_node[leaf])
+
+        internal = np.logical_not(leaf)
+        index_point = np.repeat(index_point[internal], 2)
+        index_node = tree.children[index_node[internal]].ravel()
+
+    # expand leaves into (triangle, point) pairs
+    leaf_node = np.concatenate(leaf_node)
+    group, position = bvh._segment_index(tree.start[leaf_node],
+                                         tree.count[leaf_node])
+    index_triangle = tree.order[position]
+    index_point = np.concatenate(leaf_point)[group]
+    if len(index_triangle) > 0:
+        angle += np.bincount(
+            index_point,
+            weights=solid_angle(triangles[index_triangle],
+                                points[index_point]),
+            minlength=len(points))
+
+    return angle
+
+
+def contains(mesh, points, **kwargs):
+    """
+    Check if points are inside a mesh using the
+    generalized winding number.
+
+    Parameters
+    ------------
+    mesh : Trimesh object
+      Mesh to check, which doesn't need to be watertight
+    points : (n, 3) float
+      Points in space
+
+    Returns
+    ------------
+    contains : (n,) bool
+      If the winding number at each point is over 0.5
+    """
+    return winding_number(mesh, points, **kwargs) > 0.5